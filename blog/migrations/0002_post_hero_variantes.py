@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hero_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
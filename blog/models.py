@@ -3,6 +3,8 @@ from django.db import models
 from django.urls import reverse
 from django.utils.text import slugify
 
+from portal_mascotas.imagenes import sincronizar_variantes
+
 
 class Category(models.Model):
     name = models.CharField("Nombre", max_length=60, unique=True)
@@ -61,6 +63,8 @@ class Post(models.Model):
     )
     content = models.TextField("Contenido")
     hero_image = models.ImageField("Imagen principal", upload_to="blog/", blank=True, null=True)
+    # Variantes redimensionadas de hero_image (ver portal_mascotas.imagenes)
+    hero_variantes = models.JSONField(default=dict, blank=True, editable=False)
     status = models.CharField("Estado", max_length=10, choices=STATUS_CHOICES, default="draft")
     published_at = models.DateTimeField("Fecha de publicación", blank=True, null=True)
     updated_at = models.DateTimeField("Actualizado", auto_now=True)
@@ -82,7 +86,8 @@ class Post(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
-        return super().save(*args, **kwargs)
+        super().save(*args, **kwargs)
+        sincronizar_variantes(self, "hero_image", "hero_variantes", kwargs.get("update_fields"))
 
     def get_absolute_url(self):
         return reverse("blog:post_detail", args=[self.slug])
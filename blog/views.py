@@ -3,6 +3,7 @@ from django.shortcuts import get_object_or_404, render, redirect
 from django.db.models import Q, Prefetch
 from django.contrib import messages
 
+from portal_mascotas.limites import limitar
 from .models import Post, Category, Tag, Comment
 from .forms import CommentForm
 
@@ -59,6 +60,7 @@ def post_list(request):
     return render(request, "blog/post_list.html", context)
 
 
+@limitar("comentario")
 def post_detail(request, slug):
     """
     Detalle del post + comentarios aprobados y formulario de comentario.
@@ -1,18 +1,20 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+
+from portal_mascotas.admin_rendimiento import AdminRendimientoMixin, FiltroFecha
 from .models import Usuario
 
 @admin.register(Usuario)
-class UsuarioAdmin(BaseUserAdmin):
+class UsuarioAdmin(AdminRendimientoMixin, BaseUserAdmin):
     """Admin para el modelo de usuario personalizado."""
     model = Usuario
 
     # Listado
     list_display = ("username", "email", "is_active", "is_staff", "is_superuser", "fecha_creacion")
-    list_filter = ("is_active", "is_staff", "is_superuser", "groups")
+    list_filter = ("is_active", "is_staff", "is_superuser", "groups", ("fecha_creacion", FiltroFecha))
     search_fields = ("username", "email")
     ordering = ("-fecha_creacion",)
-    date_hierarchy = "fecha_creacion"
+    list_per_page = 50
 
     # Campos de solo lectura (no editables en admin)
     readonly_fields = ("last_login", "date_joined", "fecha_creacion", "fecha_actualizacion")
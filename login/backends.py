@@ -0,0 +1,64 @@
+# login/backends.py
+"""
+Backend de autenticación por nombre de usuario o correo.
+
+Antes, login_view llamaba a authenticate() con lo escrito y, si fallaba y
+había una '@', buscaba por email__iexact y volvía a llamar a authenticate():
+un login fallido por correo costaba dos hashes PBKDF2 y un recorrido de la
+tabla. Aquí:
+  - una sola consulta resuelve usuario o correo sin distinguir mayúsculas,
+    comparando LOWER(columna) = LOWER(%s), que usa los índices únicos
+    funcionales de Usuario (usuario_username_lower_uniq, usuario_email_lower_uniq);
+  - la contraseña se verifica una sola vez;
+  - si el usuario no existe se calcula igual un hash (como ModelBackend),
+    para que el tiempo de respuesta no revele qué cuentas existen.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Lower
+from django.db.models.lookups import Exact
+
+
+def buscar_por_usuario_o_email(identificador):
+    """
+    Usuario cuyo username o email coincide con `identificador` (sin importar
+    mayúsculas), o None. Si coincide más de uno gana, en orden: el username
+    exacto, el username sin mayúsculas, el email; y entre iguales el más nuevo.
+    """
+    Usuario = get_user_model()
+    buscado = Lower(Value(identificador))
+    por_username = Exact(Lower("username"), buscado)
+    condicion = Q(por_username)
+    if "@" in identificador:
+        condicion |= Q(Exact(Lower("email"), buscado))
+    return (
+        Usuario._default_manager.filter(condicion)
+        .order_by(
+            Case(
+                When(username=identificador, then=Value(0)),
+                When(por_username, then=Value(1)),
+                default=Value(2),
+                output_field=IntegerField(),
+            ),
+            "-id",
+        )
+        .first()
+    )
+
+
+class UsuarioOEmailBackend(ModelBackend):
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(get_user_model().USERNAME_FIELD)
+        if not username or password is None:
+            return None
+        usuario = buscar_por_usuario_o_email(username.strip())
+        if usuario is None:
+            # Mismo costo que un login con usuario existente
+            get_user_model()().set_password(password)
+            return None
+        if usuario.check_password(password) and self.user_can_authenticate(usuario):
+            return usuario
+        return None
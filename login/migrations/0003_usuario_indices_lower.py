@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:14
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('login', '0002_remove_usuario_direccion_remove_usuario_es_activo_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(django.db.models.functions.text.Lower('username'), name='usuario_username_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='usuario_email_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:17
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def comprobar_colisiones(apps, schema_editor):
+    """
+    Aborta (sin tocar nada) si ya hay cuentas que solo difieren en mayúsculas:
+    hay que resolverlas a mano antes de crear las restricciones.
+    """
+    Usuario = apps.get_model('login', 'Usuario')
+    usuarios = Usuario.objects.using(schema_editor.connection.alias)
+    colisiones = []
+    for campo in ('username', 'email'):
+        repetidos = (
+            usuarios.annotate(valor=Lower(campo)).values('valor')
+            .annotate(n=Count('id')).filter(n__gt=1).values_list('valor', flat=True)
+        )
+        for valor in repetidos:
+            ids = list(usuarios.filter(**{f'{campo}__iexact': valor}).values_list('id', flat=True))
+            colisiones.append(f"  {campo} {valor!r}: usuarios {ids}")
+    if colisiones:
+        raise RuntimeError(
+            "Hay cuentas que solo difieren en mayúsculas; unifícalas o renómbralas "
+            "antes de migrar:\n" + "\n".join(colisiones)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('login', '0003_usuario_indices_lower'),
+    ]
+
+    operations = [
+        migrations.RunPython(comprobar_colisiones, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='usuario',
+            name='usuario_username_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='usuario',
+            name='usuario_email_lower_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='usuario',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('username'), name='usuario_username_lower_uniq', violation_error_message='Este nombre de usuario ya está en uso'),
+        ),
+        migrations.AddConstraint(
+            model_name='usuario',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='usuario_email_lower_uniq', violation_error_message='Este correo electrónico ya está registrado'),
+        ),
+    ]
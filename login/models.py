@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
 
 class Usuario(AbstractUser):
@@ -32,6 +33,18 @@ class Usuario(AbstractUser):
         verbose_name = 'Usuario'
         verbose_name_plural = 'Usuarios'
         ordering = ['-fecha_creacion']
+        constraints = [
+            # "Ana" y "ana" son la misma cuenta. Los índices únicos sobre LOWER()
+            # sirven además al login por usuario o correo (login.backends).
+            models.UniqueConstraint(
+                Lower('username'), name='usuario_username_lower_uniq',
+                violation_error_message='Este nombre de usuario ya está en uso',
+            ),
+            models.UniqueConstraint(
+                Lower('email'), name='usuario_email_lower_uniq',
+                violation_error_message='Este correo electrónico ya está registrado',
+            ),
+        ]
     
     def __str__(self):
         return self.username
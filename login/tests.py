@@ -1,3 +1,115 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import MD5PasswordHasher
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+class PresupuestoConsultasAdminTests(TestCase):
+    """El changelist de usuarios usa un número fijo de consultas."""
+    PRESUPUESTO = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser("admin", "admin@example.com", "x")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def crear_usuarios(self, n):
+        User = get_user_model()
+        base = User.objects.count()
+        User.objects.bulk_create([
+            User(username=f"u{base + i}", email=f"u{base + i}@example.com") for i in range(n)
+        ])
+
+    def consultas(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("admin:login_usuario_changelist"))
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx)
+
+    def test_presupuesto_no_crece_con_las_filas(self):
+        self.crear_usuarios(5)
+        pocas = self.consultas()
+        self.crear_usuarios(45)
+        cache.clear()
+        muchas = self.consultas()
+        self.assertLessEqual(muchas, self.PRESUPUESTO)
+        self.assertEqual(muchas, pocas)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class LoginUsuarioOEmailTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = get_user_model().objects.create_user("Ana", "Ana.Perez@Example.com", "clave-segura")
+
+    def autenticar(self, identificador, clave):
+        """(usuario, consultas, hashes calculados)"""
+        with mock.patch.object(MD5PasswordHasher, "encode", autospec=True,
+                               side_effect=MD5PasswordHasher.encode) as encode:
+            with CaptureQueriesContext(connection) as ctx:
+                usuario = authenticate(None, username=identificador, password=clave)
+        return usuario, len(ctx), encode.call_count
+
+    def test_usuario_o_correo_sin_mayusculas(self):
+        for identificador in ("Ana", "ana", "ana.perez@example.com", " ANA.PEREZ@EXAMPLE.COM "):
+            with self.subTest(identificador=identificador):
+                self.assertEqual(self.autenticar(identificador, "clave-segura"), (self.ana, 1, 1))
+
+    def test_fallos_cuestan_una_consulta_y_un_hash(self):
+        self.assertEqual(self.autenticar("ana.perez@example.com", "otra"), (None, 1, 1))
+        self.assertEqual(self.autenticar("nadie@example.com", "otra"), (None, 1, 1))
+
+    def test_username_exacto_gana_sobre_el_correo_de_otro(self):
+        User = get_user_model()
+        otro = User.objects.create_user("ana.perez@example.com", "otro@example.com", "clave-segura")
+        self.assertEqual(self.autenticar("ana.perez@example.com", "clave-segura")[0], otro)
+
+    def test_usuario_inactivo_no_entra(self):
+        get_user_model().objects.filter(pk=self.ana.pk).update(is_active=False)
+        self.assertIsNone(self.autenticar("ana", "clave-segura")[0])
+
+    def test_vista_login_por_correo(self):
+        resp = self.client.post(reverse("login:login"), {"username": "ANA.perez@example.com", "password": "clave-segura"})
+        self.assertRedirects(resp, reverse("home"), fetch_redirect_response=False)
+        self.assertEqual(int(self.client.session["_auth_user_id"]), self.ana.pk)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class RegistroTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        get_user_model().objects.create_user("Ana", "ana@example.com", "clave-segura")
+
+    def registrar(self, username, email):
+        datos = {"username": username, "email": email, "password1": "clave-segura", "password2": "clave-segura"}
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(reverse("login:register"), datos, follow=True)
+        return resp, [q for q in ctx if "login_usuario" in q["sql"]]
+
+    def test_un_solo_insert(self):
+        resp, consultas = self.registrar("beto", "beto@example.com")
+        self.assertContains(resp, "¡Cuenta creada para beto!")
+        self.assertEqual([q["sql"].split()[0] for q in consultas], ["INSERT"])
+
+    def test_duplicados_sin_distinguir_mayusculas(self):
+        for username, email, mensaje in (
+            ("ANA", "otra@example.com", "Este nombre de usuario ya está en uso"),
+            ("otra", "Ana@Example.COM", "Este correo electrónico ya está registrado"),
+        ):
+            with self.subTest(username=username, email=email):
+                resp, _ = self.registrar(username, email)
+                self.assertContains(resp, mensaje)
+        self.assertEqual(get_user_model().objects.count(), 1)
+
+    def test_restriccion_en_la_base(self):
+        with self.assertRaises(IntegrityError):
+            get_user_model().objects.bulk_create([get_user_model()(username="aNa", email="x@example.com")])
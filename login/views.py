@@ -1,9 +1,13 @@
 # login/views.py
+import re
+
+from django.db import IntegrityError, transaction
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.urls import reverse
+from portal_mascotas.limites import limitar, registrar_fallo
 from .models import Usuario
 
 def _resolve_next(request, fallback='home'):
@@ -14,11 +18,12 @@ def _resolve_next(request, fallback='home'):
     nxt = request.POST.get('next') or request.GET.get('next')
     return nxt if nxt else fallback
 
+@limitar('login', cuenta='login_cuenta')
 def login_view(request):
     """
-    Login que acepta usuario o correo.
-    - Intenta autenticar con lo que venga (por si el USERNAME_FIELD cambiara).
-    - Si falla, busca por email (case-insensitive) y reintenta con el username real.
+    Login que acepta usuario o correo (sin distinguir mayúsculas).
+    La resolución la hace login.backends.UsuarioOEmailBackend: una consulta
+    y una sola verificación de contraseña.
     """
     if request.user.is_authenticated:
         return redirect('home')
@@ -32,23 +37,14 @@ def login_view(request):
             messages.error(request, "Por favor, completa todos los campos.")
             return render(request, 'login/login.html', {'titulo': 'Iniciar Sesión'})
 
-        # 1) Intento directo (por si USERNAME_FIELD fuese 'email' o el usuario sí escribió su username)
         user = authenticate(request, username=username_or_email, password=password)
 
-        # 2) Si no funcionó, intento por email de forma case-insensitive
-        if user is None and '@' in username_or_email:
-            # Buscar usuario(s) con ese email sin diferenciar mayúsculas/minúsculas
-            qs = Usuario.objects.filter(email__iexact=username_or_email).order_by('-id')
-            user_obj = qs.first()
-            if user_obj:
-                # Reautenticar usando el username real del modelo personalizado
-                user = authenticate(request, username=user_obj.username, password=password)
-
         if user is not None:
             login(request, user)
             messages.success(request, f"¡Bienvenido, {user.username}!")
             return redirect(next_page)
         else:
+            registrar_fallo(request, 'login_cuenta')
             messages.error(request, "Usuario/Correo o contraseña inválidos.")
 
     # GET o POST fallido
@@ -60,11 +56,34 @@ def logout_view(request):
     messages.info(request, 'Has cerrado sesión correctamente')
     return redirect('login:login')
 
+# Restricción / columna única -> mensaje para el usuario (ver Usuario.Meta.constraints)
+DUPLICADOS = [
+    (re.compile(r'usuario_email_lower_uniq|login_usuario[._]email'), 'Este correo electrónico ya está registrado'),
+    (re.compile(r'usuario_username_lower_uniq|login_usuario[._]username'), 'Este nombre de usuario ya está en uso'),
+]
+
+
+def _mensaje_duplicado(exc):
+    """
+    Mensaje del campo repetido según la restricción que violó el INSERT. En
+    PostgreSQL se usa el nombre que informa el driver; en SQLite, el texto del
+    error ("UNIQUE constraint failed: index 'usuario_email_lower_uniq'").
+    """
+    diag = getattr(exc.__cause__, 'diag', None)
+    texto = getattr(diag, 'constraint_name', None) or str(exc)
+    for patron, mensaje in DUPLICADOS:
+        if patron.search(texto):
+            return mensaje
+    return 'Error al crear la cuenta. Inténtalo de nuevo.'
+
+
+@limitar('registro')
 def register_view(request):
     """
-    Registro simple.
-    Nota: si tu modelo no tiene unique=True en email, podrías permitir duplicados.
-    Este flujo ya avisa si existe otro usuario con el mismo correo/username.
+    Registro simple. La unicidad de correo y usuario (sin distinguir
+    mayúsculas) la garantizan las restricciones de la base: se intenta un
+    único INSERT y el IntegrityError se traduce al campo repetido, así que
+    dos registros simultáneos con el mismo correo no pueden pasar ambos.
     """
     if request.user.is_authenticated:
         return redirect('home')
@@ -79,13 +98,9 @@ def register_view(request):
 
         if not email:
             errors.append('El correo electrónico es obligatorio')
-        elif Usuario.objects.filter(email__iexact=email).exists():
-            errors.append('Este correo electrónico ya está registrado')
 
         if not username:
             errors.append('El nombre de usuario es obligatorio')
-        elif Usuario.objects.filter(username__iexact=username).exists():
-            errors.append('Este nombre de usuario ya está en uso')
 
         if not password1:
             errors.append('La contraseña es obligatoria')
@@ -102,15 +117,17 @@ def register_view(request):
                 messages.error(request, e)
         else:
             try:
-                user = Usuario.objects.create_user(
-                    username=username,
-                    email=email,
-                    password=password1
-                )
+                with transaction.atomic():
+                    Usuario.objects.create_user(
+                        username=username,
+                        email=email,
+                        password=password1
+                    )
+            except IntegrityError as e:
+                messages.error(request, _mensaje_duplicado(e))
+            else:
                 messages.success(request, f'¡Cuenta creada para {username}! Ya puedes iniciar sesión.')
                 return redirect('login:login')
-            except Exception:
-                messages.error(request, 'Error al crear la cuenta. Inténtalo de nuevo.')
 
     return render(request, 'login/register.html', {'titulo': 'Registrarse'})
 
@@ -0,0 +1,49 @@
+# portal_mascotas/admin.py
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from .models import CorreoPendiente, TrabajoImagen
+
+
+@admin.register(TrabajoImagen)
+class TrabajoImagenAdmin(admin.ModelAdmin):
+    list_display = ("id", "modelo", "objeto_id", "campo", "archivo", "estado", "intentos", "ejecutar_desde", "actualizado")
+    list_filter = ("estado", "modelo")
+    search_fields = ("archivo",)
+    readonly_fields = [f.name for f in TrabajoImagen._meta.fields]
+    list_per_page = 50
+    actions = ("accion_reintentar",)
+
+    def has_add_permission(self, request):
+        # Los trabajos los crea el save() de los modelos con imágenes
+        return False
+
+    @admin.action(description="Reintentar ahora")
+    def accion_reintentar(self, request, queryset):
+        n = queryset.exclude(estado="procesando").update(
+            estado="pendiente", intentos=0, ejecutar_desde=timezone.now(), error="",
+        )
+        if n:
+            messages.success(request, f"🔁 {n} trabajo(s) vuelven a la cola.")
+
+
+@admin.register(CorreoPendiente)
+class CorreoPendienteAdmin(admin.ModelAdmin):
+    list_display = ("id", "destinatario", "asunto", "evento", "estado", "intentos", "ejecutar_desde", "enviado")
+    list_filter = ("estado", "evento")
+    search_fields = ("destinatario",)
+    readonly_fields = [f.name for f in CorreoPendiente._meta.fields]
+    list_per_page = 50
+    actions = ("accion_reintentar",)
+
+    def has_add_permission(self, request):
+        # Los correos los encolan los servicios (portal_mascotas.correos)
+        return False
+
+    @admin.action(description="Reintentar ahora")
+    def accion_reintentar(self, request, queryset):
+        n = queryset.filter(estado="error").update(
+            estado="pendiente", intentos=0, ejecutar_desde=timezone.now(), error="",
+        )
+        if n:
+            messages.success(request, f"🔁 {n} correo(s) vuelven a la cola.")
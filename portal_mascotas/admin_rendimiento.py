@@ -0,0 +1,149 @@
+# portal_mascotas/admin_rendimiento.py
+"""
+"Modo rendimiento" para changelists del admin sobre tablas grandes.
+
+- PaginadorEstimado: sin filtros usa una estimación barata del total
+  (estadísticas del motor o, en SQLite, un COUNT(*) guardado en caché
+  SEGUNDOS_CACHE_CONTEO); con filtros cuenta como máximo TOPE_CONTEO + 1
+  filas. Como mucho un COUNT(*) completo por tabla cada pocos minutos.
+- FiltroFecha: en lugar de date_hierarchy (que arma sus opciones con un
+  DISTINCT de fechas sobre la tabla), rangos fijos calculados en Python.
+- FiltroValoresCacheados: filtro lateral cuyas opciones (DISTINCT de una
+  columna indexada) se guardan en caché unos minutos.
+- AdminRendimientoMixin: junta lo anterior, desactiva el segundo conteo
+  (`show_full_result_count`) y los contadores por opción de filtro
+  (`show_facets`), y aplica `list_defer` solo al listado (no al detalle).
+
+Los presupuestos de consultas de cada changelist están en los tests de cada app.
+"""
+from datetime import timedelta
+
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+TOPE_CONTEO = 10_000
+SEGUNDOS_CACHE_FILTROS = 600
+SEGUNDOS_CACHE_CONTEO = 300
+
+
+def estimar_filas(modelo, using="default"):
+    """Filas aproximadas de la tabla de `modelo`, sin recorrerla."""
+    conexion = connections[using]
+    tabla = modelo._meta.db_table
+    with conexion.cursor() as cursor:
+        if conexion.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [tabla])
+            fila = cursor.fetchone()
+            if fila and fila[0] >= 0:
+                return fila[0]
+        elif conexion.vendor == "mysql":
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s", [tabla],
+            )
+            fila = cursor.fetchone()
+            if fila and fila[0] is not None:
+                return fila[0]
+    # SQLite (u otros): conteo real, cacheado. MAX(pk) sería gratis pero queda
+    # muy lejos del total después de un borrado masivo.
+    clave = f"admin:conteo:{using}:{modelo._meta.label_lower}"
+    return cache.get_or_set(clave, lambda: modelo._base_manager.using(using).count(), SEGUNDOS_CACHE_CONTEO)
+
+
+class PaginadorEstimado(Paginator):
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if not qs.query.has_filters():
+            estimado = estimar_filas(qs.model, qs.db)
+            if estimado > TOPE_CONTEO:
+                return estimado
+        # Conteo acotado: SELECT COUNT(*) FROM (SELECT ... LIMIT TOPE+1)
+        return qs.order_by()[:TOPE_CONTEO + 1].count()
+
+
+class FiltroValoresCacheados(admin.SimpleListFilter):
+    """
+    Filtro por igualdad sobre `campo`; las opciones salen de un DISTINCT
+    que se cachea SEGUNDOS_CACHE_FILTROS. Subclases definen title,
+    parameter_name y campo.
+    """
+    campo = None
+
+    def lookups(self, request, model_admin):
+        modelo = model_admin.model
+        clave = f"admin:filtro:{modelo._meta.label_lower}:{self.campo}"
+
+        def calcular():
+            return list(
+                modelo._base_manager.exclude(**{self.campo: ""})
+                .order_by(self.campo).values_list(self.campo, flat=True).distinct()
+            )
+
+        valores = cache.get_or_set(clave, calcular, SEGUNDOS_CACHE_FILTROS)
+        return [(v, v) for v in valores]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.campo: self.value()})
+        return queryset
+
+
+class FiltroRegion(FiltroValoresCacheados):
+    title = "región"
+    parameter_name = "region"
+    campo = "region"
+
+
+class FiltroCiudad(FiltroValoresCacheados):
+    title = "ciudad"
+    parameter_name = "ciudad"
+    campo = "ciudad"
+
+
+class FiltroFecha(admin.DateFieldListFilter):
+    """
+    Los rangos de DateFieldListFilter (hoy, 7 días, este mes, este año) más
+    últimos 30 días, mes anterior y año anterior. Uso en list_filter:
+    ("fecha_registro", FiltroFecha).
+    """
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        desde, hasta = self.lookup_kwarg_since, self.lookup_kwarg_until
+        hoy = self.links[1][1][desde]
+        manana = self.links[1][1][hasta]
+        inicio_mes = hoy.replace(day=1)
+        inicio_anio = hoy.replace(month=1, day=1)
+        extra = (
+            ("Últimos 30 días", {desde: hoy - timedelta(days=30), hasta: manana}),
+            ("Mes anterior", {desde: (inicio_mes - timedelta(days=1)).replace(day=1), hasta: inicio_mes}),
+            ("Año anterior", {desde: inicio_anio.replace(year=inicio_anio.year - 1), hasta: inicio_anio}),
+        )
+        # Antes de "Sin fecha" / "Con fecha" (campos null=True)
+        self.links = self.links[:5] + extra + self.links[5:]
+
+
+class ChangeListLiviano(ChangeList):
+    """ChangeList que aplica `model_admin.list_defer` (columnas pesadas que el listado no muestra)."""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        qs = super().get_queryset(request, exclude_parameters)
+        if self.model_admin.list_defer:
+            qs = qs.defer(*self.model_admin.list_defer)
+        return qs
+
+
+class AdminRendimientoMixin:
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    list_defer = ()
+
+    def get_changelist(self, request, **kwargs):
+        return ChangeListLiviano
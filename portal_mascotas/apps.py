@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class PortalMascotasConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'portal_mascotas'
+
+    def ready(self):
+        from portal_mascotas.db import configurar_conexion
+        connection_created.connect(configurar_conexion, dispatch_uid="portal_mascotas.configurar_conexion")
@@ -0,0 +1,94 @@
+# portal_mascotas/bench.py
+"""
+Utilidades comunes para los comandos `bench_*`.
+
+Los benchmarks siembran datos sintéticos dentro de una transacción que se
+revierte al final (`transaccion_descartable`), así que se pueden correr
+contra la base real sin dejar rastro.
+"""
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from portal_mascotas.constantes import (
+    TIPOS_MASCOTA, SEXOS, REGIONES_CIUDADES, RAZAS_PERROS, RAZAS_GATOS,
+)
+
+NOMBRES = [
+    "Toby", "Luna", "Max", "Nala", "Rocky", "Kira", "Simba", "Maya", "Coco", "Lola",
+    "Bruno", "Canela", "Pelusa", "Chispa", "Manchas", "Copito", "Ñoño", "Pímpon",
+]
+PALABRAS = [
+    "juguetón", "tranquilo", "cariñoso", "vacunado", "esterilizado", "sociable",
+    "tímido", "energético", "educado", "rescatado", "pequeño", "grande", "pelaje",
+    "blanco", "negro", "atigrado", "ideal", "departamento", "niños", "patio",
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def transaccion_descartable():
+    """Ejecuta el bloque en una transacción que siempre se revierte."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def crear_usuario_bench(username="bench_usuario"):
+    from login.models import Usuario
+    usuario, _ = Usuario.objects.get_or_create(
+        username=username, defaults={"email": f"{username}@bench.invalid"}
+    )
+    return usuario
+
+
+def sembrar_mascotas(n, responsable, tam_lote=2000, semilla=1234):
+    """Crea `n` mascotas sintéticas pero realistas con bulk_create."""
+    from registro_mascotas.models import Mascota
+
+    rnd = random.Random(semilla)
+    ciudades = [c for lista in REGIONES_CIUDADES.values() for c in lista]
+    tipos = [t for t, _ in TIPOS_MASCOTA]
+    sexos = [s for s, _ in SEXOS]
+    razas = RAZAS_PERROS + RAZAS_GATOS
+
+    creadas = 0
+    while creadas < n:
+        lote = []
+        for _ in range(min(tam_lote, n - creadas)):
+            m = Mascota(
+                nombre=rnd.choice(NOMBRES),
+                tipo=rnd.choice(tipos),
+                raza=rnd.choice(razas),
+                edad=rnd.randint(1, 180),
+                sexo=rnd.choice(sexos),
+                descripcion=" ".join(rnd.choices(PALABRAS, k=rnd.randint(8, 40))),
+                ubicacion=rnd.choice(ciudades),
+                estado=rnd.choices(["disponible", "adoptado", "reservado"], weights=[8, 1, 1])[0],
+                responsable=responsable,
+            )
+            m.actualizar_campos_derivados()
+            lote.append(m)
+        Mascota.objects.bulk_create(lote)
+        creadas += len(lote)
+    return creadas
+
+
+def medir(fn, repeticiones=5):
+    """Ejecuta `fn` varias veces; devuelve (mediana_ms, min_ms, ultimo_resultado)."""
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = fn()
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(tiempos), min(tiempos), resultado
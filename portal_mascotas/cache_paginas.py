@@ -0,0 +1,125 @@
+# portal_mascotas/cache_paginas.py
+"""
+Caché de página completa del home para visitantes anónimos.
+
+- Clave: generación actual + parámetros de filtro normalizados.
+- Invalidación: `invalidar_home()` incrementa la generación; las entradas
+  viejas quedan huérfanas y expiran solas. Se llama al crear/borrar una
+  mascota visible o al cambiar su estado (registro_mascotas.signals y
+  registro_mascotas.facetas).
+- Estampida: cuando una clave está fría, solo una petición la calcula
+  (candado con cache.add); las demás reciben la última copia de esos mismos
+  filtros (aunque sea de una generación anterior) o esperan un momento.
+- Solo GET anónimos sin mensajes pendientes: nada que dependa de la sesión,
+  del usuario o del token CSRF puede quedar en caché.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+CLAVE_GENERACION = "home:generacion"
+PARAMETROS_HOME = ("q", "tipo", "sexo", "edad", "ubic", "region", "ciudad", "cursor")
+
+
+def _config(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+def generacion() -> int:
+    gen = cache.get(CLAVE_GENERACION)
+    if gen is None:
+        # Valor inicial basado en el reloj: si la clave se desaloja no se
+        # reutilizan generaciones viejas que aún tengan entradas vivas.
+        cache.add(CLAVE_GENERACION, time.time_ns(), None)
+        gen = cache.get(CLAVE_GENERACION, 0)
+    return gen
+
+
+def invalidar_home():
+    try:
+        cache.incr(CLAVE_GENERACION)
+    except ValueError:
+        cache.add(CLAVE_GENERACION, time.time_ns(), None)
+
+
+def clave_parametros(request) -> str:
+    """Hash estable de los filtros: ignora vacíos, orden y parámetros desconocidos."""
+    pares = sorted(
+        (k, (request.GET.get(k) or "").strip()) for k in PARAMETROS_HOME
+    )
+    texto = "&".join(f"{k}={v}" for k, v in pares if v)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def _tiene_mensajes(request) -> bool:
+    if request.COOKIES.get("messages"):   # CookieStorage de django.contrib.messages
+        return True
+    session = getattr(request, "session", None)
+    return bool(session is not None and session.get("_messages"))
+
+
+def _es_cacheable(request) -> bool:
+    return (
+        request.method == "GET"
+        and not request.user.is_authenticated
+        and not _tiene_mensajes(request)
+    )
+
+
+def _respuesta(datos, estado_cache):
+    contenido, content_type = datos
+    resp = HttpResponse(contenido, content_type=content_type)
+    resp["X-Cache"] = estado_cache
+    return resp
+
+
+def cache_anonimo(vista):
+    """Decorador para vistas de listado público (ver docstring del módulo)."""
+
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        if not _es_cacheable(request):
+            return vista(request, *args, **kwargs)
+
+        timeout = _config("CACHE_HOME_SEGUNDOS", 300)
+        h = clave_parametros(request)
+        clave = f"home:{generacion()}:{h}"
+        clave_vieja = f"home:ultima:{h}"
+
+        datos = cache.get(clave)
+        if datos is not None:
+            return _respuesta(datos, "HIT")
+
+        candado = f"{clave}:calculando"
+        if not cache.add(candado, 1, _config("CACHE_HOME_CANDADO_SEGUNDOS", 10)):
+            # Otro proceso está calculando esta misma página
+            datos = cache.get(clave_vieja)
+            if datos is not None:
+                return _respuesta(datos, "STALE")
+            limite = time.monotonic() + _config("CACHE_HOME_ESPERA_SEGUNDOS", 2)
+            while time.monotonic() < limite:
+                time.sleep(0.05)
+                datos = cache.get(clave)
+                if datos is not None:
+                    return _respuesta(datos, "HIT")
+            # Se agotó la espera: calcular sin guardar
+            return vista(request, *args, **kwargs)
+
+        try:
+            resp = vista(request, *args, **kwargs)
+            if hasattr(resp, "render") and callable(resp.render):
+                resp = resp.render()
+            if resp.status_code == 200 and not resp.cookies and not resp.streaming:
+                datos = (resp.content, resp["Content-Type"])
+                cache.set(clave, datos, timeout)
+                cache.set(clave_vieja, datos, timeout * 12)
+                resp["X-Cache"] = "MISS"
+            return resp
+        finally:
+            cache.delete(candado)
+
+    return envoltura
@@ -0,0 +1,128 @@
+# portal_mascotas/correos.py
+"""
+Avisos por correo a través de la bandeja de salida CorreoPendiente.
+
+Flujo:
+  - el servicio que cambia el estado (respuestas.aprobar, publicaciones.rechazar,
+    la solicitud rápida…) llama a encolar()/encolar_lote() dentro de su
+    transacción: si el cambio se revierte, el aviso también
+  - `manage.py enviar_correos` -> tomar() un lote de destinatarios, agrupar()
+    sus avisos en un solo mensaje por persona y enviarlos por una única
+    conexión SMTP (get_connection), registrando completar()/fallar()
+
+Reintentos: errores de conexión o del servidor vuelven a 'pendiente' con la
+misma espera exponencial que la cola de imágenes; una dirección rechazada por
+el servidor falla de inmediato. Un lote que quedó 'enviando' más de
+TIEMPO_MAX_TOMADO (worker muerto) se devuelve a la cola; en ese caso puede
+repetirse un aviso, nunca perderse.
+"""
+import smtplib
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import BadHeaderError, EmailMessage
+from django.db.models import F, Min
+from django.utils import timezone
+
+from portal_mascotas.models import CorreoPendiente
+from portal_mascotas.trabajos import espera_reintento
+
+MAX_INTENTOS = 6
+TIEMPO_MAX_TOMADO = timedelta(minutes=10)
+ASUNTO_AGRUPADO = "AdoptaPortal: tienes {n} novedades"
+SEPARADOR = "\n\n— — —\n\n"
+
+ERRORES_PERMANENTES = (smtplib.SMTPRecipientsRefused, BadHeaderError)
+
+
+def encolar(destinatario, asunto, cuerpo, evento=""):
+    """Agrega un aviso a la bandeja; sin destinatario (usuario sin email) no hace nada."""
+    encolar_lote([(destinatario, asunto, cuerpo, evento)])
+
+
+def encolar_lote(avisos):
+    """Como encolar(), para varios avisos [(destinatario, asunto, cuerpo, evento)] en un solo INSERT."""
+    ahora = timezone.now()
+    filas = [
+        CorreoPendiente(destinatario=d, asunto=a[:200], cuerpo=c, evento=e, ejecutar_desde=ahora)
+        for d, a, c, e in avisos if d
+    ]
+    if filas:
+        CorreoPendiente.objects.bulk_create(filas)
+    return len(filas)
+
+
+def liberar_abandonados():
+    """Devuelve a la cola los correos tomados por un worker que no terminó."""
+    limite = timezone.now() - TIEMPO_MAX_TOMADO
+    abandonados = CorreoPendiente.objects.filter(estado="enviando", tomado_en__lt=limite)
+    abandonados.filter(intentos__gte=MAX_INTENTOS - 1).update(
+        estado="error", intentos=F("intentos") + 1, error="El worker no terminó el envío.",
+    )
+    return abandonados.update(estado="pendiente", intentos=F("intentos") + 1, tomado_por="")
+
+
+def tomar(destinatarios: int):
+    """
+    Reserva para este worker todos los avisos listos de hasta `destinatarios`
+    personas (las que esperan hace más tiempo). Igual que trabajos.tomar(), la
+    reserva es un UPDATE condicionado a estado='pendiente' con un token único.
+    """
+    ahora = timezone.now()
+    listos = CorreoPendiente.objects.filter(estado="pendiente", ejecutar_desde__lte=ahora)
+    elegidos = list(
+        listos.values("destinatario")
+        .annotate(primero=Min("ejecutar_desde"))
+        .order_by("primero")
+        .values_list("destinatario", flat=True)[:destinatarios]
+    )
+    if not elegidos:
+        return []
+    token = uuid.uuid4().hex
+    listos.filter(destinatario__in=elegidos).update(estado="enviando", tomado_por=token, tomado_en=ahora)
+    return list(CorreoPendiente.objects.filter(tomado_por=token, estado="enviando").order_by("creado", "id"))
+
+
+def agrupar(correos):
+    """[(EmailMessage, [CorreoPendiente])]: un mensaje por destinatario con todos sus avisos."""
+    por_destinatario = {}
+    for c in correos:
+        por_destinatario.setdefault(c.destinatario, []).append(c)
+
+    mensajes = []
+    for destinatario, avisos in por_destinatario.items():
+        if len(avisos) == 1:
+            asunto, cuerpo = avisos[0].asunto, avisos[0].cuerpo
+        else:
+            asunto = ASUNTO_AGRUPADO.format(n=len(avisos))
+            cuerpo = SEPARADOR.join(f"{a.asunto}\n\n{a.cuerpo}" for a in avisos)
+        mensaje = EmailMessage(asunto, cuerpo, settings.DEFAULT_FROM_EMAIL, [destinatario])
+        mensajes.append((mensaje, avisos))
+    return mensajes
+
+
+def completar(avisos):
+    CorreoPendiente.objects.filter(pk__in=[a.pk for a in avisos]).update(
+        estado="enviado", enviado=timezone.now(), intentos=F("intentos") + 1, tomado_por="", error="",
+    )
+
+
+def fallar(avisos, exc):
+    """Programa el reintento de los avisos de un mensaje, o los marca con error."""
+    intentos = max(a.intentos for a in avisos) + 1
+    if isinstance(exc, ERRORES_PERMANENTES) or intentos >= MAX_INTENTOS:
+        cambios = {"estado": "error"}
+    else:
+        cambios = {"estado": "pendiente", "ejecutar_desde": timezone.now() + espera_reintento(intentos)}
+    CorreoPendiente.objects.filter(pk__in=[a.pk for a in avisos]).update(
+        intentos=intentos, tomado_por="", error=f"{type(exc).__name__}: {exc}", **cambios,
+    )
+    return cambios["estado"]
+
+
+def purgar_enviados(dias: int):
+    """Borra los correos enviados hace más de `dias` días; devuelve cuántos."""
+    limite = timezone.now() - timedelta(days=dias)
+    borrados, _ = CorreoPendiente.objects.filter(estado="enviado", enviado__lt=limite).delete()
+    return borrados
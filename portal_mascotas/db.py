@@ -0,0 +1,22 @@
+# portal_mascotas/db.py
+"""
+Ajustes por conexión a la base de datos (señal `connection_created`).
+"""
+from django.conf import settings
+
+
+def aplicar_pragmas(conexion, pragmas):
+    """Ejecuta `PRAGMA nombre = valor` sobre una conexión sqlite3 (DB-API)."""
+    cursor = conexion.cursor()
+    try:
+        for nombre, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nombre} = {valor}")
+    finally:
+        cursor.close()
+
+
+def configurar_conexion(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    # Perfil de producción (settings.SQLITE_PRAGMAS); vacío en desarrollo
+    aplicar_pragmas(connection.connection, settings.SQLITE_PRAGMAS)
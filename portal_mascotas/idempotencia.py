@@ -0,0 +1,47 @@
+# portal_mascotas/idempotencia.py
+"""
+Claves de idempotencia para POST que no deben ejecutarse dos veces
+(doble clic, reenvío del formulario, reintentos de la red).
+
+El cliente manda una clave única por intento de envío: el campo oculto que
+genera {% campo_idempotencia %} o la cabecera `Idempotency-Key`. La primera
+petición con esa clave la reserva con cache.add (atómico en todos los
+backends); las repeticiones no tocan la BD y reciben el resultado guardado
+de la primera (o "en curso" si aún no termina).
+
+La clave se guarda por usuario y por `alcance` (p. ej. la mascota), así que
+reutilizar el mismo valor en otro formulario no cruza resultados.
+Con LocMemCache la protección es por proceso; con varios workers hace falta
+una caché compartida (Redis/Memcached), igual que para cache_paginas.
+"""
+from django.core.cache import cache
+
+CAMPO = "idempotencia"
+CABECERA = "Idempotency-Key"
+SEGUNDOS = 10 * 60
+EN_CURSO = "en-curso"
+LARGO_MAXIMO = 64
+
+
+def clave(request, alcance):
+    """Clave de caché para esta petición, o None si el cliente no mandó ninguna."""
+    valor = (request.headers.get(CABECERA) or request.POST.get(CAMPO) or "").strip()
+    if not valor:
+        return None
+    return f"idempotencia:{alcance}:{request.user.pk}:{valor[:LARGO_MAXIMO]}"
+
+
+def reservar(clave):
+    """(True, None) si es la primera vez; (False, resultado guardado o EN_CURSO) si se repite."""
+    if cache.add(clave, EN_CURSO, SEGUNDOS):
+        return True, None
+    return False, cache.get(clave, EN_CURSO)
+
+
+def guardar(clave, resultado):
+    cache.set(clave, resultado, SEGUNDOS)
+
+
+def liberar(clave):
+    """Para errores inesperados: permite que un reintento se procese de nuevo."""
+    cache.delete(clave)
@@ -0,0 +1,250 @@
+# portal_mascotas/imagenes.py
+"""
+Variantes responsivas de las fotos subidas (Mascota.foto,
+SolicitudPublicacion.foto, Post.hero_image).
+
+Cada original se reescala a anchos fijos (thumb / card / detail) y se guarda
+en WebP y en JPEG (respaldo para navegadores sin WebP), con la orientación
+EXIF aplicada y sin metadatos (EXIF/GPS/XMP no se copian al re-codificar).
+
+Las rutas resultantes se guardan en un JSONField junto al ImageField:
+
+    {"origen": "mascotas/toby.jpg", "ancho": 3024, "alto": 4032,
+     "webp": {"160": "variantes/mascotas/toby.jpg-160.webp", ...},
+     "jpg":  {"160": "variantes/mascotas/toby.jpg-160.jpg", ...}}
+
+`origen` permite saber si las variantes corresponden a la foto actual.
+Las plantillas las usan con `{% imagen_responsive %}` (templatetags/imagenes.py)
+y, si no existen, caen a la URL del original.
+
+La generación normalmente ocurre fuera del request: `sincronizar_variantes`
+solo encola un TrabajoImagen (portal_mascotas.trabajos) y el comando
+`procesar_imagenes` la ejecuta. Con IMAGENES_EN_SEGUNDO_PLANO = False se
+genera en el mismo save() (útil en desarrollo).
+"""
+import logging
+import os
+import posixpath
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# nombre -> ancho en px
+VARIANTES = {"thumb": 160, "card": 480, "detail": 1024}
+
+# extensión -> (formato Pillow, opciones de guardado)
+FORMATOS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+DIRECTORIO = "variantes"
+FONDO_JPEG = (255, 255, 255)
+
+# Límite de píxeles antes de decodificar (bombas de descompresión: un PNG de
+# pocos KB puede declarar 50000x50000 y ocupar GB al cargarse)
+MAX_PIXELES = 40_000_000
+FORMATOS_ENTRADA = {"JPEG", "MPO", "PNG", "WEBP", "AVIF", "GIF", "BMP", "TIFF"}
+
+
+# (modelo, campo de imagen, campo de variantes, fecha para filtrar) de todos los
+# modelos con variantes; lo usan los comandos de mantenimiento
+CAMPOS_CON_VARIANTES = [
+    ("registro_mascotas.Mascota", "foto", "foto_variantes", "fecha_registro"),
+    ("registro_mascotas.SolicitudPublicacion", "foto", "foto_variantes", "fecha_creacion"),
+    ("blog.Post", "hero_image", "hero_variantes", "updated_at"),
+]
+
+
+class ImagenRechazada(ValueError):
+    """El archivo es una imagen, pero no se procesa (formato o tamaño no admitidos)."""
+
+
+def ruta_variante(nombre_original: str, ancho: int, ext: str) -> str:
+    """
+    'mascotas/toby.jpg' -> 'variantes/mascotas/toby.jpg-480.webp'
+
+    Se conserva el nombre completo, con su extensión: 'toby.jpg' y 'toby.png'
+    son originales distintos y sus variantes no deben pisarse.
+    """
+    return posixpath.join(DIRECTORIO, f"{nombre_original}-{ancho}.{ext}")
+
+
+def anchos_para(ancho_original: int):
+    """Anchos a generar: nunca se amplía; una foto pequeña queda con un solo tamaño."""
+    anchos = sorted({min(a, ancho_original) for a in VARIANTES.values()})
+    return [a for a in anchos if a > 0]
+
+
+def _preparar(img, formato):
+    """Convierte el modo de color a uno que el formato de salida admita."""
+    if formato == "JPEG":
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            fondo = Image.new("RGB", img.size, FONDO_JPEG)
+            fondo.paste(img, mask=img.getchannel("A"))
+            return fondo
+        return img.convert("RGB") if img.mode != "RGB" else img
+    if img.mode not in ("RGB", "RGBA"):
+        return img.convert("RGBA" if "A" in img.getbands() or img.mode == "P" else "RGB")
+    return img
+
+
+def codificar(img, formato, opciones) -> bytes:
+    buffer = BytesIO()
+    # Sin exif=/icc_profile=/xmp=: Pillow no arrastra metadatos al re-codificar
+    _preparar(img, formato).save(buffer, formato, **opciones)
+    return buffer.getvalue()
+
+
+def validar(img):
+    """Revisa formato y dimensiones con solo la cabecera leída (antes de decodificar)."""
+    if img.format not in FORMATOS_ENTRADA:
+        raise ImagenRechazada(f"Formato no admitido: {img.format}")
+    ancho, alto = img.size
+    if ancho * alto > MAX_PIXELES:
+        raise ImagenRechazada(f"Imagen demasiado grande: {ancho}x{alto} px")
+
+
+def renderizar(origen, nombre_original: str):
+    """
+    Decodifica `origen` (ruta o archivo abierto) y devuelve
+    (variantes, {ruta: bytes}) sin escribir nada. Lanza las excepciones de Pillow
+    si el archivo no es una imagen válida, o ImagenRechazada.
+    """
+    with Image.open(origen) as img:
+        validar(img)
+        img = ImageOps.exif_transpose(img)
+        img.load()
+        ancho, alto = img.size
+        variantes = {"origen": nombre_original, "ancho": ancho, "alto": alto}
+        archivos = {}
+        for ext in FORMATOS:
+            variantes[ext] = {}
+        for a in anchos_para(ancho):
+            reducida = img if a == ancho else img.resize(
+                (a, max(1, round(alto * a / ancho))), Image.Resampling.LANCZOS
+            )
+            for ext, (formato, opciones) in FORMATOS.items():
+                ruta = ruta_variante(nombre_original, a, ext)
+                archivos[ruta] = codificar(reducida, formato, opciones)
+                variantes[ext][str(a)] = ruta
+    return variantes, archivos
+
+
+def _reemplazar_atomico(destino, contenido, permisos):
+    """Escribe a un temporal en el mismo directorio y lo mueve con os.replace."""
+    directorio = os.path.dirname(destino)
+    os.makedirs(directorio, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directorio, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(contenido)
+        if permisos is not None:
+            os.chmod(tmp, permisos)
+        os.replace(tmp, destino)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def guardar_archivos(archivos, storage=default_storage):
+    """
+    Escribe las variantes con nombre fijo, reemplazando las anteriores. En
+    storage local el reemplazo es atómico (nunca hay un instante sin archivo),
+    así que se puede regenerar con el sitio en línea.
+    """
+    for ruta, contenido in archivos.items():
+        try:
+            destino = storage.path(ruta)
+        except NotImplementedError:
+            if storage.exists(ruta):
+                storage.delete(ruta)
+            storage.save(ruta, ContentFile(contenido))
+            continue
+        _reemplazar_atomico(destino, contenido, getattr(storage, "file_permissions_mode", None))
+
+
+def generar_variantes(nombre_original: str, storage=default_storage) -> dict:
+    """Genera y guarda las variantes de un archivo del storage; devuelve el dict para el JSONField."""
+    with storage.open(nombre_original, "rb") as f:
+        variantes, archivos = renderizar(f, nombre_original)
+    guardar_archivos(archivos, storage)
+    return variantes
+
+
+def variantes_vigentes(archivo, variantes) -> bool:
+    return bool(archivo) and bool(variantes) and variantes.get("origen") == archivo.name
+
+
+def sincronizar_variantes(instancia, campo: str, campo_variantes: str, update_fields=None):
+    """
+    Tras guardar `instancia`, si la foto de `campo` cambió encola un trabajo
+    para regenerar sus variantes (o las genera ya, sin cola). El resultado se
+    persiste con un UPDATE directo, sin volver a llamar a save() ni disparar
+    señales. Mientras tanto, o si la imagen no se puede procesar, las
+    plantillas usan el original.
+    """
+    if update_fields is not None and campo not in update_fields:
+        return
+    if campo in instancia.get_deferred_fields():
+        return
+    archivo = getattr(instancia, campo)
+    actuales = getattr(instancia, campo_variantes) or {}
+    if not archivo:
+        nuevas = {}
+    elif variantes_vigentes(archivo, actuales):
+        return
+    elif getattr(settings, "IMAGENES_EN_SEGUNDO_PLANO", True):
+        from portal_mascotas.trabajos import encolar
+        encolar(instancia, campo, campo_variantes)
+        return
+    else:
+        try:
+            nuevas = generar_variantes(archivo.name, archivo.storage)
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError, ValueError):
+            logger.warning("No se pudieron generar variantes de %s", archivo.name, exc_info=True)
+            nuevas = {}
+    if nuevas == actuales:
+        return
+    setattr(instancia, campo_variantes, nuevas)
+    type(instancia)._base_manager.filter(pk=instancia.pk).update(**{campo_variantes: nuevas})
+
+
+def sincronizar_variantes_lote(instancias, campo: str, campo_variantes: str):
+    """sincronizar_variantes() para objetos creados con bulk_create (sin save())."""
+    faltantes = [
+        i for i in instancias
+        if getattr(i, campo) and not variantes_vigentes(getattr(i, campo), getattr(i, campo_variantes))
+    ]
+    if not faltantes:
+        return
+    if getattr(settings, "IMAGENES_EN_SEGUNDO_PLANO", True):
+        from portal_mascotas.trabajos import encolar_lote
+        encolar_lote(faltantes, campo, campo_variantes)
+    else:
+        for i in faltantes:
+            sincronizar_variantes(i, campo, campo_variantes)
+
+
+def url_variante(archivo, variantes, tam="card", ext="jpg"):
+    """URL de la variante más cercana (por arriba) a `tam`, o la del original."""
+    if not variantes_vigentes(archivo, variantes) or not variantes.get(ext):
+        return archivo.url if archivo else ""
+    objetivo = VARIANTES.get(tam, VARIANTES["card"])
+    por_ancho = sorted((int(a), r) for a, r in variantes[ext].items())
+    ruta = next((r for a, r in por_ancho if a >= objetivo), por_ancho[-1][1])
+    return archivo.storage.url(ruta)
+
+
+def srcset(archivo, variantes, ext) -> str:
+    if not variantes_vigentes(archivo, variantes):
+        return ""
+    por_ancho = sorted((int(a), r) for a, r in (variantes.get(ext) or {}).items())
+    return ", ".join(f"{archivo.storage.url(r)} {a}w" for a, r in por_ancho)
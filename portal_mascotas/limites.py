@@ -0,0 +1,166 @@
+# portal_mascotas/limites.py
+"""
+Límites de tasa (rate limiting) sobre la caché de Django.
+
+    @limitar("comentario")
+    def post_detail(request, slug): ...
+
+    @limitar("login", cuenta="login_cuenta")
+    def login_view(request): ...
+
+Los límites se configuran en settings.LIMITES_TASA como
+{nombre: (peticiones, ventana_en_segundos)}. Solo cuentan los métodos
+indicados (POST por defecto): mirar el formulario no gasta intentos.
+La clave es el usuario si hay sesión iniciada y si no la IP
+(REMOTE_ADDR, o la cabecera de settings.LIMITES_TASA_CABECERA_IP si hay un
+proxy delante). Al pasarse se responde 429 con Retry-After.
+
+Con `cuenta` se suma un segundo límite por la cuenta escrita en el
+formulario (hash del username normalizado), sin importar la IP: frena a
+quien prueba contraseñas de una misma cuenta desde muchas direcciones.
+Ese límite solo cuenta los fallos, que la vista informa con
+registrar_fallo(); antes de la vista se consulta sin contar, con un único
+get_many de las dos ventanas. Un login lejos de ambos límites cuesta
+entonces dos idas a la caché (incr de la IP y get_many de la cuenta) y los
+fallos, una más.
+
+Algoritmo: ventana deslizante aproximada con dos contadores fijos,
+    estimado = actual + anterior * (1 - fracción transcurrida de la ventana)
+El contador actual se sube con cache.incr (atómico). La ventana anterior
+solo se lee cuando hace falta: si incluso con la anterior llena el
+estimado no pasa del límite, basta con esa única ida a la caché, que es
+lo normal para quien está lejos del límite.
+"""
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+
+PREFIJO = "limite"
+CAMPO_CUENTA = "username"
+
+
+def _ip(request):
+    cabecera = getattr(settings, "LIMITES_TASA_CABECERA_IP", None)
+    if cabecera and request.META.get(cabecera):
+        # X-Forwarded-For: cada proxy agrega al final la IP de quien le habló. Lo
+        # de la izquierda lo escribe el cliente (falsificable); se toma la
+        # entrada que agregó el más externo de los LIMITES_TASA_PROXIES propios.
+        ips = [ip.strip() for ip in request.META[cabecera].split(",") if ip.strip()]
+        if ips:
+            proxies = max(getattr(settings, "LIMITES_TASA_PROXIES", 1), 1)
+            return ips[-min(proxies, len(ips))]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def identidad(request):
+    if request.user.is_authenticated:
+        return f"u{request.user.pk}"
+    return f"ip{_ip(request)}"
+
+
+def clave_cuenta(request):
+    """Clave de la cuenta escrita en el formulario (POST 'username'), o None si viene vacía."""
+    nombre = (request.POST.get(CAMPO_CUENTA) or "").strip().lower()
+    if not nombre:
+        return None
+    # Hash: el texto escrito (quizá una contraseña pegada por error) no queda en la caché
+    return "c" + hashlib.sha256(nombre.encode()).hexdigest()[:32]
+
+
+def _incrementar(clave, ventana):
+    try:
+        return cache.incr(clave)
+    except ValueError:
+        # Primera petición de la ventana; dura dos ventanas para servir de "anterior"
+        if cache.add(clave, 1, timeout=2 * ventana + 1):
+            return 1
+        return cache.incr(clave)
+
+
+def _clave(nombre, quien, numero):
+    return f"{PREFIJO}:{nombre}:{quien}:{int(numero)}"
+
+
+def registrar(nombre, quien, peticiones, ventana, ahora=None):
+    """
+    Cuenta una petición de `quien` contra el límite `nombre`. Devuelve 0 si se
+    permite, o los segundos que conviene esperar si se pasó del límite.
+    """
+    ahora = time.time() if ahora is None else ahora
+    numero, resto = divmod(ahora, ventana)
+    peso_anterior = 1 - resto / ventana
+    actual = _incrementar(_clave(nombre, quien, numero), ventana)
+    if actual + peticiones * peso_anterior <= peticiones:
+        return 0
+
+    anterior = min(cache.get(_clave(nombre, quien, numero - 1), 0), peticiones)
+    return _espera(actual, anterior, peticiones, ventana, resto)
+
+
+def consultar(nombre, quien, peticiones, ventana, ahora=None):
+    """
+    Como registrar pero sin contar: los segundos de espera si una petición
+    más de `quien` pasaría el límite, o 0. Una sola ida (get_many).
+    """
+    ahora = time.time() if ahora is None else ahora
+    numero, resto = divmod(ahora, ventana)
+    actual, anterior = _clave(nombre, quien, numero), _clave(nombre, quien, numero - 1)
+    valores = cache.get_many([actual, anterior])
+    return _espera(valores.get(actual, 0) + 1, min(valores.get(anterior, 0), peticiones),
+                   peticiones, ventana, resto)
+
+
+def registrar_fallo(request, nombre):
+    """Cuenta un fallo contra el límite por cuenta `nombre` (ver limitar(cuenta=...))."""
+    config = settings.LIMITES_TASA.get(nombre)
+    quien = clave_cuenta(request) if config else None
+    if quien:
+        _incrementar(_clave(nombre, quien, time.time() // config[1]), config[1])
+
+
+def _espera(actual, anterior, peticiones, ventana, resto):
+    """0 si `actual` (incluida esta petición) más lo que pesa la ventana anterior cabe en el límite."""
+    if actual + anterior * (1 - resto / ventana) <= peticiones:
+        return 0
+
+    if actual > peticiones or not anterior:
+        # Solo se libera al empezar la próxima ventana
+        espera = ventana - resto
+    else:
+        # Hasta que lo que aporta la ventana anterior baje lo suficiente
+        espera = ventana * (1 - (peticiones - actual) / anterior) - resto
+    return max(1, math.ceil(espera))
+
+
+def limitar(nombre, metodos=("POST",), cuenta=None):
+    """
+    Decorador de vista: aplica settings.LIMITES_TASA[nombre] a los `metodos`
+    indicados y, si se da `cuenta`, también settings.LIMITES_TASA[cuenta] por
+    la cuenta del formulario. Este último solo se consulta: la vista cuenta
+    cada intento fallido con registrar_fallo(request, cuenta).
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.method in metodos:
+                espera = 0
+                config = settings.LIMITES_TASA.get(nombre)
+                if config:
+                    espera = registrar(nombre, identidad(request), *config)
+                config = settings.LIMITES_TASA.get(cuenta) if cuenta else None
+                quien = clave_cuenta(request) if config else None
+                if quien:
+                    espera = max(espera, consultar(cuenta, quien, *config))
+                if espera:
+                    resp = render(request, "limite_excedido.html", {"titulo": "Demasiados intentos",
+                                                                     "espera": espera}, status=429)
+                    resp["Retry-After"] = str(espera)
+                    return resp
+            return vista(request, *args, **kwargs)
+        return envoltura
+    return decorador
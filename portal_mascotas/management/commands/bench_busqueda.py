@@ -0,0 +1,59 @@
+# portal_mascotas/management/commands/bench_busqueda.py
+"""
+Compara la búsqueda libre del home antes y después del índice FTS5.
+
+    python manage.py bench_busqueda --n 100000
+
+Siembra N mascotas en una transacción que se revierte al final y mide,
+para varios términos, la primera página (24 filas) por ambos caminos:
+  - antes: nombre/raza/descripcion __icontains, orden por fecha
+  - ahora: MATCH sobre FTS5, orden por relevancia BM25
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from portal_mascotas.bench import crear_usuario_bench, medir, sembrar_mascotas, transaccion_descartable
+from registro_mascotas.busqueda import buscar, fts_disponible
+from registro_mascotas.models import Mascota
+
+TERMINOS = ["toby", "vacunado", "golden", "esterilizado tranquilo", "ñoño", "nunoa", "xyzzy"]
+POR_PAGINA = 24
+
+
+class Command(BaseCommand):
+    help = "Benchmark de búsqueda libre: icontains vs FTS5 (datos sintéticos, sin persistir)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--n", type=int, default=100_000, help="Mascotas a sembrar (default: 100000).")
+        parser.add_argument("--repeticiones", type=int, default=5)
+        parser.add_argument("--termino", action="append", dest="terminos",
+                            help="Término a medir (repetible). Por defecto, una lista fija.")
+
+    def handle(self, *args, **opts):
+        if not fts_disponible():
+            raise CommandError("El índice FTS5 solo existe en SQLite.")
+
+        terminos = opts["terminos"] or TERMINOS
+        rep = opts["repeticiones"]
+
+        with transaccion_descartable():
+            usuario = crear_usuario_bench()
+            self.stdout.write(f"Sembrando {opts['n']} mascotas…")
+            sembrar_mascotas(opts["n"], usuario)
+
+            base = Mascota.objects.filter(estado="disponible")
+            self.stdout.write(f"{'término':<24}{'icontains ms':>14}{'FTS5 ms':>10}{'filas':>8}{'x':>8}")
+            for t in terminos:
+                antes_ms, _, _ = medir(lambda: list(self._antes(base, t)[:POR_PAGINA]), rep)
+                qs, orden = buscar(base, t)
+                ahora_ms, _, filas = medir(lambda: list(qs.order_by(*orden)[:POR_PAGINA]), rep)
+                factor = antes_ms / ahora_ms if ahora_ms else 0
+                self.stdout.write(f"{t:<24}{antes_ms:>14.1f}{ahora_ms:>10.1f}{len(filas):>8}{factor:>7.1f}x")
+
+        self.stdout.write(self.style.SUCCESS("Listo (datos revertidos)."))
+
+    @staticmethod
+    def _antes(base, q):
+        return base.filter(
+            Q(nombre__icontains=q) | Q(raza__icontains=q) | Q(descripcion__icontains=q)
+        ).order_by("-fecha_registro", "-id")
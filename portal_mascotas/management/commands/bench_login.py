@@ -0,0 +1,91 @@
+# portal_mascotas/management/commands/bench_login.py
+"""
+Compara el login por usuario/correo antes y después de login.backends.
+
+    python manage.py bench_login --n 50000
+
+Siembra N usuarios en una transacción que se revierte al final y mide, para
+cada caso (usuario correcto, correo correcto, correo con clave errónea,
+cuenta inexistente), el tiempo y las consultas de un login por ambos caminos:
+  - antes: authenticate() con lo escrito y, si falla y hay '@', email__iexact
+    + un segundo authenticate() (dos hashes en un fallo por correo)
+  - ahora: UsuarioOEmailBackend (una consulta indexada, un hash)
+"""
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from login.backends import UsuarioOEmailBackend
+from login.models import Usuario
+from portal_mascotas.bench import medir, transaccion_descartable
+
+CLAVE = "clave-de-bench-123"
+
+
+class Command(BaseCommand):
+    help = "Benchmark de login por usuario o correo (datos sintéticos, sin persistir)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--n", type=int, default=50_000, help="Usuarios a sembrar (default: 50000).")
+        parser.add_argument("--repeticiones", type=int, default=3)
+
+    def handle(self, *args, **opts):
+        rep = opts["repeticiones"]
+        casos = [
+            # (caso, lo que se escribe, clave, ¿debe entrar?)
+            ("usuario correcto", "bench_login", CLAVE, True),
+            ("correo correcto", "Bench_Login@Bench.invalid", CLAVE, True),
+            ("correo, clave errónea", "bench_login@bench.invalid", "otra", False),
+            ("cuenta inexistente", "nadie@bench.invalid", CLAVE, False),
+        ]
+
+        with transaccion_descartable():
+            self.stdout.write(f"Sembrando {opts['n']} usuarios…")
+            self._sembrar(opts["n"])
+
+            ahora = UsuarioOEmailBackend()
+            self.stdout.write(
+                f"{'caso':<24}{'antes ms':>10}{'ahora ms':>10}{'consultas':>12}{'logins/s':>10}"
+            )
+            for nombre, identificador, clave, entra in casos:
+                antes_ms, _, _ = medir(lambda: self._antes(identificador, clave), rep)
+                ahora_ms, _, usuario = medir(lambda: ahora.authenticate(None, identificador, clave), rep)
+                consultas_antes = self._consultas(lambda: self._antes(identificador, clave))
+                consultas_ahora = self._consultas(lambda: ahora.authenticate(None, identificador, clave))
+                por_segundo = 1000 / ahora_ms if ahora_ms else 0
+                self.stdout.write(
+                    f"{nombre:<24}{antes_ms:>10.1f}{ahora_ms:>10.1f}"
+                    f"{f'{consultas_antes} -> {consultas_ahora}':>12}{por_segundo:>10.1f}"
+                    + ("" if (usuario is not None) == entra else "  ¡resultado inesperado!")
+                )
+
+        self.stdout.write(self.style.SUCCESS("Listo (datos revertidos)."))
+
+    @staticmethod
+    def _sembrar(n, tam_lote=5000):
+        # Un solo hash para todos: sembrar no debe costar N PBKDF2
+        hash_comun = make_password("x")
+        for inicio in range(0, n, tam_lote):
+            Usuario.objects.bulk_create([
+                Usuario(username=f"bench{i}", email=f"bench{i}@bench.invalid", password=hash_comun)
+                for i in range(inicio, min(inicio + tam_lote, n))
+            ])
+        Usuario.objects.create_user("bench_login", "bench_login@bench.invalid", CLAVE)
+
+    @staticmethod
+    def _antes(identificador, clave):
+        backend = ModelBackend()
+        usuario = backend.authenticate(None, username=identificador, password=clave)
+        if usuario is None and "@" in identificador:
+            encontrado = Usuario.objects.filter(email__iexact=identificador).order_by("-id").first()
+            if encontrado:
+                usuario = backend.authenticate(None, username=encontrado.username, password=clave)
+        return usuario
+
+    @staticmethod
+    def _consultas(fn):
+        with CaptureQueriesContext(connection) as ctx:
+            fn()
+        return len(ctx)
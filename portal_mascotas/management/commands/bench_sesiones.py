@@ -0,0 +1,90 @@
+# portal_mascotas/management/commands/bench_sesiones.py
+"""
+Compara los perfiles de sesión (ver SESION_PERFIL en settings).
+
+    python manage.py bench_sesiones --requests 200
+
+Para cada motor (db, cached_db, cookies) inicia sesión con un usuario de
+prueba y pide `home` y `lista_solicitudes` N veces con el cliente de pruebas
+de Django (la pila completa de middleware, sin red). Informa la latencia
+mediana por request y, por request, las lecturas y escrituras a la BD sobre
+django_session y el total de consultas; más las escrituras del login.
+Los datos se siembran en una transacción que se revierte al final.
+"""
+import statistics
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from portal_mascotas.bench import crear_usuario_bench, sembrar_mascotas, transaccion_descartable
+from registro_mascotas.models import Mascota
+from solicitud_adopcion.models import SolicitudAdopcion
+
+MOTORES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+ESCRITURAS = ("INSERT", "UPDATE", "DELETE")
+
+
+def _resumen(consultas):
+    """(lecturas de sesión, escrituras de sesión, total) de una lista de consultas capturadas."""
+    sesion = [q["sql"] for q in consultas if "django_session" in q["sql"]]
+    escrituras = sum(1 for sql in sesion if sql.lstrip().upper().startswith(ESCRITURAS))
+    return len(sesion) - escrituras, escrituras, len(consultas)
+
+
+class Command(BaseCommand):
+    help = "Benchmark de perfiles de sesión: latencia y escrituras por request (sin persistir)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests por vista y motor (default: 200).")
+        parser.add_argument("--mascotas", type=int, default=500, help="Mascotas a sembrar (default: 500).")
+
+    def handle(self, *args, **opts):
+        n = max(opts["requests"], 1)
+        with transaccion_descartable():
+            usuario = crear_usuario_bench()
+            otro = crear_usuario_bench("bench_responsable")
+            sembrar_mascotas(opts["mascotas"], otro)
+            SolicitudAdopcion.objects.bulk_create([
+                SolicitudAdopcion(usuario=usuario, mascota=m, mensaje="bench")
+                for m in Mascota.objects.filter(estado="disponible")[:20]
+            ])
+            vistas = {"home": reverse("home"), "lista_solicitudes": reverse("solicitud_adopcion:lista_solicitudes")}
+
+            self.stdout.write(
+                f"{'motor':<11}{'vista':<19}{'mediana ms':>11}{'lect. sesión':>14}{'escr. sesión':>14}{'consultas':>11}"
+            )
+            for nombre, motor in MOTORES.items():
+                with override_settings(SESSION_ENGINE=motor):
+                    caches["sesiones"].clear()
+                    cliente = Client(HTTP_HOST="localhost")
+                    with CaptureQueriesContext(connection) as ctx:
+                        cliente.force_login(usuario)
+                    _, escrituras_login, _ = _resumen(ctx)
+                    self.stdout.write(f"{nombre:<11}{'(login)':<19}{'':>11}{'':>14}{escrituras_login:>14}")
+
+                    for vista, url in vistas.items():
+                        cliente.get(url)   # calentar caché de sesión / plantillas
+                        tiempos = []
+                        with CaptureQueriesContext(connection) as ctx:
+                            for _ in range(n):
+                                t0 = time.perf_counter()
+                                resp = cliente.get(url)
+                                tiempos.append((time.perf_counter() - t0) * 1000)
+                        if resp.status_code != 200:
+                            self.stderr.write(f"{nombre} {vista}: HTTP {resp.status_code}")
+                        lecturas, escrituras, total = _resumen(ctx)
+                        self.stdout.write(
+                            f"{'':<11}{vista:<19}{statistics.median(tiempos):>11.2f}"
+                            f"{lecturas / n:>14.2f}{escrituras / n:>14.2f}{total / n:>11.2f}"
+                        )
+
+        self.stdout.write(self.style.SUCCESS("Listo (datos revertidos)."))
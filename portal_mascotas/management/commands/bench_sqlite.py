@@ -0,0 +1,166 @@
+# portal_mascotas/management/commands/bench_sqlite.py
+"""
+Concurrencia de SQLite: configuración por defecto vs perfil de producción.
+
+    python manage.py bench_sqlite --segundos 5 --lectores 4 --escritores 2
+
+Trabaja sobre un archivo temporal (no toca db.sqlite3) con una tabla
+parecida a la de mascotas. Lectores y escritores corren en hilos durante
+--segundos y se cuentan operaciones por segundo y errores "database is locked".
+  - antes: una conexión nueva por operación (CONN_MAX_AGE=0), diario
+    rollback, transacciones diferidas (la escritura lee y luego inserta, como
+    un atomic() que consulta antes de guardar)
+  - produccion: conexión persistente por hilo, settings.SQLITE_PRAGMAS_PRODUCCION
+    (WAL, synchronous=NORMAL, busy_timeout…) y BEGIN IMMEDIATE
+"""
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from portal_mascotas.db import aplicar_pragmas
+
+ESQUEMA = """
+CREATE TABLE mascota (
+    id INTEGER PRIMARY KEY, nombre TEXT, descripcion TEXT, estado TEXT, creado REAL
+);
+CREATE INDEX mascota_estado_creado ON mascota (estado, creado);
+"""
+LECTURA = "SELECT id, nombre, descripcion FROM mascota WHERE estado = 'disponible' ORDER BY creado DESC LIMIT 24 OFFSET ?"
+CONTEO = "SELECT COUNT(*) FROM mascota WHERE estado = 'disponible' AND creado > ?"
+ESCRITURA = "INSERT INTO mascota (nombre, descripcion, estado, creado) VALUES (?, ?, 'disponible', ?)"
+
+
+class _Perfil:
+    def __init__(self, ruta, produccion):
+        self.ruta = ruta
+        self.produccion = produccion
+        self.local = threading.local()
+
+    def conexion(self):
+        if self.produccion:
+            conn = getattr(self.local, "conn", None)
+            if conn is None:
+                conn = self.local.conn = sqlite3.connect(self.ruta, timeout=5, isolation_level=None,
+                                                         check_same_thread=False)
+                aplicar_pragmas(conn, settings.SQLITE_PRAGMAS_PRODUCCION)
+            return conn
+        # Igual que Django con CONN_MAX_AGE=0: se abre y se cierra en cada request
+        return sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+
+    def soltar(self, conn):
+        if not self.produccion:
+            conn.close()
+
+    def leer(self, rnd):
+        conn = self.conexion()
+        try:
+            conn.execute(LECTURA, (rnd.randint(0, 500),)).fetchall()
+        finally:
+            self.soltar(conn)
+
+    def escribir(self, rnd):
+        conn = self.conexion()
+        try:
+            conn.execute("BEGIN IMMEDIATE" if self.produccion else "BEGIN")
+            try:
+                conn.execute(CONTEO, (time.time() - 60,)).fetchone()
+                conn.execute(ESCRITURA, ("Bench", "x" * rnd.randint(50, 400), time.time()))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            self.soltar(conn)
+
+
+class Command(BaseCommand):
+    help = "Benchmark de concurrencia de SQLite: configuración por defecto vs perfil de producción."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--segundos", type=float, default=5.0)
+        parser.add_argument("--lectores", type=int, default=4)
+        parser.add_argument("--escritores", type=int, default=2)
+        parser.add_argument("--filas", type=int, default=20_000, help="Filas iniciales (default: 20000).")
+
+    def handle(self, *args, **opts):
+        self.stdout.write(
+            f"{opts['lectores']} lector(es), {opts['escritores']} escritor(es), {opts['segundos']:.0f} s por perfil"
+        )
+        self.stdout.write(
+            f"{'perfil':<12}{'lecturas/s':>12}{'escrituras/s':>14}{'p95 escr. ms':>14}{'bloqueos':>10}"
+        )
+        with tempfile.TemporaryDirectory() as directorio:
+            for nombre, produccion in (("antes", False), ("produccion", True)):
+                ruta = os.path.join(directorio, f"{nombre}.sqlite3")
+                self._sembrar(ruta, opts["filas"])
+                r = self._correr(_Perfil(ruta, produccion), opts)
+                self.stdout.write(
+                    f"{nombre:<12}{r['lecturas'] / opts['segundos']:>12.0f}"
+                    f"{r['escrituras'] / opts['segundos']:>14.0f}{r['p95']:>14.1f}{r['bloqueos']:>10}"
+                )
+        self.stdout.write(self.style.SUCCESS("Listo."))
+
+    @staticmethod
+    def _sembrar(ruta, filas):
+        conn = sqlite3.connect(ruta)
+        conn.executescript(ESQUEMA)
+        rnd = random.Random(1234)
+        ahora = time.time()
+        conn.executemany(
+            "INSERT INTO mascota (nombre, descripcion, estado, creado) VALUES (?, ?, ?, ?)",
+            (
+                (f"Mascota {i}", "x" * rnd.randint(50, 400),
+                 rnd.choice(["disponible", "disponible", "adoptado"]), ahora - rnd.random() * 86400)
+                for i in range(filas)
+            ),
+        )
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _correr(perfil, opts):
+        fin = time.perf_counter() + opts["segundos"]
+        candado = threading.Lock()
+        totales = {"lecturas": 0, "escrituras": 0, "bloqueos": 0}
+        tiempos_escritura = []
+
+        def trabajador(tipo, semilla):
+            rnd = random.Random(semilla)
+            hechas, bloqueos, tiempos = 0, 0, []
+            operacion = perfil.leer if tipo == "lecturas" else perfil.escribir
+            while time.perf_counter() < fin:
+                t0 = time.perf_counter()
+                try:
+                    operacion(rnd)
+                except sqlite3.OperationalError as e:
+                    if "locked" not in str(e) and "busy" not in str(e):
+                        raise
+                    bloqueos += 1
+                    continue
+                hechas += 1
+                if tipo == "escrituras":
+                    tiempos.append((time.perf_counter() - t0) * 1000)
+            with candado:
+                totales[tipo] += hechas
+                totales["bloqueos"] += bloqueos
+                tiempos_escritura.extend(tiempos)
+
+        hilos = [threading.Thread(target=trabajador, args=("lecturas", i)) for i in range(opts["lectores"])]
+        hilos += [threading.Thread(target=trabajador, args=("escrituras", 100 + i)) for i in range(opts["escritores"])]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+
+        if len(tiempos_escritura) >= 2:
+            totales["p95"] = statistics.quantiles(tiempos_escritura, n=20)[-1]
+        else:
+            totales["p95"] = 0.0
+        return totales
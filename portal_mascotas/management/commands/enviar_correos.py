@@ -0,0 +1,84 @@
+# portal_mascotas/management/commands/enviar_correos.py
+"""
+Worker de la bandeja de salida (CorreoPendiente).
+
+    python manage.py enviar_correos                  # corre indefinidamente
+    python manage.py enviar_correos --una-vez        # vacía la bandeja y termina
+    python manage.py enviar_correos --lote 100       # destinatarios por lote
+
+Cada lote junta los avisos de varias personas en un mensaje por persona y los
+envía por una sola conexión (EMAIL_BACKEND), que se reutiliza entre lotes
+mientras haya trabajo y se cierra cuando la bandeja queda vacía. Si un envío
+falla por la conexión, esta se descarta y el siguiente mensaje abre otra.
+Para probar sin servidor real: EMAIL_BACKEND de consola, o un SMTP local
+(`python -m aiosmtpd -n -l localhost:1025` con EMAIL_PORT=1025).
+"""
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from portal_mascotas import correos
+
+
+class Command(BaseCommand):
+    help = "Envía los correos de la bandeja de salida agrupados por destinatario."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=50,
+                            help="Destinatarios por lote (default: 50).")
+        parser.add_argument("--una-vez", action="store_true",
+                            help="Envía lo que esté listo y termina.")
+        parser.add_argument("--espera", type=float, default=10.0,
+                            help="Segundos entre sondeos cuando no hay correos (default: 10).")
+        parser.add_argument("--conservar-dias", type=int, default=30,
+                            help="Días que se guardan los correos ya enviados (default: 30).")
+
+    def handle(self, *args, **opts):
+        self.stats = {"enviado": 0, "pendiente": 0, "error": 0}
+        conexion = None
+        try:
+            correos.liberar_abandonados()
+            correos.purgar_enviados(opts["conservar_dias"])
+            while True:
+                lote = correos.tomar(max(opts["lote"], 1))
+                if not lote:
+                    if conexion is not None:
+                        conexion.close()
+                        conexion = None
+                    if opts["una_vez"]:
+                        break
+                    time.sleep(opts["espera"])
+                    correos.liberar_abandonados()
+                    continue
+
+                if conexion is None:
+                    conexion = get_connection()
+                for mensaje, avisos in correos.agrupar(lote):
+                    self._enviar(conexion, mensaje, avisos)
+        except KeyboardInterrupt:
+            self.stdout.write("Interrumpido; los correos tomados se liberarán solos.")
+        finally:
+            if conexion is not None:
+                conexion.close()
+
+        s = self.stats
+        self.stdout.write(self.style.SUCCESS(
+            f"Listo: {s['enviado']} aviso(s) enviado(s), {s['pendiente']} reintento(s) programado(s), "
+            f"{s['error']} con error."
+        ))
+
+    def _enviar(self, conexion, mensaje, avisos):
+        try:
+            conexion.open()   # no hace nada si ya está abierta
+            conexion.send_messages([mensaje])
+        except Exception as exc:
+            estado = correos.fallar(avisos, exc)
+            self.stats[estado] += len(avisos)
+            self.stderr.write(f"{mensaje.to[0]}: {type(exc).__name__}: {exc}")
+            if not isinstance(exc, correos.ERRORES_PERMANENTES):
+                # La conexión puede haber quedado a medias: el próximo envío abre otra
+                conexion.close()
+            return
+        correos.completar(avisos)
+        self.stats["enviado"] += len(avisos)
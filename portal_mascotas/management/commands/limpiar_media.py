@@ -0,0 +1,174 @@
+# portal_mascotas/management/commands/limpiar_media.py
+"""
+Recolector de archivos huérfanos en MEDIA_ROOT.
+
+    python manage.py limpiar_media --dry-run          # solo informa
+    python manage.py limpiar_media                    # mueve a cuarentena
+    python manage.py limpiar_media --purgar-dias 30   # además borra cuarentenas viejas
+
+Un archivo es huérfano si ningún FileField/ImageField de ningún modelo lo
+referencia, ni aparece en las variantes (foto_variantes / hero_variantes)
+o en un TrabajoImagen sin terminar. Con media direccionada por contenido un
+mismo archivo puede estar referenciado por varias filas, por eso solo este
+comando (que mira todas las referencias) retira archivos.
+
+Seguridad:
+  - solo se tocan archivos más viejos que el período de gracia (--gracia-horas):
+    una subida recién escrita cuya fila aún no se confirmó no se toca;
+  - no se borra nada: se mueve a MEDIA_ROOT/.cuarentena/<fecha>/ con la misma
+    ruta relativa, para poder devolverlo a mano.
+
+Las referencias se leen con values_list().iterator(), así que la memoria no
+depende de cuántas filas haya, solo del conjunto de rutas en uso.
+"""
+import os
+import shutil
+import time
+from collections import Counter
+from datetime import datetime
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from portal_mascotas.imagenes import CAMPOS_CON_VARIANTES, FORMATOS
+from portal_mascotas.models import TrabajoImagen
+from portal_mascotas.storage import DIRECTORIO_TEMPORAL
+
+CUARENTENA = ".cuarentena"
+IGNORADOS = {".gitkeep"}
+TAM_BLOQUE = 2000
+
+
+def _humano(n):
+    for unidad in ("B", "KB", "MB", "GB", "TB"):
+        if n < 1024 or unidad == "TB":
+            return f"{n:.1f} {unidad}" if unidad != "B" else f"{n} B"
+        n /= 1024
+
+
+def rutas_referenciadas():
+    """Conjunto de rutas (relativas a MEDIA_ROOT, con '/') que algo en la BD referencia."""
+    en_uso = set()
+    for modelo in apps.get_models():
+        campos = [f for f in modelo._meta.concrete_fields if isinstance(f, models.FileField)]
+        for campo in campos:
+            nombres = (
+                modelo._base_manager.exclude(**{campo.attname: ""})
+                .exclude(**{f"{campo.attname}__isnull": True})
+                .values_list(campo.attname, flat=True)
+                .iterator(chunk_size=TAM_BLOQUE)
+            )
+            en_uso.update(nombres)
+
+    for etiqueta, _, campo_variantes, _ in CAMPOS_CON_VARIANTES:
+        modelo = apps.get_model(etiqueta)
+        filas = (
+            modelo._base_manager.exclude(**{campo_variantes: {}})
+            .values_list(campo_variantes, flat=True)
+            .iterator(chunk_size=TAM_BLOQUE)
+        )
+        for variantes in filas:
+            for ext in FORMATOS:
+                en_uso.update((variantes or {}).get(ext, {}).values())
+
+    pendientes = TrabajoImagen.objects.exclude(estado__in=("hecho", "error"))
+    en_uso.update(pendientes.values_list("archivo", flat=True).iterator(chunk_size=TAM_BLOQUE))
+    return en_uso
+
+
+def recorrer(raiz, excluir=()):
+    """(ruta relativa con '/', DirEntry) de cada archivo bajo `raiz`, con os.scandir."""
+    pendientes = [""]
+    while pendientes:
+        relativa = pendientes.pop()
+        with os.scandir(os.path.join(raiz, relativa)) as it:
+            for entrada in it:
+                rel = f"{relativa}/{entrada.name}" if relativa else entrada.name
+                if entrada.is_dir(follow_symlinks=False):
+                    if rel not in excluir:
+                        pendientes.append(rel)
+                elif entrada.is_file(follow_symlinks=False):
+                    yield rel, entrada
+
+
+class Command(BaseCommand):
+    help = "Informa o mueve a cuarentena los archivos de MEDIA_ROOT que nada referencia."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Solo informa; no mueve nada.")
+        parser.add_argument("--gracia-horas", type=float, default=24.0,
+                            help="Ignora archivos modificados hace menos de estas horas (default: 24).")
+        parser.add_argument("--purgar-dias", type=int, default=None,
+                            help="Borra definitivamente las cuarentenas de hace más de N días.")
+        parser.add_argument("--listar", action="store_true", help="Imprime cada archivo huérfano.")
+
+    def handle(self, *args, **opts):
+        raiz = str(settings.MEDIA_ROOT)
+        dry_run = opts["dry_run"]
+        limite = time.time() - opts["gracia_horas"] * 3600
+
+        self.stdout.write("Leyendo referencias de la base de datos…")
+        en_uso = rutas_referenciadas()
+        self.stdout.write(f"{len(en_uso)} ruta(s) en uso.")
+
+        destino = os.path.join(raiz, CUARENTENA, datetime.now().strftime("%Y%m%d-%H%M%S"))
+        revisados = recientes = 0
+        huerfanos = Counter()
+        bytes_por_dir = Counter()
+
+        for rel, entrada in recorrer(raiz, excluir={CUARENTENA}):
+            revisados += 1
+            if rel in en_uso or entrada.name in IGNORADOS:
+                continue
+            st = entrada.stat(follow_symlinks=False)
+            if st.st_mtime > limite:
+                recientes += 1
+                continue
+            seccion = rel.split("/", 1)[0] if "/" in rel else "."
+            huerfanos[seccion] += 1
+            bytes_por_dir[seccion] += st.st_size
+            if opts["listar"]:
+                self.stdout.write(f"  {rel} ({_humano(st.st_size)})")
+            if not dry_run:
+                final = os.path.join(destino, *rel.split("/"))
+                os.makedirs(os.path.dirname(final), exist_ok=True)
+                os.replace(entrada.path, final)
+
+        self._resumen(revisados, recientes, huerfanos, bytes_por_dir, dry_run, destino)
+        if opts["purgar_dias"] is not None:
+            self._purgar(raiz, opts["purgar_dias"], dry_run)
+
+    def _resumen(self, revisados, recientes, huerfanos, bytes_por_dir, dry_run, destino):
+        self.stdout.write(f"Archivos revisados: {revisados} ({recientes} huérfano(s) dentro del período de gracia).")
+        for seccion in sorted(huerfanos):
+            nota = " (subidas interrumpidas)" if seccion == DIRECTORIO_TEMPORAL else ""
+            self.stdout.write(f"  {seccion + '/':<24}{huerfanos[seccion]:>8} archivo(s) {_humano(bytes_por_dir[seccion]):>12}{nota}")
+        total = sum(bytes_por_dir.values())
+        n = sum(huerfanos.values())
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"Dry-run: se recuperarían {_humano(total)} en {n} archivo(s)."))
+        elif n:
+            self.stdout.write(self.style.SUCCESS(
+                f"{n} archivo(s), {_humano(total)}, movidos a {os.path.relpath(destino, str(settings.MEDIA_ROOT))}/."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS("No hay archivos huérfanos."))
+
+    def _purgar(self, raiz, dias, dry_run):
+        base = os.path.join(raiz, CUARENTENA)
+        if not os.path.isdir(base):
+            return
+        limite = time.time() - dias * 86400
+        liberados = 0
+        with os.scandir(base) as it:
+            for lote in it:
+                if not lote.is_dir(follow_symlinks=False) or lote.stat().st_mtime > limite:
+                    continue
+                tam = sum(e.stat(follow_symlinks=False).st_size for _, e in recorrer(lote.path))
+                liberados += tam
+                self.stdout.write(f"Purgando cuarentena {lote.name} ({_humano(tam)})")
+                if not dry_run:
+                    shutil.rmtree(lote.path)
+        self.stdout.write(f"Cuarentena purgada: {_humano(liberados)} liberados.")
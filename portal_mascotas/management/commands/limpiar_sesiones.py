@@ -0,0 +1,44 @@
+# portal_mascotas/management/commands/limpiar_sesiones.py
+"""
+Borra las sesiones vencidas de django_session en lotes.
+
+    python manage.py limpiar_sesiones                  # lotes de 1000
+    python manage.py limpiar_sesiones --lote 500 --pausa 0.2
+
+Pensado para un cron (p. ej. cada hora). A diferencia de `clearsessions`,
+que borra todo en un solo DELETE, aquí cada lote es una transacción corta:
+en SQLite el candado de escritura se suelta entre lotes y los logins y
+mensajes que llegan mientras tanto no esperan al borrado completo.
+Con SESION_PERFIL=cookies no hay nada que borrar.
+"""
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Borra las sesiones vencidas en lotes pequeños."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=1000, help="Sesiones por DELETE (default: 1000).")
+        parser.add_argument("--pausa", type=float, default=0.0,
+                            help="Segundos de espera entre lotes (default: 0).")
+
+    def handle(self, *args, **opts):
+        lote = max(opts["lote"], 1)
+        ahora = timezone.now()
+        vencidas = Session.objects.filter(expire_date__lt=ahora)
+        total = 0
+        while True:
+            claves = list(vencidas.values_list("session_key", flat=True)[:lote])
+            if not claves:
+                break
+            borradas, _ = Session.objects.filter(session_key__in=claves, expire_date__lt=ahora).delete()
+            total += borradas
+            if len(claves) < lote:
+                break
+            if opts["pausa"]:
+                time.sleep(opts["pausa"])
+        self.stdout.write(self.style.SUCCESS(f"Listo: {total} sesión(es) vencida(s) borrada(s)."))
@@ -0,0 +1,116 @@
+# portal_mascotas/management/commands/procesar_imagenes.py
+"""
+Worker de la cola de imágenes (TrabajoImagen).
+
+    python manage.py procesar_imagenes                 # corre indefinidamente
+    python manage.py procesar_imagenes --una-vez       # vacía la cola y termina
+    python manage.py procesar_imagenes --procesos 0    # sin pool (depuración)
+
+El proceso principal es el único que habla con la base de datos: reserva
+trabajos, los reparte a un pool de procesos (uno por núcleo por defecto) y
+registra el resultado. El pool se mantiene siempre con trabajo en vuelo.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+
+from portal_mascotas import trabajos
+from portal_mascotas.cache_paginas import invalidar_home
+
+
+class _EnLinea:
+    """Ejecutor mínimo que corre cada tarea en el momento (para --procesos 0)."""
+
+    def submit(self, fn, *args):
+        fut = Future()
+        try:
+            fut.set_result(fn(*args))
+        except Exception as exc:
+            fut.set_exception(exc)
+        return fut
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class Command(BaseCommand):
+    help = "Procesa la cola de imágenes (variantes) en un pool de procesos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1,
+                            help="Procesos del pool (default: núcleos). 0 = en este proceso.")
+        parser.add_argument("--en-vuelo", type=int, default=0,
+                            help="Trabajos enviados al pool a la vez (default: 4 por proceso).")
+        parser.add_argument("--una-vez", action="store_true",
+                            help="Procesa lo que esté listo y termina.")
+        parser.add_argument("--espera", type=float, default=5.0,
+                            help="Segundos entre sondeos cuando la cola está vacía (default: 5).")
+
+    def handle(self, *args, **opts):
+        procesos = max(opts["procesos"], 0)
+        en_vuelo_max = opts["en_vuelo"] or max(procesos, 1) * 4
+        self.stats = {"hecho": 0, "pendiente": 0, "error": 0}
+        self.pool_roto = False
+
+        ejecutor = self._crear_ejecutor(procesos)
+        en_vuelo = {}   # Future -> TrabajoImagen
+        try:
+            trabajos.liberar_abandonados()
+            while True:
+                faltan = en_vuelo_max - len(en_vuelo)
+                if faltan > 0:
+                    for t in trabajos.tomar(faltan):
+                        en_vuelo[ejecutor.submit(trabajos.procesar_archivo, t.archivo)] = t
+
+                if not en_vuelo:
+                    if opts["una_vez"]:
+                        break
+                    time.sleep(opts["espera"])
+                    trabajos.liberar_abandonados()
+                    continue
+
+                listos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                home_cambio = False
+                for fut in listos:
+                    home_cambio |= self._registrar(en_vuelo.pop(fut), fut)
+                if home_cambio:
+                    invalidar_home()
+
+                if self.pool_roto:
+                    # Un hijo murió (p. ej. sin memoria): sus trabajos quedan
+                    # como reintento y se arranca un pool nuevo.
+                    ejecutor.shutdown(wait=False, cancel_futures=True)
+                    ejecutor = self._crear_ejecutor(procesos)
+                    self.pool_roto = False
+        except KeyboardInterrupt:
+            self.stdout.write("Interrumpido; los trabajos en vuelo se liberarán solos.")
+        finally:
+            ejecutor.shutdown(wait=True, cancel_futures=True)
+
+        s = self.stats
+        self.stdout.write(self.style.SUCCESS(
+            f"Listo: {s['hecho']} hecho(s), {s['pendiente']} reintento(s) programado(s), {s['error']} con error."
+        ))
+
+    @staticmethod
+    def _crear_ejecutor(procesos):
+        if procesos == 0:
+            return _EnLinea()
+        return ProcessPoolExecutor(max_workers=procesos, initializer=trabajos.inicializar_proceso)
+
+    def _registrar(self, trabajo, fut):
+        """Guarda el resultado de un trabajo; True si cambió una imagen del home."""
+        try:
+            variantes = fut.result()
+        except Exception as exc:
+            self.pool_roto |= isinstance(exc, BrokenProcessPool)
+            estado = trabajos.fallar(trabajo, exc)
+            self.stats[estado] += 1
+            self.stderr.write(f"{trabajo}: {type(exc).__name__}: {exc}")
+            return False
+        self.stats["hecho"] += 1
+        actualizado = trabajos.completar(trabajo, variantes)
+        return actualizado and trabajo.modelo in trabajos.MODELOS_HOME
@@ -0,0 +1,251 @@
+# portal_mascotas/management/commands/regenerar_variantes.py
+"""
+(Re)genera las variantes de todas las imágenes ya subidas (Mascota.foto,
+SolicitudPublicacion.foto, Post.hero_image) en un pool de procesos.
+
+    python manage.py regenerar_variantes                      # solo las que faltan
+    python manage.py regenerar_variantes --forzar             # todas
+    python manage.py regenerar_variantes --since 2025-01-01
+    python manage.py regenerar_variantes --dry-run            # informe de tamaños, no escribe
+
+Se puede correr con el sitio en línea:
+  - los archivos se reemplazan con os.replace (imagenes.guardar_archivos);
+  - cada resultado se guarda con un UPDATE condicionado a que el objeto
+    siga teniendo el mismo archivo (si alguien cambió la foto entre medio,
+    gana el trabajo que encoló ese save()).
+
+Reanudable: cada cierto tiempo se escribe un checkpoint JSON con el último id
+terminado de cada modelo (todo id menor ya está hecho). Una segunda corrida
+continúa desde ahí; --reiniciar lo ignora. El archivo va en BASE_DIR (no en
+el directorio actual, que cambia según desde dónde se llame, p. ej. cron) y
+guarda las opciones de la corrida: si no coinciden, se aborta en vez de
+continuar un recorrido distinto.
+"""
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, time as dtime
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from portal_mascotas import imagenes, trabajos
+from portal_mascotas.cache_paginas import invalidar_home
+
+CHECKPOINT = ".regenerar_variantes.json"   # relativo a BASE_DIR
+PARAMETROS = "_parametros"                  # clave del checkpoint con las opciones de la corrida
+SEGUNDOS_ENTRE_AVANCES = 2.0
+
+
+def medir_archivo(nombre):
+    """
+    Para --dry-run (corre en el pool): tamaño del original y de cada variante
+    como {ext: {ancho: bytes}}, sin escribir nada.
+    """
+    with default_storage.open(nombre, "rb") as f:
+        variantes, archivos = imagenes.renderizar(f, nombre)
+    tamanos = {
+        ext: {int(ancho): len(archivos[ruta]) for ancho, ruta in variantes[ext].items()}
+        for ext in imagenes.FORMATOS
+    }
+    return default_storage.size(nombre), tamanos
+
+
+def _humano(n):
+    for unidad in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unidad == "GB":
+            return f"{n:.1f} {unidad}" if unidad != "B" else f"{n} B"
+        n /= 1024
+
+
+class Command(BaseCommand):
+    help = "Regenera en paralelo las variantes de las imágenes existentes (reanudable, con --dry-run)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1,
+                            help="Procesos del pool (default: núcleos).")
+        parser.add_argument("--since", help="Solo objetos creados/actualizados desde esta fecha (AAAA-MM-DD o ISO).")
+        parser.add_argument("--modelo", action="append", dest="modelos",
+                            help="Limitar a un modelo (p. ej. registro_mascotas.Mascota). Repetible.")
+        parser.add_argument("--forzar", action="store_true",
+                            help="Regenera también las que ya tienen variantes vigentes.")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="No escribe nada; informa cuánto se ahorraría por imagen servida.")
+        parser.add_argument("--checkpoint",
+                            help=f"Archivo de checkpoint (default: BASE_DIR/{CHECKPOINT}).")
+        parser.add_argument("--reiniciar", action="store_true", help="Ignora el checkpoint existente.")
+
+    def handle(self, *args, **opts):
+        desde = self._parse_since(opts["since"])
+        fuentes = [f for f in imagenes.CAMPOS_CON_VARIANTES
+                   if not opts["modelos"] or f[0] in opts["modelos"]]
+        if not fuentes:
+            raise CommandError("Ningún modelo coincide con --modelo.")
+
+        self.dry_run = opts["dry_run"]
+        self.ruta_checkpoint = opts["checkpoint"] or os.path.join(settings.BASE_DIR, CHECKPOINT)
+        parametros = {"since": opts["since"], "modelos": sorted(f[0] for f in fuentes), "forzar": opts["forzar"]}
+        self.checkpoint = {} if opts["reiniciar"] or self.dry_run else self._leer_checkpoint(parametros)
+        self.checkpoint[PARAMETROS] = parametros
+        self.informe = {"imagenes": 0, "original": 0, "variantes": 0, "card_webp": 0, "card_jpg": 0}
+        self.errores = 0
+        self.home_cambio = False
+
+        procesos = max(opts["procesos"], 1)
+        with ProcessPoolExecutor(max_workers=procesos, initializer=trabajos.inicializar_proceso) as ejecutor:
+            for etiqueta, campo, campo_variantes, campo_fecha in fuentes:
+                self._procesar_modelo(ejecutor, procesos * 4, etiqueta, campo, campo_variantes,
+                                      campo_fecha, desde, opts["forzar"])
+
+        if self.home_cambio:
+            invalidar_home()
+        if not self.dry_run and os.path.exists(self.ruta_checkpoint):
+            # Corrida completa: la próxima empieza desde el principio
+            os.remove(self.ruta_checkpoint)
+        if self.dry_run:
+            self._imprimir_informe()
+        self.stdout.write(self.style.SUCCESS(f"Listo ({self.errores} error(es))."))
+
+    # ---- recorrido de un modelo ----
+    def _procesar_modelo(self, ejecutor, en_vuelo_max, etiqueta, campo, campo_variantes,
+                         campo_fecha, desde, forzar):
+        modelo = apps.get_model(etiqueta)
+        qs = modelo._base_manager.exclude(**{campo: ""}).exclude(**{f"{campo}__isnull": True})
+        if desde:
+            qs = qs.filter(**{f"{campo_fecha}__gte": desde})
+        ultimo = self.checkpoint.get(etiqueta, 0)
+        qs = qs.filter(pk__gt=ultimo).order_by("pk")
+
+        total = qs.count()
+        self.stdout.write(f"{etiqueta}: {total} imagen(es) por revisar (desde id > {ultimo}).")
+        hechas = saltadas = 0
+        t0 = ultimo_aviso = time.monotonic()
+        en_vuelo = {}   # Future -> (pk, nombre)
+
+        def recoger(bloquear):
+            nonlocal hechas
+            if not en_vuelo:
+                return
+            listos, _ = wait(en_vuelo, timeout=None if bloquear else 0, return_when=FIRST_COMPLETED)
+            for fut in listos:
+                pk, nombre = en_vuelo.pop(fut)
+                self._registrar(modelo, campo, campo_variantes, pk, nombre, fut)
+                hechas += 1
+
+        ultimo_visto = ultimo
+        filas = qs.values_list("pk", campo, campo_variantes).iterator(chunk_size=500)
+        for pk, nombre, variantes in filas:
+            ultimo_visto = pk
+            if not forzar and not self.dry_run and (variantes or {}).get("origen") == nombre:
+                saltadas += 1
+                continue
+            funcion = medir_archivo if self.dry_run else trabajos.procesar_archivo
+            en_vuelo[ejecutor.submit(funcion, nombre)] = (pk, nombre)
+            while len(en_vuelo) >= en_vuelo_max:
+                recoger(bloquear=True)
+
+            ahora = time.monotonic()
+            if ahora - ultimo_aviso >= SEGUNDOS_ENTRE_AVANCES:
+                recoger(bloquear=False)
+                # Todo id menor que el más chico en vuelo ya terminó
+                self._guardar_checkpoint(etiqueta, min(p for p, _ in en_vuelo.values()) - 1
+                                         if en_vuelo else pk)
+                self._avance(etiqueta, hechas + saltadas, total, hechas, ahora - t0)
+                ultimo_aviso = ahora
+
+        while en_vuelo:
+            recoger(bloquear=True)
+        self._avance(etiqueta, hechas + saltadas, total, hechas, time.monotonic() - t0)
+        self._guardar_checkpoint(etiqueta, ultimo_visto)
+
+    def _registrar(self, modelo, campo, campo_variantes, pk, nombre, fut):
+        try:
+            resultado = fut.result()
+        except Exception as exc:
+            self.errores += 1
+            self.stderr.write(f"{modelo.__name__}#{pk} {nombre}: {type(exc).__name__}: {exc}")
+            return
+        if self.dry_run:
+            original, tamanos = resultado
+            self._sumar_informe(nombre, original, tamanos)
+            return
+        actualizado = modelo._base_manager.filter(pk=pk, **{campo: nombre}).update(
+            **{campo_variantes: resultado}
+        )
+        if actualizado and modelo._meta.label in trabajos.MODELOS_HOME:
+            self.home_cambio = True
+
+    # ---- informe --dry-run ----
+    def _sumar_informe(self, nombre, original, tamanos):
+        inf = self.informe
+        inf["imagenes"] += 1
+        inf["original"] += original
+        ancho_card = imagenes.VARIANTES["card"]
+        for ext, por_ancho in tamanos.items():
+            inf["variantes"] += sum(por_ancho.values())
+            # La variante card (o la más grande, si la foto es más angosta)
+            ancho = min((a for a in por_ancho if a >= ancho_card), default=max(por_ancho))
+            inf[f"card_{ext}"] += por_ancho[ancho]
+
+    def _imprimir_informe(self):
+        inf = self.informe
+        n = inf["imagenes"] or 1
+        self.stdout.write("")
+        self.stdout.write(f"Imágenes medidas:           {inf['imagenes']}")
+        self.stdout.write(f"Originales:                 {_humano(inf['original'])} (media {_humano(inf['original'] // n)})")
+        self.stdout.write(f"Tarjeta WebP ({imagenes.VARIANTES['card']}px):      {_humano(inf['card_webp'])} (media {_humano(inf['card_webp'] // n)})")
+        self.stdout.write(f"Tarjeta JPEG ({imagenes.VARIANTES['card']}px):      {_humano(inf['card_jpg'])}")
+        ahorro = inf["original"] - inf["card_webp"]
+        pct = 100 * ahorro / inf["original"] if inf["original"] else 0
+        self.stdout.write(f"Ahorro por vista de todas las tarjetas (WebP): {_humano(ahorro)} ({pct:.0f} %)")
+        self.stdout.write(f"Espacio extra en disco por variantes: {_humano(inf['variantes'])}")
+
+    # ---- avance y checkpoint ----
+    def _avance(self, etiqueta, revisadas, total, hechas, segundos):
+        ritmo = hechas / segundos if segundos else 0
+        restantes = total - revisadas
+        eta = f"{restantes / ritmo:.0f}s" if ritmo else "?"
+        pct = 100 * revisadas / total if total else 100
+        self.stdout.write(f"  {etiqueta}: {revisadas}/{total} ({pct:.0f} %), {ritmo:.1f} img/s, ETA {eta}")
+
+    def _leer_checkpoint(self, parametros):
+        try:
+            with open(self.ruta_checkpoint, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            raise CommandError(f"Checkpoint ilegible: {self.ruta_checkpoint} (usa --reiniciar).")
+        previos = checkpoint.get(PARAMETROS, parametros)
+        if previos != parametros:
+            raise CommandError(
+                f"El checkpoint {self.ruta_checkpoint} es de otra corrida ({previos}); "
+                "usa las mismas opciones, --reiniciar u otro --checkpoint."
+            )
+        return checkpoint
+
+    def _guardar_checkpoint(self, etiqueta, ultimo_pk):
+        if self.dry_run:
+            return
+        self.checkpoint[etiqueta] = ultimo_pk
+        tmp = f"{self.ruta_checkpoint}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.checkpoint, f)
+        os.replace(tmp, self.ruta_checkpoint)
+
+    @staticmethod
+    def _parse_since(valor):
+        if not valor:
+            return None
+        dt = parse_datetime(valor)
+        if dt is None:
+            d = parse_date(valor)
+            if d is None:
+                raise CommandError(f"--since inválido: {valor!r} (usa AAAA-MM-DD).")
+            dt = datetime.combine(d, dtime.min)
+        return timezone.make_aware(dt) if timezone.is_naive(dt) else dt
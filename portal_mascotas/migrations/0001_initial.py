@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoImagen',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('modelo', models.CharField(help_text='app_label.Modelo', max_length=60)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('campo', models.CharField(max_length=40)),
+                ('campo_variantes', models.CharField(max_length=40)),
+                ('archivo', models.CharField(max_length=255)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('hecho', 'Hecho'), ('error', 'Error')], default='pendiente', max_length=12)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('ejecutar_desde', models.DateTimeField(help_text='No se toma antes de esta fecha (backoff)')),
+                ('tomado_por', models.CharField(blank=True, default='', max_length=64)),
+                ('tomado_en', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('actualizado', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Trabajo de imagen',
+                'verbose_name_plural': 'Trabajos de imágenes',
+                'indexes': [models.Index(fields=['estado', 'ejecutar_desde'], name='trabajo_imagen_cola_idx'), models.Index(fields=['modelo', 'objeto_id', 'campo'], name='trabajo_imagen_objeto_idx')],
+            },
+        ),
+    ]
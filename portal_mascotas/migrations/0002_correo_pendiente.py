@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal_mascotas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorreoPendiente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('destinatario', models.EmailField(max_length=254)),
+                ('asunto', models.CharField(max_length=200)),
+                ('cuerpo', models.TextField()),
+                ('evento', models.CharField(blank=True, default='', help_text='Origen del aviso (para filtrar)', max_length=40)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviando', 'Enviando'), ('enviado', 'Enviado'), ('error', 'Error')], default='pendiente', max_length=12)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('ejecutar_desde', models.DateTimeField(help_text='No se envía antes de esta fecha (backoff)')),
+                ('tomado_por', models.CharField(blank=True, default='', max_length=64)),
+                ('tomado_en', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('enviado', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Correo pendiente',
+                'verbose_name_plural': 'Correos pendientes',
+                'indexes': [models.Index(fields=['estado', 'ejecutar_desde'], name='correo_cola_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# portal_mascotas/models.py
+from django.db import models
+
+
+class TrabajoImagen(models.Model):
+    """
+    Cola en base de datos para generar variantes de imágenes fuera del
+    request (ver portal_mascotas.trabajos y `manage.py procesar_imagenes`).
+
+    Un trabajo apunta a un ImageField concreto (modelo + id + campo) y al
+    nombre de archivo que tenía al encolarse; si la foto cambia antes de que
+    se procese, el resultado se descarta y vale el trabajo más nuevo.
+    """
+    ESTADOS = [
+        ("pendiente", "Pendiente"),
+        ("procesando", "Procesando"),
+        ("hecho", "Hecho"),
+        ("error", "Error"),
+    ]
+
+    modelo = models.CharField(max_length=60, help_text="app_label.Modelo")
+    objeto_id = models.PositiveBigIntegerField()
+    campo = models.CharField(max_length=40)
+    campo_variantes = models.CharField(max_length=40)
+    archivo = models.CharField(max_length=255)
+
+    estado = models.CharField(max_length=12, choices=ESTADOS, default="pendiente")
+    intentos = models.PositiveSmallIntegerField(default=0)
+    ejecutar_desde = models.DateTimeField(help_text="No se toma antes de esta fecha (backoff)")
+    tomado_por = models.CharField(max_length=64, blank=True, default="")
+    tomado_en = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    creado = models.DateTimeField(auto_now_add=True)
+    actualizado = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Trabajo de imagen"
+        verbose_name_plural = "Trabajos de imágenes"
+        indexes = [
+            # El worker busca: WHERE estado='pendiente' AND ejecutar_desde <= now ORDER BY ejecutar_desde
+            models.Index(fields=["estado", "ejecutar_desde"], name="trabajo_imagen_cola_idx"),
+            models.Index(fields=["modelo", "objeto_id", "campo"], name="trabajo_imagen_objeto_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.modelo}#{self.objeto_id}.{self.campo} [{self.estado}]"
+
+
+class CorreoPendiente(models.Model):
+    """
+    Bandeja de salida de correos (patrón outbox). La fila se inserta en la
+    misma transacción que el cambio de estado que la origina, así que no se
+    avisa nada que luego se revierta; el envío lo hace `manage.py enviar_correos`
+    (ver portal_mascotas.correos).
+    """
+    ESTADOS = [
+        ("pendiente", "Pendiente"),
+        ("enviando", "Enviando"),
+        ("enviado", "Enviado"),
+        ("error", "Error"),
+    ]
+
+    destinatario = models.EmailField()
+    asunto = models.CharField(max_length=200)
+    cuerpo = models.TextField()
+    evento = models.CharField(max_length=40, blank=True, default="", help_text="Origen del aviso (para filtrar)")
+
+    estado = models.CharField(max_length=12, choices=ESTADOS, default="pendiente")
+    intentos = models.PositiveSmallIntegerField(default=0)
+    ejecutar_desde = models.DateTimeField(help_text="No se envía antes de esta fecha (backoff)")
+    tomado_por = models.CharField(max_length=64, blank=True, default="")
+    tomado_en = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    creado = models.DateTimeField(auto_now_add=True)
+    enviado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Correo pendiente"
+        verbose_name_plural = "Correos pendientes"
+        indexes = [
+            models.Index(fields=["estado", "ejecutar_desde"], name="correo_cola_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.destinatario}: {self.asunto} [{self.estado}]"
@@ -0,0 +1,131 @@
+# portal_mascotas/paginacion.py
+"""
+Paginación por cursor (keyset) reutilizable.
+
+En vez de OFFSET + COUNT(*), cada página se pide "a partir de" los valores
+de orden de la última fila vista. El cursor es un token firmado con esos
+valores, así que:
+  - el costo de la página 1 y de la página 500 es el mismo (se apoya en el índice),
+  - no hace falta contar el total,
+  - un token manipulado simplemente se ignora (vuelve a la primera página).
+
+Para órdenes cuyo valor no es estable entre requests (la relevancia BM25
+cambia con cada alta o baja) está paginar_desplazamiento: OFFSET con un
+tope de resultados, con la misma PaginaKeyset y el mismo tipo de token.
+"""
+from dataclasses import dataclass, field
+
+from django.core import signing
+from django.db.models import Q
+
+_SALT = "portal_mascotas.paginacion"
+
+
+@dataclass
+class PaginaKeyset:
+    items: list = field(default_factory=list)
+    siguiente: str = ""        # token para la próxima página ("" si no hay más)
+    es_primera: bool = True
+
+    @property
+    def tiene_siguiente(self) -> bool:
+        return bool(self.siguiente)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def codificar_cursor(valores) -> str:
+    return signing.dumps(list(valores), salt=_SALT, compress=False)
+
+
+def decodificar_cursor(token: str, largo: int):
+    """Devuelve la lista de valores del cursor o None si es inválido."""
+    if not token:
+        return None
+    try:
+        valores = signing.loads(token, salt=_SALT)
+    except signing.BadSignature:
+        return None
+    if not isinstance(valores, list) or len(valores) != largo:
+        return None
+    return valores
+
+
+def _filtro_despues_de(orden, valores) -> Q:
+    """
+    Construye el predicado "fila estrictamente después del cursor" para un
+    orden compuesto, p.ej. ("-fecha_registro", "-id"):
+
+        fecha_registro < f  OR  (fecha_registro = f AND id < i)
+    """
+    condicion = Q()
+    iguales = {}
+    for campo, valor in zip(orden, valores):
+        nombre = campo.lstrip("-")
+        lookup = "lt" if campo.startswith("-") else "gt"
+        condicion |= Q(**iguales, **{f"{nombre}__{lookup}": valor})
+        iguales[nombre] = valor
+    return condicion
+
+
+def paginar_keyset(qs, cursor: str = "", orden=("-fecha_registro", "-id"), por_pagina: int = 24):
+    """
+    Aplica `orden` al queryset y devuelve una PaginaKeyset con como máximo
+    `por_pagina` elementos. Se lee una fila extra para saber si hay más,
+    nunca se hace COUNT.
+
+    El último campo de `orden` debe ser único (normalmente el id) para que
+    el cursor sea estable aunque haya empates en los anteriores.
+    """
+    orden = tuple(orden)
+    valores = decodificar_cursor(cursor, len(orden))
+
+    qs = qs.order_by(*orden)
+    if valores is not None:
+        qs = qs.filter(_filtro_despues_de(orden, valores))
+
+    filas = list(qs[: por_pagina + 1])
+    hay_mas = len(filas) > por_pagina
+    filas = filas[:por_pagina]
+
+    siguiente = ""
+    if hay_mas and filas:
+        ultima = filas[-1]
+        siguiente = codificar_cursor(
+            _serializable(getattr(ultima, c.lstrip("-"))) for c in orden
+        )
+
+    return PaginaKeyset(items=filas, siguiente=siguiente, es_primera=valores is None)
+
+
+def paginar_desplazamiento(qs, cursor: str = "", orden=("-fecha_registro", "-id"), por_pagina: int = 24,
+                           tope: int = 240):
+    """
+    Como paginar_keyset, pero el cursor guarda cuántas filas ya se mostraron
+    (OFFSET) y no los valores de orden. No se sirve nada más allá de `tope`
+    filas: el OFFSET recorre todo lo anterior, así que el costo queda acotado.
+    """
+    valores = decodificar_cursor(cursor, 1)
+    desde = valores[0] if valores and isinstance(valores[0], int) and 0 < valores[0] < tope else 0
+    hasta = min(desde + por_pagina, tope)
+
+    filas = list(qs.order_by(*orden)[desde: hasta + 1])
+    hay_mas = len(filas) > hasta - desde and hasta < tope
+    filas = filas[: hasta - desde]
+
+    siguiente = codificar_cursor([hasta]) if hay_mas else ""
+    return PaginaKeyset(items=filas, siguiente=siguiente, es_primera=desde == 0)
+
+
+def _serializable(valor):
+    # datetime/date -> ISO 8601 (Django lo vuelve a parsear al filtrar)
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    return valor
@@ -4,6 +4,8 @@ Django settings for portal_mascotas project.
 Generated by 'django-admin startproject' using Django 5.2.6.
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,6 +39,9 @@ INSTALLED_APPS = [
 # Configuración del modelo de usuario personalizado
 AUTH_USER_MODEL = 'login.Usuario'
 
+# Login por usuario o correo en una consulta y un solo hash (login/backends.py)
+AUTHENTICATION_BACKENDS = ['login.backends.UsuarioOEmailBackend']
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -75,6 +80,103 @@ DATABASES = {
     }
 }
 
+# Perfil de SQLite para producción (BD_PERFIL=produccion):
+#   - conexiones persistentes (una por worker/hilo) con chequeo de salud;
+#   - transaction_mode IMMEDIATE: un atomic() toma el candado de escritura al
+#     empezar y espera busy_timeout, en vez de fallar con "database is locked"
+#     al pasar de lectura a escritura a mitad de la transacción;
+#   - PRAGMAs por conexión (portal_mascotas.db.configurar_conexion): WAL
+#     (lectores no bloquean al escritor ni al revés), synchronous=NORMAL
+#     (seguro con WAL; solo se arriesga la última transacción ante un corte de
+#     luz, no la integridad), espera ante candados, mmap y caché de páginas.
+# Ver `manage.py bench_sqlite`.
+BD_PERFIL = os.environ.get('BD_PERFIL', 'desarrollo')
+SQLITE_PRAGMAS_PRODUCCION = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,           # ms
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,       # negativo = KiB (64 MB)
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+SQLITE_PRAGMAS = {}
+if BD_PERFIL == 'produccion':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 5},
+    })
+    SQLITE_PRAGMAS = SQLITE_PRAGMAS_PRODUCCION
+
+# Cache (locmem por proceso; en producción con varios workers usar Redis/Memcached)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'portal-mascotas',
+    }
+}
+
+# Sesiones: perfil elegido con la variable de entorno SESION_PERFIL
+#   cached_db (default): lectura desde caché y escritura a la BD (write-through);
+#                        un request autenticado normal no consulta django_session.
+#   db:                  solo BD (el comportamiento de Django por defecto).
+#   cookies:             cookie firmada; cero lecturas/escrituras en la BD. Los
+#                        datos de la sesión quedan visibles (firmados, no cifrados)
+#                        para el navegador, y un logout no invalida copias de la cookie.
+# La caché de sesiones es de archivos (compartida entre workers del mismo host,
+# así un logout en un worker no deja la sesión viva en otro); SESION_CACHE=locmem
+# solo sirve con un único proceso (runserver). Ver `manage.py bench_sesiones`.
+# FileBasedCache guarda con pickle: quien pueda escribir en el directorio puede
+# ejecutar código en el servidor. Por eso vive dentro del proyecto (Django lo
+# crea con permisos 0700) y no en /tmp; SESION_CACHE_DIR debe apuntar a un
+# directorio que solo sea del usuario del servidor.
+# `manage.py test` usa locmem: los tests no comparten ni dejan archivos.
+SESION_PERFIL = os.environ.get('SESION_PERFIL', 'cached_db')
+SESSION_ENGINE = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'db': 'django.contrib.sessions.backends.db',
+    'cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESION_PERFIL]
+SESSION_CACHE_ALIAS = 'sesiones'
+PRUEBAS = sys.argv[1:2] == ['test']
+SESION_CACHE = os.environ.get('SESION_CACHE') or ('locmem' if PRUEBAS else 'archivos')
+if SESION_CACHE == 'locmem':
+    CACHES['sesiones'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'portal-mascotas-sesiones',
+    }
+else:
+    CACHES['sesiones'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('SESION_CACHE_DIR') or BASE_DIR / '.cache' / 'sesiones',
+        'OPTIONS': {'MAX_ENTRIES': 50_000},
+    }
+
+# Límites de tasa (portal_mascotas.limites): {nombre: (peticiones, ventana en segundos)}
+# por usuario, o por IP si no hay sesión. Solo cuentan los POST.
+# login_cuenta: intentos fallidos contra una misma cuenta, vengan de la IP que
+# vengan. Costo asumido: cualquiera que conozca un username puede bloquear su
+# login hasta 15 minutos mandando contraseñas malas (el dueño ve el 429 con
+# Retry-After). Se deja alto para que solo lo alcance un ataque sostenido.
+LIMITES_TASA = {
+    'login': (10, 60),
+    'login_cuenta': (20, 15 * 60),
+    'registro': (5, 60 * 60),
+    'solicitud_rapida': (20, 60 * 60),
+    'comentario': (5, 10 * 60),
+}
+# Detrás de un proxy la IP real viene en una cabecera (p. ej. 'HTTP_X_FORWARDED_FOR');
+# LIMITES_TASA_PROXIES es cuántos proxies propios la van completando: la IP
+# del cliente es esa cantidad de entradas contando desde la derecha.
+LIMITES_TASA_CABECERA_IP = os.environ.get('LIMITES_TASA_CABECERA_IP') or None
+LIMITES_TASA_PROXIES = int(os.environ.get('LIMITES_TASA_PROXIES', 1))
+
+# Caché de página del home para anónimos (portal_mascotas.cache_paginas)
+CACHE_HOME_SEGUNDOS = 300
+CACHE_HOME_CANDADO_SEGUNDOS = 10   # máximo que una petición retiene el cálculo de una clave fría
+CACHE_HOME_ESPERA_SEGUNDOS = 2     # cuánto espera una petición concurrente si no hay copia vieja
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -105,3 +207,43 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Media (✅ ya lo tenías bien)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Media direccionada por contenido (sha256, directorios por prefijo, sin duplicados).
+# Ver portal_mascotas/storage.py
+STORAGES = {
+    "default": {"BACKEND": "portal_mascotas.storage.AlmacenamientoPorContenido"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# Variantes de imágenes (portal_mascotas.imagenes): se generan en segundo plano
+# con `manage.py procesar_imagenes`. En False se generan dentro del save().
+IMAGENES_EN_SEGUNDO_PLANO = True
+
+# Correo: los avisos se escriben en la bandeja CorreoPendiente y los envía
+# `manage.py enviar_correos`. En desarrollo salen por consola; en producción
+# EMAIL_BACKEND=django.core.mail.backends.smtp.EmailBackend y EMAIL_HOST/...
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '') == '1'
+EMAIL_TIMEOUT = 10
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'AdoptaPortal <no-responder@adoptaportal.cl>')
+
+# Logging: eventos de las apps (p. ej. solicitudes creadas) a consola. Los
+# datos del evento van además en `extra` (usuario_id, mascota_id, evento…)
+# para un formatter estructurado (JSON) en producción.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'consola': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'loggers': {
+        'solicitud_adopcion': {'handlers': ['consola'], 'level': 'INFO', 'propagate': False},
+    },
+}
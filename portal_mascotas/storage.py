@@ -0,0 +1,105 @@
+# portal_mascotas/storage.py
+"""
+Storage de media direccionado por contenido.
+
+Cada archivo subido se guarda con el sha256 de sus bytes como nombre,
+dentro del directorio de `upload_to` y repartido en dos niveles de
+subdirectorios por prefijo del hash:
+
+    mascotas/IMG_0958.png  ->  mascotas/3f/a2/3fa2…e9.png
+
+- Deduplicación: si esos bytes ya existen en ese directorio, no se escribe
+  nada y se devuelve el nombre existente (varias filas pueden apuntar al
+  mismo archivo; por eso nunca se borran originales al borrar una fila:
+  de eso se encarga `limpiar_media`, que mira las referencias).
+- Sin sufijos `_NrDYHHb`: el nombre depende solo del contenido.
+- El hash se calcula por bloques mientras se copia a un temporal en el mismo
+  disco, que luego se mueve con os.replace (nunca hay un archivo a medias
+  con el nombre final, ni la subida entera en memoria).
+
+Los archivos antiguos (nombres planos) se siguen leyendo igual.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+DIRECTORIO_TEMPORAL = ".tmp"
+NIVELES = 2          # ab/cd/
+ANCHO_NIVEL = 2      # 256 directorios por nivel
+
+
+def ruta_por_hash(directorio: str, digest: str, ext: str) -> str:
+    partes = [digest[i * ANCHO_NIVEL:(i + 1) * ANCHO_NIVEL] for i in range(NIVELES)]
+    return posixpath.join(directorio, *partes, f"{digest}{ext}")
+
+
+@deconstructible
+class AlmacenamientoPorContenido(FileSystemStorage):
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            from django.core.files import File
+            content = File(content, name)
+
+        directorio = posixpath.dirname(name.replace("\\", "/"))
+        ext = os.path.splitext(name)[1].lower()
+
+        tmp, digest = self._copiar_a_temporal(content)
+        try:
+            nombre = ruta_por_hash(directorio, digest, ext)
+            if max_length is not None and len(nombre) > max_length:
+                raise SuspiciousFileOperation(
+                    f"El nombre '{nombre}' supera el largo máximo ({max_length})."
+                )
+            destino = self.path(nombre)
+            if os.path.exists(destino):
+                os.unlink(tmp)          # mismos bytes ya guardados: deduplicado
+                # Renovar mtime: `limpiar_media` respeta un período de gracia por
+                # fecha y este archivo vuelve a estar en uso aunque sea viejo
+                os.utime(destino)
+            else:
+                self._crear_directorio(os.path.dirname(destino))
+                if self.file_permissions_mode is not None:
+                    os.chmod(tmp, self.file_permissions_mode)
+                os.replace(tmp, destino)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return nombre
+
+    def _copiar_a_temporal(self, content):
+        """Copia por bloques a MEDIA_ROOT/.tmp calculando el sha256 a la vez."""
+        directorio_tmp = os.path.join(self.location, DIRECTORIO_TEMPORAL)
+        self._crear_directorio(directorio_tmp)
+        fd, tmp = tempfile.mkstemp(dir=directorio_tmp)
+        sha = hashlib.sha256()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for bloque in content.chunks():
+                    if isinstance(bloque, str):
+                        bloque = bloque.encode()
+                    sha.update(bloque)
+                    f.write(bloque)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return tmp, sha.hexdigest()
+
+    def _crear_directorio(self, directorio):
+        if self.directory_permissions_mode is not None:
+            # Igual que FileSystemStorage: el umask no debe recortar el modo pedido
+            umask_anterior = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directorio, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(umask_anterior)
+        else:
+            os.makedirs(directorio, exist_ok=True)
@@ -0,0 +1,15 @@
+# portal_mascotas/templatetags/idempotencia.py
+import uuid
+
+from django import template
+from django.utils.html import format_html
+
+from portal_mascotas.idempotencia import CAMPO
+
+register = template.Library()
+
+
+@register.simple_tag
+def campo_idempotencia():
+    """<input hidden> con una clave nueva por cada render del formulario (ver portal_mascotas.idempotencia)."""
+    return format_html('<input type="hidden" name="{}" value="{}">', CAMPO, uuid.uuid4().hex)
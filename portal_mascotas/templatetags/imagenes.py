@@ -0,0 +1,40 @@
+# portal_mascotas/templatetags/imagenes.py
+from django import template
+from django.utils.html import format_html
+
+from portal_mascotas.imagenes import srcset, url_variante
+
+register = template.Library()
+
+# `sizes` por defecto según el uso (ancho CSS aproximado en que se muestra)
+SIZES = {
+    "thumb": "160px",
+    "card": "(max-width: 600px) 100vw, 320px",
+    "detail": "(max-width: 1100px) 100vw, 1024px",
+}
+
+
+@register.simple_tag
+def imagen_responsive(archivo, variantes, tam="card", alt="", sizes="", loading="lazy", clase=""):
+    """
+    <picture> con srcset WebP + JPEG de respaldo. Sin variantes (aún no
+    generadas o imagen no procesable) devuelve un <img> al original.
+
+        {% imagen_responsive m.foto m.foto_variantes "card" alt=m.nombre %}
+    """
+    if not archivo:
+        return ""
+    sizes = sizes or SIZES.get(tam, SIZES["card"])
+    src = url_variante(archivo, variantes, tam, "jpg")
+    webp, jpg = srcset(archivo, variantes, "webp"), srcset(archivo, variantes, "jpg")
+    if not jpg:
+        return format_html(
+            '<img src="{}" alt="{}" loading="{}" class="{}">', src, alt, loading, clase
+        )
+    return format_html(
+        '<picture class="ap-picture">'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" loading="{}" class="{}">'
+        "</picture>",
+        webp, sizes, src, jpg, sizes, alt, loading, clase,
+    )
@@ -0,0 +1,965 @@
+import csv
+import gzip
+import importlib
+import json
+import os
+import smtplib
+import tempfile
+import time
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import Category, Comment, Post, Tag
+from portal_mascotas import admin_rendimiento, cache_paginas, correos, imagenes, limites, paginacion, texto, trabajos
+from portal_mascotas.bench import sembrar_mascotas
+from portal_mascotas.models import CorreoPendiente, TrabajoImagen
+from registro_mascotas import facetas, publicaciones
+from registro_mascotas.models import Mascota, SolicitudPublicacion
+from solicitud_adopcion import respuestas
+from solicitud_adopcion.models import SolicitudAdopcion
+
+# Consultas máximas por vista (incluye usuario autenticado y la sesión si SESION_PERFIL=db)
+PRESUPUESTO_VISTAS = {
+    "home": 4,
+    "blog:post_list": 4,
+    "blog:post_detail": 5,
+    "solicitud_adopcion:lista_solicitudes": 3,
+    "solicitud_adopcion:detalle_solicitud": 3,
+    "solicitud_adopcion:responder_solicitud": 3,
+    "solicitud_adopcion:bandeja": 4,
+    "registro_mascotas:mis_solicitudes": 3,
+    "login:profile": 2,
+}
+# Changelists del admin; los modelos registrados que falten aquí usan el valor por defecto
+PRESUPUESTO_CHANGELISTS = {
+    "registro_mascotas.mascota": 7,
+    "registro_mascotas.solicitudpublicacion": 7,
+    "blog.post": 7,
+    "login.usuario": 6,
+    "portal_mascotas.trabajoimagen": 6,
+    "portal_mascotas.correopendiente": 6,
+}
+PRESUPUESTO_CHANGELIST_POR_DEFECTO = 5
+# Render con el volumen grande; holgado para no depender de la máquina
+TIEMPO_MAX_MS = 1500
+
+
+class PresupuestoConsultasVistasTests(TestCase):
+    """
+    Cada vista se pide con pocos datos y luego con un volumen mayor: la
+    cantidad de consultas debe ser la misma (sin N+1) y no pasar del
+    presupuesto, y el render debe quedar bajo TIEMPO_MAX_MS.
+    """
+    POCAS, MUCHAS = 3, 150
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.yo = User.objects.create_superuser("yo", "yo@example.com", "x")
+        cls.categoria = Category.objects.create(name="General", slug="general")
+        cls.tags = [Tag.objects.create(name=f"tag{i}", slug=f"tag{i}") for i in range(3)]
+        cls.mia = Mascota.objects.create(
+            nombre="Mía", tipo="perro", raza="Mestizo", edad=30, sexo="hembra",
+            descripcion="x", ubicacion="Arica", responsable=cls.yo,
+        )
+
+    def setUp(self):
+        self.client.force_login(self.yo)
+
+    def sembrar(self, n):
+        """n mascotas de otros, n solicitudes enviadas y recibidas, n publicaciones y posts, n comentarios."""
+        User = get_user_model()
+        base = User.objects.count()
+        otros = User.objects.bulk_create([
+            User(username=f"otro{base + i}", email=f"otro{base + i}@example.com") for i in range(n)
+        ])
+        sembrar_mascotas(n, otros[0], semilla=base)
+        ajenas = Mascota.objects.exclude(responsable=self.yo).order_by("-id")[:n]
+        SolicitudAdopcion.objects.bulk_create(
+            [SolicitudAdopcion(usuario=self.yo, mascota=m, mensaje="Quiero adoptar") for m in ajenas]
+        )
+        SolicitudAdopcion.objects.bulk_create(
+            [SolicitudAdopcion(usuario=u, mascota=self.mia, mensaje="Me encantaría") for u in otros]
+        )
+        SolicitudPublicacion.objects.bulk_create([
+            SolicitudPublicacion(usuario=self.yo, nombre=f"Pub{i}", tipo="gato", raza="Mestizo", edad=6,
+                                 sexo="macho", descripcion="x", ubicacion="Valdivia")
+            for i in range(n)
+        ])
+        posts = Post.objects.bulk_create([
+            Post(title=f"Post {base + i}", slug=f"post-{base + i}", author=self.yo, category=self.categoria,
+                 content="Contenido", status="published", published_at=timezone.now())
+            for i in range(n)
+        ])
+        Post.tags.through.objects.bulk_create([
+            Post.tags.through(post_id=p.pk, tag_id=t.pk) for p in posts for t in self.tags
+        ])
+        primero = Post.objects.order_by("pk").first()
+        Comment.objects.bulk_create([
+            Comment(post=primero, name=f"Lector {i}", email="l@example.com", body="¡Bien!") for i in range(n)
+        ])
+
+    def urls_vistas(self):
+        enviada = SolicitudAdopcion.objects.filter(usuario=self.yo).order_by("pk").first()
+        recibida = SolicitudAdopcion.objects.filter(mascota=self.mia).order_by("pk").first()
+        return {
+            "home": reverse("home"),
+            "blog:post_list": reverse("blog:post_list"),
+            "blog:post_detail": reverse("blog:post_detail", args=[Post.objects.order_by("pk").first().slug]),
+            "solicitud_adopcion:lista_solicitudes": reverse("solicitud_adopcion:lista_solicitudes"),
+            "solicitud_adopcion:detalle_solicitud": reverse("solicitud_adopcion:detalle_solicitud", args=[enviada.pk]),
+            "solicitud_adopcion:responder_solicitud": reverse("solicitud_adopcion:responder_solicitud", args=[recibida.pk]),
+            "solicitud_adopcion:bandeja": reverse("solicitud_adopcion:bandeja"),
+            "registro_mascotas:mis_solicitudes": reverse("registro_mascotas:mis_solicitudes"),
+            "login:profile": reverse("login:profile"),
+        }
+
+    def urls_changelists(self):
+        return {
+            modelo._meta.label_lower: reverse(f"admin:{modelo._meta.app_label}_{modelo._meta.model_name}_changelist")
+            for modelo in admin.site._registry
+        }
+
+    def medir(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            inicio = time.perf_counter()
+            resp = self.client.get(url)
+            ms = (time.perf_counter() - inicio) * 1000
+        self.assertEqual(resp.status_code, 200, url)
+        return len(ctx), ms
+
+    def comprobar(self, urls, presupuesto):
+        self.sembrar(self.POCAS)
+        pocas = {nombre: self.medir(url)[0] for nombre, url in urls().items()}
+        self.sembrar(self.MUCHAS)
+        for nombre, url in urls().items():
+            with self.subTest(vista=nombre):
+                consultas, ms = self.medir(url)
+                self.assertLessEqual(consultas, presupuesto(nombre), f"{nombre}: {consultas} consultas")
+                self.assertEqual(consultas, pocas[nombre], f"{nombre}: las consultas crecen con las filas")
+                self.assertLess(ms, TIEMPO_MAX_MS, f"{nombre}: {ms:.0f} ms")
+
+    def test_vistas(self):
+        self.comprobar(self.urls_vistas, PRESUPUESTO_VISTAS.__getitem__)
+
+    def test_changelists_del_admin(self):
+        self.comprobar(
+            self.urls_changelists,
+            lambda label: PRESUPUESTO_CHANGELISTS.get(label, PRESUPUESTO_CHANGELIST_POR_DEFECTO),
+        )
+
+
+class BackendContador(EmailBackend):
+    """locmem que cuenta las conexiones abiertas y puede fallar a pedido."""
+    aperturas = 0
+    fallar_con = None
+
+    def open(self):
+        if not getattr(self, "abierta", False):
+            self.abierta = True
+            BackendContador.aperturas += 1
+        return True
+
+    def close(self):
+        self.abierta = False
+
+    def send_messages(self, mensajes):
+        if BackendContador.fallar_con:
+            raise BackendContador.fallar_con
+        return super().send_messages(mensajes)
+
+
+@override_settings(EMAIL_BACKEND="portal_mascotas.tests.BackendContador")
+class CorreosTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.responsable = User.objects.create_user("resp", "resp@example.com", "x")
+        cls.adoptantes = [User.objects.create_user(f"a{i}", f"a{i}@example.com", "x") for i in range(3)]
+        cls.mascota = Mascota.objects.create(
+            nombre="Luna", tipo="gato", raza="Mestizo", edad=8, sexo="hembra",
+            descripcion="x", ubicacion="Valdivia", responsable=cls.responsable,
+        )
+
+    def setUp(self):
+        cache.clear()
+        BackendContador.aperturas, BackendContador.fallar_con = 0, None
+
+    def enviar(self):
+        call_command("enviar_correos", "--una-vez", stdout=StringIO(), stderr=StringIO())
+
+    def test_crear_y_responder_encolan_en_la_transaccion(self):
+        self.client.force_login(self.adoptantes[0])
+        with self.assertLogs("solicitud_adopcion", "INFO"):
+            self.client.post(reverse("solicitud_adopcion:crear_rapida", args=[self.mascota.pk]), {"mensaje": "Hola"})
+        self.assertEqual(list(CorreoPendiente.objects.values_list("destinatario", "evento")),
+                         [("resp@example.com", "solicitud_nueva")])
+        self.assertEqual(mail.outbox, [])   # nada se envía dentro del request
+
+        otras = SolicitudAdopcion.objects.bulk_create(
+            [SolicitudAdopcion(usuario=u, mascota=self.mascota, mensaje="x") for u in self.adoptantes[1:]]
+        )
+        respuestas.aprobar(otras[0], "¡Bienvenida!")
+        avisos = dict(CorreoPendiente.objects.exclude(evento="solicitud_nueva").values_list("destinatario", "evento"))
+        self.assertEqual(avisos, {
+            "a0@example.com": "solicitud_rechazada",
+            "a1@example.com": "solicitud_aprobada",
+            "a2@example.com": "solicitud_rechazada",
+        })
+
+    def test_sin_cambio_de_estado_no_hay_aviso(self):
+        solicitud = SolicitudAdopcion.objects.create(usuario=self.adoptantes[0], mascota=self.mascota, mensaje="x")
+        respuestas.rechazar(solicitud, "No")
+        with self.assertRaises(respuestas.SolicitudNoVigente):
+            respuestas.rechazar(solicitud, "No")
+        self.assertEqual(CorreoPendiente.objects.count(), 1)
+
+    def test_publicaciones_avisan_al_usuario(self):
+        datos = dict(tipo="perro", raza="x", edad=3, sexo="macho", descripcion="x", ubicacion="Arica")
+        aprobada = SolicitudPublicacion.objects.create(usuario=self.adoptantes[0], nombre="Toby", **datos)
+        rechazada = SolicitudPublicacion.objects.create(usuario=self.adoptantes[1], nombre="Rex", **datos)
+        publicaciones.aprobar(SolicitudPublicacion.objects.filter(pk=aprobada.pk))
+        publicaciones.rechazar(SolicitudPublicacion.objects.filter(pk=rechazada.pk), "Fotos borrosas")
+        publicaciones.rechazar(SolicitudPublicacion.objects.filter(pk=rechazada.pk), "Otra vez")
+        self.assertEqual(
+            list(CorreoPendiente.objects.order_by("pk").values_list("destinatario", "evento")),
+            [("a0@example.com", "publicacion_aprobada"), ("a1@example.com", "publicacion_rechazada")],
+        )
+        self.assertIn("Fotos borrosas", CorreoPendiente.objects.get(evento="publicacion_rechazada").cuerpo)
+
+    def test_agrupa_por_destinatario_en_una_conexion(self):
+        correos.encolar_lote([
+            ("a0@example.com", "Uno", "primero", "x"),
+            ("a0@example.com", "Dos", "segundo", "x"),
+            ("a1@example.com", "Tres", "tercero", "x"),
+            ("", "Sin email", "se descarta", "x"),
+        ])
+        self.enviar()
+        self.assertEqual(BackendContador.aperturas, 1)
+        por_destinatario = {m.to[0]: m for m in mail.outbox}
+        self.assertEqual(len(mail.outbox), 2)
+        agrupado = por_destinatario["a0@example.com"]
+        self.assertEqual(agrupado.subject, correos.ASUNTO_AGRUPADO.format(n=2))
+        self.assertLess(agrupado.body.index("primero"), agrupado.body.index("segundo"))
+        self.assertEqual(por_destinatario["a1@example.com"].subject, "Tres")
+        self.assertEqual(CorreoPendiente.objects.filter(estado="enviado").count(), 3)
+
+    def test_reintento_con_espera_y_error_permanente(self):
+        correos.encolar("a0@example.com", "Hola", "x")
+        BackendContador.fallar_con = smtplib.SMTPServerDisconnected("se cayó")
+        self.enviar()
+        c = CorreoPendiente.objects.get()
+        self.assertEqual((c.estado, c.intentos), ("pendiente", 1))
+        self.assertGreater(c.ejecutar_desde, timezone.now())
+        self.enviar()   # todavía en espera: no se toma
+        self.assertEqual(CorreoPendiente.objects.get().intentos, 1)
+
+        CorreoPendiente.objects.update(ejecutar_desde=timezone.now())
+        BackendContador.fallar_con = smtplib.SMTPRecipientsRefused({"a0@example.com": (550, b"no existe")})
+        self.enviar()
+        self.assertEqual(CorreoPendiente.objects.get().estado, "error")
+        self.assertEqual(mail.outbox, [])
+
+
+class SesionesTests(TestCase):
+
+    def test_cached_db_no_consulta_la_tabla_por_request(self):
+        usuario = get_user_model().objects.create_user("ses", "ses@example.com", "x")
+        with self.settings(SESSION_ENGINE="django.contrib.sessions.backends.cached_db"):
+            self.client.force_login(usuario)
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.get(reverse("login:profile"))
+        self.assertEqual(resp.context["user"], usuario)
+        self.assertFalse([q for q in ctx if "django_session" in q["sql"]])
+
+    def test_limpiar_sesiones_borra_solo_vencidas_en_lotes(self):
+        for i in range(7):
+            s = SessionStore()
+            s.set_expiry(-60 if i < 5 else 3600)
+            s.create()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("limpiar_sesiones", "--lote", "2", stdout=StringIO())
+        self.assertEqual(Session.objects.count(), 2)
+        self.assertEqual(len([q for q in ctx if q["sql"].startswith("DELETE")]), 3)
+
+    def test_cache_de_sesiones_fuera_de_tmp(self):
+        # Los tests no escriben archivos de sesión (pickle) en ningún directorio
+        self.assertEqual(settings.CACHES["sesiones"]["BACKEND"], "django.core.cache.backends.locmem.LocMemCache")
+        with mock.patch.dict(os.environ, {"SESION_CACHE": "archivos"}), mock.patch("sys.argv", ["manage.py"]):
+            os.environ.pop("SESION_CACHE_DIR", None)
+            from portal_mascotas import settings as modulo
+            importlib.reload(modulo)
+        sesiones = modulo.CACHES["sesiones"]
+        self.assertEqual(sesiones["BACKEND"], "django.core.cache.backends.filebased.FileBasedCache")
+        self.assertEqual(sesiones["LOCATION"], settings.BASE_DIR / ".cache" / "sesiones")
+
+
+class LimitesTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_ventana_deslizante(self):
+        t0 = 1_000_020.0   # múltiplo de 60: comienzo de ventana
+        for i in range(3):
+            self.assertEqual(limites.registrar("x", "ip1", 3, 60, ahora=t0 + i), 0)
+        self.assertEqual(limites.registrar("x", "ip1", 3, 60, ahora=t0 + 10), 50)   # hasta la próxima ventana
+        self.assertEqual(limites.registrar("x", "ip2", 3, 60, ahora=t0 + 10), 0)    # otra identidad
+
+        cache.clear()
+        for quien in ("ip1", "ip2"):
+            for i in range(3):
+                limites.registrar("x", quien, 3, 60, ahora=t0 + 50 + i)
+        # Recién empezada la ventana siguiente la anterior todavía pesa casi entera…
+        self.assertGreater(limites.registrar("x", "ip1", 3, 60, ahora=t0 + 61), 0)
+        # …y a mitad de ventana deja pasar una más (1 + 3 * 0.5 <= 3)
+        self.assertEqual(limites.registrar("x", "ip2", 3, 60, ahora=t0 + 90), 0)
+
+    def test_lejos_del_limite_una_sola_ida_a_la_cache(self):
+        with mock.patch.object(limites, "cache", wraps=cache) as espia:
+            limites.registrar("x", "ip1", 100, 60)
+            limites.registrar("x", "ip1", 100, 60)
+        self.assertFalse(espia.get.called)
+        self.assertEqual(espia.incr.call_count, 2)
+
+    @override_settings(LIMITES_TASA={"login": (2, 60)})
+    def test_login_responde_429_y_no_cuenta_los_get(self):
+        url = reverse("login:login")
+        for _ in range(3):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        datos = {"username": "nadie", "password": "x"}
+        self.assertEqual(self.client.post(url, datos).status_code, 200)
+        self.assertEqual(self.client.post(url, datos).status_code, 200)
+        resp = self.client.post(url, datos)
+        self.assertEqual(resp.status_code, 429)
+        self.assertGreater(int(resp["Retry-After"]), 0)
+        # Otra IP no está limitada
+        self.assertEqual(self.client.post(url, datos, REMOTE_ADDR="10.0.0.9").status_code, 200)
+
+    @override_settings(LIMITES_TASA_CABECERA_IP="HTTP_X_FORWARDED_FOR")
+    def test_ip_desde_la_derecha_de_x_forwarded_for(self):
+        # El cliente puede inventar lo de la izquierda; los proxies propios agregan a la derecha
+        peticion = RequestFactory().get("/", HTTP_X_FORWARDED_FOR="6.6.6.6, 200.1.1.1, 10.0.0.2",
+                                        REMOTE_ADDR="10.0.0.3")
+        for proxies, ip in ((1, "10.0.0.2"), (2, "200.1.1.1"), (5, "6.6.6.6")):
+            with self.subTest(proxies=proxies), self.settings(LIMITES_TASA_PROXIES=proxies):
+                self.assertEqual(limites._ip(peticion), ip)
+        self.assertEqual(limites._ip(RequestFactory().get("/", REMOTE_ADDR="10.0.0.3")), "10.0.0.3")
+
+    @override_settings(LIMITES_TASA={"login": (100, 60), "login_cuenta": (2, 60)})
+    def test_login_limitado_por_cuenta_desde_cualquier_ip(self):
+        url = reverse("login:login")
+        for i, nombre in enumerate(("Nadie", " nadie ")):
+            resp = self.client.post(url, {"username": nombre, "password": "x"}, REMOTE_ADDR=f"10.0.1.{i}")
+            self.assertEqual(resp.status_code, 200)
+        resp = self.client.post(url, {"username": "NADIE", "password": "x"}, REMOTE_ADDR="10.0.1.9")
+        self.assertEqual(resp.status_code, 429)
+        # Otra cuenta sigue libre y el nombre no queda en las claves de la caché
+        self.assertEqual(self.client.post(url, {"username": "otra", "password": "x"}).status_code, 200)
+        self.assertFalse([k for k in cache._cache if "nadie" in k.lower()])
+
+    @override_settings(LIMITES_TASA={"login": (100, 60), "login_cuenta": (2, 60)},
+                       PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+    def test_login_por_cuenta_cuenta_solo_fallos_y_cuesta_dos_idas(self):
+        get_user_model().objects.create_user("duena", "duena@example.com", "clave-buena")
+        url = reverse("login:login")
+        buena = {"username": "duena", "password": "clave-buena"}
+        with mock.patch.object(limites, "cache", wraps=cache) as espia:
+            for _ in range(3):
+                self.assertEqual(self.client.post(url, buena).status_code, 302)
+                self.client.logout()
+        # Por login: incr de la IP y get_many (ventana actual y anterior) de la cuenta
+        self.assertEqual((espia.incr.call_count, espia.get_many.call_count), (3, 3))
+        self.assertFalse(espia.get.called)
+
+        with mock.patch.object(limites, "cache", wraps=cache) as espia:
+            self.assertEqual(self.client.post(url, {**buena, "password": "mala"}).status_code, 200)
+        self.assertEqual(espia.incr.call_count, 2)   # el fallo suma en la cuenta
+        self.client.post(url, {**buena, "password": "mala"})
+        self.assertEqual(self.client.post(url, buena).status_code, 429)
+
+
+class PerfilSqliteTests(SimpleTestCase):
+
+    def test_pragmas_de_produccion_al_conectar(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            datos = {**connection.settings_dict, "NAME": os.path.join(directorio, "perfil.sqlite3")}
+            with override_settings(SQLITE_PRAGMAS=settings.SQLITE_PRAGMAS_PRODUCCION):
+                conexion = DatabaseWrapper(datos, alias="perfil_sqlite")
+                try:
+                    with conexion.cursor() as cursor:
+                        leidos = {}
+                        for pragma in ("journal_mode", "synchronous", "busy_timeout", "foreign_keys"):
+                            cursor.execute(f"PRAGMA {pragma}")
+                            leidos[pragma] = cursor.fetchone()[0]
+                finally:
+                    conexion.close()
+        self.assertEqual(leidos, {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000, "foreign_keys": 1})
+
+
+def nueva_mascota(responsable, **campos):
+    datos = {"nombre": "Toby", "tipo": "perro", "raza": "Mestizo", "edad": 12, "sexo": "macho",
+             "descripcion": "Juguetón", "ubicacion": "Santiago - Ñuñoa", **campos}
+    return Mascota.objects.create(responsable=responsable, **datos)
+
+
+class PaginacionKeysetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("pag", "pag@example.com", "x")
+        for i in range(60):
+            nueva_mascota(cls.usuario, nombre=f"M{i}")
+        # Todas con la misma fecha: el desempate lo hace el id
+        Mascota.objects.update(fecha_registro=timezone.now())
+
+    def setUp(self):
+        # Con sesión iniciada la home no pasa por la caché de páginas
+        self.client.force_login(self.usuario)
+
+    def pagina(self, **params):
+        resp = self.client.get(reverse("home"), params)
+        self.assertEqual(resp.status_code, 200)
+        return resp.context["pagina"]
+
+    def test_recorre_todo_sin_repetir_con_empates(self):
+        vistos, cursor, paginas = [], "", 0
+        while True:
+            pagina = self.pagina(tipo="perro", cursor=cursor)
+            vistos += [m.pk for m in pagina]
+            paginas += 1
+            if not pagina.tiene_siguiente:
+                break
+            cursor = pagina.siguiente
+        self.assertEqual(paginas, 3)
+        self.assertEqual(vistos, list(Mascota.objects.order_by("-id").values_list("pk", flat=True)))
+
+    def test_cursor_ida_y_vuelta(self):
+        valores = ["2025-01-02T03:04:05+00:00", 17]
+        self.assertEqual(paginacion.decodificar_cursor(paginacion.codificar_cursor(valores), 2), valores)
+        self.assertIsNone(paginacion.decodificar_cursor(paginacion.codificar_cursor(valores), 3))
+
+    def test_cursor_manipulado_vuelve_a_la_primera_pagina(self):
+        primera = self.pagina()
+        segunda = self.pagina(cursor=primera.siguiente)
+        self.assertFalse(segunda.es_primera)
+        cuerpo, firma = primera.siguiente.rsplit(":", 1)
+        for cursor in ("basura", cuerpo + ":" + firma[::-1],
+                       paginacion.codificar_cursor([1])):   # firma válida, largo incorrecto
+            with self.subTest(cursor=cursor):
+                pagina = self.pagina(cursor=cursor)
+                self.assertTrue(pagina.es_primera)
+                self.assertEqual([m.pk for m in pagina], [m.pk for m in primera])
+
+    def test_desplazamiento_con_tope_y_cursor_fuera_de_rango(self):
+        qs, orden = Mascota.objects.all(), ("-id",)
+        todas = list(qs.order_by("-id").values_list("pk", flat=True))
+        primera = paginacion.paginar_desplazamiento(qs, orden=orden, por_pagina=24, tope=50)
+        segunda = paginacion.paginar_desplazamiento(qs, primera.siguiente, orden=orden, por_pagina=24, tope=50)
+        tercera = paginacion.paginar_desplazamiento(qs, segunda.siguiente, orden=orden, por_pagina=24, tope=50)
+        self.assertEqual([m.pk for p in (primera, segunda, tercera) for m in p], todas[:50])
+        self.assertFalse(tercera.tiene_siguiente)
+        for cursor in (paginacion.codificar_cursor([50]), paginacion.codificar_cursor([-3]), "basura"):
+            with self.subTest(cursor=cursor):
+                pagina = paginacion.paginar_desplazamiento(qs, cursor, orden=orden, por_pagina=24, tope=50)
+                self.assertTrue(pagina.es_primera)
+
+    def test_sin_offset_ni_count(self):
+        primera = self.pagina()
+        with CaptureQueriesContext(connection) as ctx:
+            self.pagina(cursor=primera.siguiente)
+        sql = " ".join(q["sql"] for q in ctx).upper()
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("OFFSET", sql)
+
+
+class BusquedaSinTildesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("tildes", "tildes@example.com", "x")
+        cls.mascota = nueva_mascota(cls.usuario, nombre="Ñandú", tipo="ave", raza="Pingüino",
+                                    ubicacion="Viña del Mar")
+        nueva_mascota(cls.usuario, nombre="Otro", ubicacion="Arica")
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def encontradas(self, **params):
+        return [m.pk for m in self.client.get(reverse("home"), params).context["pagina"]]
+
+    def test_normalizar(self):
+        self.assertEqual(texto.normalizar("Copiapó ÑUÑOA"), "copiapo nunoa")
+        self.assertEqual(texto.normalizar(None), "")
+
+    def test_filtros_ignoran_tildes_y_mayusculas(self):
+        self.assertEqual(self.encontradas(ubic="VINA del mar"), [self.mascota.pk])
+        self.assertEqual(self.encontradas(q="NANDU"), [self.mascota.pk])
+        self.assertEqual(self.encontradas(q="pinguino"), [self.mascota.pk])
+
+    def test_columna_norm_al_guardar_con_update_fields(self):
+        self.mascota.ubicacion = "Concón"
+        self.mascota.save(update_fields=["ubicacion"])
+        self.assertEqual(Mascota.objects.get(pk=self.mascota.pk).ubicacion_norm, "concon")
+
+
+class CacheHomeTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("cache", "cache@example.com", "x")
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, **params):
+        return self.client.get(reverse("home"), params)
+
+    def test_hit_con_parametros_en_otro_orden_o_desconocidos(self):
+        self.assertEqual(self.get(tipo="perro", q="")["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            resp = self.get(q="", tipo="perro", utm_source="x")
+        self.assertEqual(resp["X-Cache"], "HIT")
+        self.assertEqual(self.get(tipo="gato")["X-Cache"], "MISS")
+
+    def test_invalidacion(self):
+        self.get(tipo="perro")
+        with self.captureOnCommitCallbacks(execute=True):
+            mascota = nueva_mascota(self.usuario, nombre="Cachito")
+        resp = self.get(tipo="perro")
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertContains(resp, "Cachito")
+
+        # Un update() directo no pasa por las señales: la página sigue en caché
+        with self.captureOnCommitCallbacks(execute=True):
+            Mascota.objects.filter(pk=mascota.pk).update(descripcion="Otra")
+        self.assertEqual(self.get(tipo="perro")["X-Cache"], "HIT")
+
+        # Los caminos masivos sí invalidan
+        with self.captureOnCommitCallbacks(execute=True):
+            facetas.cambiar_estado(Mascota.objects.all(), "adoptado")
+        resp = self.get(tipo="perro")
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertNotContains(resp, "Cachito")
+
+    def test_stale_mientras_otro_calcula(self):
+        self.assertEqual(self.get(tipo="gato")["X-Cache"], "MISS")
+        cache_paginas.invalidar_home()
+        h = cache_paginas.clave_parametros(self.get(tipo="gato").wsgi_request)
+        cache_paginas.invalidar_home()
+        # Simula otro proceso con el candado de la generación nueva tomado
+        cache.add(f"home:{cache_paginas.generacion()}:{h}:calculando", 1, 10)
+        self.assertEqual(self.get(tipo="gato")["X-Cache"], "STALE")
+
+    def test_no_cachea_con_sesion_ni_post(self):
+        self.client.force_login(self.usuario)
+        self.assertFalse(self.get().has_header("X-Cache"))
+        self.client.logout()
+        self.assertFalse(self.client.post(reverse("home")).has_header("X-Cache"))
+
+
+def imagen_jpeg(ancho=2000, alto=1500, orientacion=None):
+    exif = Image.Exif()
+    if orientacion:
+        exif[0x0112] = orientacion   # Orientation
+        exif[0x010F] = "Cámara"      # Make
+    buffer = BytesIO()
+    Image.new("RGB", (ancho, alto), (200, 30, 30)).save(buffer, "JPEG", exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+class MediaTemporalMixin:
+    """MEDIA_ROOT en un directorio temporal nuevo para cada test."""
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+
+@override_settings(IMAGENES_EN_SEGUNDO_PLANO=False)
+class VariantesImagenTests(MediaTemporalMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("img", "img@example.com", "x")
+
+    def test_variantes_con_orientacion_y_sin_metadatos(self):
+        m = nueva_mascota(self.usuario, foto=SimpleUploadedFile("a.jpg", imagen_jpeg(orientacion=6)))
+        m.refresh_from_db()
+        variantes = m.foto_variantes
+        self.assertEqual(variantes["origen"], m.foto.name)
+        self.assertEqual(set(variantes["webp"]), {"160", "480", "1024"})
+        with default_storage.open(variantes["jpg"]["480"]) as f, Image.open(f) as img:
+            # Orientation=6: la foto apaisada queda vertical
+            self.assertEqual(img.size, (480, 640))
+            self.assertFalse(img.getexif())
+        self.client.force_login(self.usuario)
+        resp = self.client.get(reverse("home"))
+        self.assertContains(resp, "image/webp")
+        self.assertContains(resp, "480w")
+
+    def test_foto_chica_no_se_amplia(self):
+        m = nueva_mascota(self.usuario, foto=SimpleUploadedFile("b.png", imagen_jpeg(100, 80)))
+        self.assertEqual(list(m.foto_variantes["jpg"]), ["100"])
+        self.assertEqual(imagenes.anchos_para(300), [160, 300])
+
+    def test_misma_raiz_con_otra_extension_no_se_pisan(self):
+        rutas = {
+            imagenes.ruta_variante(nombre, 480, "webp")
+            for nombre in ("mascotas/toby.jpg", "mascotas/toby.png", "mascotas/toby")
+        }
+        self.assertEqual(len(rutas), 3)
+        self.assertIn("variantes/mascotas/toby.jpg-480.webp", rutas)
+
+        # Nombres planos, como los archivos subidos antes del storage por contenido
+        def guardar_plano(nombre, contenido, **kwargs):
+            return FileSystemStorage.save(default_storage, nombre, contenido, **kwargs)
+
+        with mock.patch.object(default_storage, "save", guardar_plano):
+            jpg = nueva_mascota(self.usuario, foto=SimpleUploadedFile("toby.jpg", imagen_jpeg(600, 400)))
+            png = nueva_mascota(self.usuario, foto=SimpleUploadedFile("toby.png", imagen_jpeg(500, 400)))
+        self.assertNotEqual(jpg.foto_variantes["jpg"]["480"], png.foto_variantes["jpg"]["480"])
+        with default_storage.open(jpg.foto_variantes["jpg"]["480"]) as f, Image.open(f) as img:
+            self.assertEqual(img.size, (480, 320))
+
+    def test_archivo_invalido_usa_el_original(self):
+        with self.assertLogs("portal_mascotas.imagenes", "WARNING"):
+            m = nueva_mascota(self.usuario, foto=SimpleUploadedFile("c.jpg", b"no es una imagen"))
+        self.assertEqual(m.foto_variantes, {})
+        self.client.force_login(self.usuario)
+        self.assertContains(self.client.get(reverse("home")), m.foto.url)
+
+
+class ColaImagenesTests(MediaTemporalMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("cola", "cola@example.com", "x")
+
+    def procesar(self):
+        call_command("procesar_imagenes", "--una-vez", "--procesos", "0", stdout=StringIO(), stderr=StringIO())
+
+    def estado(self, mascota):
+        return TrabajoImagen.objects.get(objeto_id=mascota.pk)
+
+    def test_save_encola_y_el_worker_completa(self):
+        m = nueva_mascota(self.usuario, foto=SimpleUploadedFile("a.jpg", imagen_jpeg(600, 400)))
+        self.assertEqual(Mascota.objects.get(pk=m.pk).foto_variantes, {})
+        # Cambiar la foto antes de procesar reutiliza el trabajo pendiente
+        m.foto = SimpleUploadedFile("b.jpg", imagen_jpeg(700, 400))
+        m.save()
+        self.assertEqual(TrabajoImagen.objects.count(), 1)
+        self.procesar()
+        self.assertEqual(self.estado(m).estado, "hecho")
+        self.assertEqual(Mascota.objects.get(pk=m.pk).foto_variantes["origen"], m.foto.name)
+
+    def test_imagenes_invalidas_fallan_sin_reintento(self):
+        bomba = BytesIO()
+        Image.new("1", (9000, 9000)).save(bomba, "PNG")
+        malas = [
+            nueva_mascota(self.usuario, foto=SimpleUploadedFile("bomba.png", bomba.getvalue())),
+            nueva_mascota(self.usuario, foto=SimpleUploadedFile("z.jpg", b"nada")),
+        ]
+        self.procesar()
+        for m in malas:
+            trabajo = self.estado(m)
+            self.assertEqual((trabajo.estado, trabajo.intentos), ("error", 1))
+        self.assertIn("demasiado grande", self.estado(malas[0]).error)
+
+    def test_error_transitorio_se_reintenta_con_espera(self):
+        m = nueva_mascota(self.usuario, foto=SimpleUploadedFile("q.jpg", imagen_jpeg(600, 400)))
+        default_storage.delete(m.foto.name)
+        self.procesar()
+        trabajo = self.estado(m)
+        self.assertEqual((trabajo.estado, trabajo.intentos), ("pendiente", 1))
+        self.assertIn("FileNotFound", trabajo.error)
+        self.assertGreater(trabajo.ejecutar_desde, timezone.now())
+        self.assertEqual(trabajos.tomar(10), [])
+
+    def test_tomar_no_reparte_dos_veces_y_libera_abandonados(self):
+        for i in range(3):
+            nueva_mascota(self.usuario, foto=SimpleUploadedFile(f"t{i}.jpg", imagen_jpeg(200 + i, 100)))
+        primero, segundo = trabajos.tomar(2), trabajos.tomar(2)
+        self.assertEqual((len(primero), len(segundo)), (2, 1))
+        self.assertEqual(trabajos.tomar(2), [])
+        TrabajoImagen.objects.update(tomado_en=timezone.now() - trabajos.TIEMPO_MAX_TOMADO * 2)
+        self.assertEqual(trabajos.liberar_abandonados(), 3)
+        self.assertEqual(len(trabajos.tomar(10)), 3)
+
+
+class RegenerarVariantesTests(MediaTemporalMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("regen", "regen@example.com", "x")
+
+    def setUp(self):
+        super().setUp()
+        self.mascotas = [
+            nueva_mascota(self.usuario, foto=SimpleUploadedFile(f"r{i}.jpg", imagen_jpeg(600 + i, 400)))
+            for i in range(4)
+        ]
+        TrabajoImagen.objects.all().delete()
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        self.checkpoint = os.path.join(directorio.name, "checkpoint.json")
+
+    def regenerar(self, *args):
+        salida = StringIO()
+        call_command("regenerar_variantes", "--procesos", "1", "--checkpoint", self.checkpoint,
+                     *args, stdout=salida, stderr=StringIO())
+        return salida.getvalue()
+
+    def con_variantes(self):
+        return Mascota.objects.exclude(foto_variantes={}).count()
+
+    def test_dry_run_informa_sin_escribir(self):
+        salida = self.regenerar("--dry-run", "--modelo", "registro_mascotas.Mascota")
+        self.assertIn("Imágenes medidas:           4", salida)
+        self.assertEqual(self.con_variantes(), 0)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_reanuda_desde_el_checkpoint(self):
+        with open(self.checkpoint, "w") as f:
+            f.write('{"registro_mascotas.Mascota": %d}' % self.mascotas[1].pk)
+        self.regenerar("--modelo", "registro_mascotas.Mascota")
+        self.assertEqual(self.con_variantes(), 2)
+        # Corrida completa: el checkpoint se borra y la siguiente empieza de cero
+        self.assertFalse(os.path.exists(self.checkpoint))
+        self.regenerar("--since", "2000-01-01")
+        self.assertEqual(self.con_variantes(), 4)
+
+    def test_checkpoint_en_base_dir_y_atado_a_las_opciones(self):
+        base = os.path.dirname(self.checkpoint)
+        ruta = os.path.join(base, ".regenerar_variantes.json")
+        with open(ruta, "w") as f:
+            json.dump({"_parametros": {"since": None, "modelos": ["registro_mascotas.Mascota"], "forzar": True},
+                       "registro_mascotas.Mascota": self.mascotas[2].pk}, f)
+        with self.settings(BASE_DIR=base):
+            with self.assertRaisesMessage(CommandError, "es de otra corrida"):
+                call_command("regenerar_variantes", "--procesos", "1", "--modelo", "registro_mascotas.Mascota",
+                             stdout=StringIO())
+            call_command("regenerar_variantes", "--procesos", "1", "--modelo", "registro_mascotas.Mascota",
+                         "--forzar", stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(self.con_variantes(), 1)
+        self.assertFalse(os.path.exists(ruta))
+
+    def test_forzar_y_since(self):
+        self.regenerar()
+        ruta = Mascota.objects.get(pk=self.mascotas[0].pk).foto_variantes["webp"]["480"]
+        default_storage.delete(ruta)
+        # Las variantes vigentes se saltan salvo con --forzar
+        self.regenerar()
+        self.assertFalse(default_storage.exists(ruta))
+        self.assertIn("0 imagen(es) por revisar", self.regenerar("--forzar", "--since", "2999-01-01"))
+        self.regenerar("--forzar")
+        self.assertTrue(default_storage.exists(ruta))
+
+
+class AlmacenamientoPorContenidoTests(MediaTemporalMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("cas", "cas@example.com", "x")
+
+    def archivos(self):
+        return sorted(
+            os.path.relpath(os.path.join(raiz, nombre), settings.MEDIA_ROOT)
+            for raiz, _, nombres in os.walk(settings.MEDIA_ROOT) for nombre in nombres
+        )
+
+    def test_mismos_bytes_un_solo_archivo(self):
+        datos = imagen_jpeg(300, 200)
+        mascotas = [nueva_mascota(self.usuario, foto=SimpleUploadedFile(f"X{i}.JPG", datos)) for i in range(3)]
+        nombres = {m.foto.name for m in mascotas}
+        self.assertEqual(len(nombres), 1)
+        nombre = nombres.pop()
+        self.assertRegex(nombre, r"^mascotas/([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.jpg$")
+        self.assertEqual(self.archivos(), [nombre])
+        # Los temporales de la copia no quedan
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, ".tmp")), [])
+
+        otra = nueva_mascota(self.usuario, foto=SimpleUploadedFile("X0.JPG", imagen_jpeg(301, 200)))
+        self.assertNotEqual(otra.foto.name, nombre)
+
+    def test_dedup_renueva_mtime(self):
+        datos = imagen_jpeg(300, 200)
+        primera = nueva_mascota(self.usuario, foto=SimpleUploadedFile("a.jpg", datos))
+        os.utime(primera.foto.path, (1, 1))
+        nueva_mascota(self.usuario, foto=SimpleUploadedFile("b.jpg", datos))
+        self.assertGreater(os.path.getmtime(primera.foto.path), time.time() - 60)
+
+
+@override_settings(IMAGENES_EN_SEGUNDO_PLANO=False)
+class LimpiarMediaTests(MediaTemporalMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("gc", "gc@example.com", "x")
+
+    def setUp(self):
+        super().setUp()
+        self.viva = nueva_mascota(self.usuario, foto=SimpleUploadedFile("a.jpg", imagen_jpeg(600, 400)))
+        borrada = nueva_mascota(self.usuario, foto=SimpleUploadedFile("b.jpg", imagen_jpeg(700, 400)))
+        self.huerfanos = [borrada.foto.path] + [
+            default_storage.path(r) for r in borrada.foto_variantes["webp"].values()
+        ]
+        borrada.delete()
+        os.makedirs(os.path.join(settings.MEDIA_ROOT, "blog"), exist_ok=True)
+        self.suelto = os.path.join(settings.MEDIA_ROOT, "blog", "x.png")
+        with open(self.suelto, "wb") as f:
+            f.write(b"x" * 1000)
+        self.huerfanos.append(self.suelto)
+
+    def envejecer(self):
+        for raiz, _, nombres in os.walk(settings.MEDIA_ROOT):
+            for nombre in nombres:
+                os.utime(os.path.join(raiz, nombre), (1, 1))
+
+    def limpiar(self, *args):
+        salida = StringIO()
+        call_command("limpiar_media", *args, stdout=salida)
+        return salida.getvalue()
+
+    def test_periodo_de_gracia(self):
+        self.assertIn("Dry-run: se recuperarían 0 B en 0 archivo(s)", self.limpiar("--dry-run"))
+        self.limpiar()
+        self.assertTrue(all(os.path.exists(r) for r in self.huerfanos))
+
+    def test_mueve_huerfanos_a_cuarentena_y_respeta_referencias(self):
+        self.envejecer()
+        self.assertIn("blog/x.png", self.limpiar("--dry-run", "--listar"))
+        self.assertTrue(os.path.exists(self.suelto))
+
+        self.limpiar()
+        self.assertFalse(any(os.path.exists(r) for r in self.huerfanos))
+        self.assertTrue(os.path.exists(self.viva.foto.path))
+        for ext in imagenes.FORMATOS:
+            for ruta in self.viva.foto_variantes[ext].values():
+                self.assertTrue(default_storage.exists(ruta), ruta)
+        cuarentena = os.path.join(settings.MEDIA_ROOT, ".cuarentena")
+        (lote,) = os.listdir(cuarentena)
+        self.assertTrue(os.path.exists(os.path.join(cuarentena, lote, "blog", "x.png")))
+
+        self.assertIn("Purgando cuarentena", self.limpiar("--purgar-dias", "0"))
+        self.assertEqual(os.listdir(cuarentena), [])
+
+    def test_no_toca_archivos_de_trabajos_pendientes(self):
+        with self.settings(IMAGENES_EN_SEGUNDO_PLANO=True):
+            pendiente = nueva_mascota(self.usuario, foto=SimpleUploadedFile("p.jpg", imagen_jpeg(650, 400)))
+        Mascota.objects.filter(pk=pendiente.pk).update(foto=None)
+        self.envejecer()
+        self.limpiar()
+        self.assertTrue(default_storage.exists(pendiente.foto.name))
+
+
+class ExportacionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.admin = User.objects.create_superuser("exp", "exp@example.com", "x")
+        usuarios = User.objects.bulk_create([User(username=f"u{i}", email=f"u{i}@example.com") for i in range(50)])
+        for i, u in enumerate(usuarios):
+            nueva_mascota(u, nombre=f"M{i}")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def exportar(self, url, formato, **datos):
+        resp = self.client.post(url, {"action": "accion_exportar", "formato_exportacion": formato,
+                                      "index": 0, **datos})
+        self.assertTrue(resp.streaming)
+        with CaptureQueriesContext(connection) as ctx:
+            contenido = b"".join(resp.streaming_content)
+        return resp, contenido, len(ctx)
+
+    def test_mascotas_csv_y_jsonl_gz_en_una_consulta(self):
+        url = reverse("admin:registro_mascotas_mascota_changelist")
+        ids = list(Mascota.objects.values_list("pk", flat=True))
+
+        resp, contenido, consultas = self.exportar(url, "csv", _selected_action=ids)
+        self.assertRegex(resp["Content-Disposition"], r'^attachment; filename="mascotas-\d{8}-\d{6}\.csv"$')
+        filas = list(csv.DictReader(contenido.decode().splitlines()))
+        self.assertEqual(len(filas), 50)
+        self.assertEqual(consultas, 1)   # FK en la misma consulta: sin N+1
+
+        resp, contenido, consultas = self.exportar(url, "jsonl.gz", _selected_action=ids)
+        self.assertEqual(resp["Content-Type"], "application/gzip")
+        filas = [json.loads(linea) for linea in gzip.decompress(contenido).decode().splitlines()]
+        self.assertEqual(len(filas), 50)
+        self.assertEqual((filas[0]["nombre"], filas[0]["responsable_username"]), ("M0", "u0"))
+        self.assertEqual(consultas, 1)
+
+    def test_seleccionar_todo(self):
+        url = reverse("admin:registro_mascotas_mascota_changelist")
+        _, contenido, _ = self.exportar(url, "jsonl", _selected_action=[0], select_across=1)
+        self.assertEqual(len(contenido.splitlines()), 50)
+        url = reverse("admin:solicitud_adopcion_solicitudadopcion_changelist")
+        _, contenido, _ = self.exportar(url, "csv", _selected_action=[0], select_across=1)
+        self.assertEqual(len(contenido.splitlines()), 1)   # solo encabezado
+
+
+class AdminRendimientoTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser("rend", "rend@example.com", "x")
+        mascotas = [Mascota(nombre=f"M{i}", tipo="perro", raza="x", edad=3, sexo="macho", descripcion="x",
+                            ubicacion="Arica", responsable=cls.admin) for i in range(30)]
+        Mascota.objects.bulk_create(mascotas)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_estimacion_no_se_queda_con_el_max_pk(self):
+        # Borrado masivo de las primeras: MAX(pk) seguiría diciendo 30
+        Mascota.objects.filter(pk__in=Mascota.objects.order_by("pk").values("pk")[:20]).delete()
+        self.assertEqual(admin_rendimiento.estimar_filas(Mascota), 10)
+        with mock.patch.object(admin_rendimiento, "TOPE_CONTEO", 5), self.assertNumQueries(0):
+            # Tabla "grande" sin filtros: la estimación cacheada, sin contar
+            self.assertEqual(admin_rendimiento.PaginadorEstimado(Mascota.objects.all(), 25).count, 10)
+
+    def test_filtro_de_fecha_en_los_changelists(self):
+        hoy = timezone.localdate()
+        mitad_anio_anterior = timezone.make_aware(timezone.datetime(hoy.year - 1, 7, 1, 12))
+        Mascota.objects.filter(nombre="M0").update(fecha_registro=mitad_anio_anterior)
+        self.client.force_login(self.admin)
+        for nombre in ("registro_mascotas_mascota", "registro_mascotas_solicitudpublicacion",
+                       "solicitud_adopcion_solicitudadopcion", "login_usuario"):
+            with self.subTest(changelist=nombre):
+                resp = self.client.get(reverse(f"admin:{nombre}_changelist"))
+                self.assertContains(resp, "Últimos 30 días")
+                self.assertContains(resp, "Año anterior")
+
+        url = reverse("admin:registro_mascotas_mascota_changelist")
+        cl = self.client.get(url).context["cl"]
+        filtro, = [f for f in cl.filter_specs if isinstance(f, admin_rendimiento.FiltroFecha)]
+        enlaces = {c["display"]: c["query_string"] for c in filtro.choices(cl)}
+        resp = self.client.get(url + enlaces["Año anterior"])
+        self.assertEqual([m.nombre for m in resp.context["cl"].result_list], ["M0"])
+        resp = self.client.get(url + enlaces["Últimos 30 días"])
+        self.assertEqual(resp.context["cl"].result_count, 29)
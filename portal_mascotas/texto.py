@@ -0,0 +1,24 @@
+# portal_mascotas/texto.py
+"""
+Normalización de texto para búsquedas sin tildes ni mayúsculas.
+
+Se aplica en Python al guardar (Mascota.ubicacion_norm) y a lo buscado; la
+búsqueda de texto libre pliega tildes en el propio índice FTS5
+(registro_mascotas.busqueda).
+"""
+import unicodedata
+
+
+def quitar_tildes(s):
+    """Quita tildes/diacríticos ("Viña" -> "Vina"). Conserva None."""
+    if s is None:
+        return None
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", s)
+        if not unicodedata.combining(c)
+    )
+
+
+def normalizar(s) -> str:
+    """Forma canónica para comparar: sin tildes y en minúsculas."""
+    return quitar_tildes(s or "").lower()
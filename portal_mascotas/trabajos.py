@@ -0,0 +1,149 @@
+# portal_mascotas/trabajos.py
+"""
+Cola de trabajos de imagen sobre la tabla TrabajoImagen.
+
+Flujo:
+  - save() del modelo -> imagenes.sincronizar_variantes -> encolar()
+    (la fila se inserta en la misma transacción que el objeto)
+  - `manage.py procesar_imagenes` -> tomar() lotes, ejecuta
+    procesar_archivo() en un pool de procesos y registra completar()/fallar()
+
+Reintentos: errores transitorios (E/S, storage) vuelven a 'pendiente' con
+espera exponencial; imágenes inválidas o rechazadas (formato, bomba de
+descompresión) fallan de inmediato. Un trabajo que quedó 'procesando' más de
+TIEMPO_MAX_TOMADO (worker muerto) se devuelve a la cola.
+"""
+import random
+import uuid
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from portal_mascotas import imagenes
+from portal_mascotas.models import TrabajoImagen
+
+MAX_INTENTOS = 5
+ESPERA_BASE_SEGUNDOS = 30
+ESPERA_MAX_SEGUNDOS = 60 * 60
+TIEMPO_MAX_TOMADO = timedelta(minutes=10)
+
+ERRORES_PERMANENTES = (UnidentifiedImageError, Image.DecompressionBombError, imagenes.ImagenRechazada)
+
+# Modelos cuyas imágenes aparecen en el home cacheado
+MODELOS_HOME = {"registro_mascotas.Mascota"}
+
+
+def encolar(instancia, campo, campo_variantes):
+    """Crea (o actualiza, si ya hay uno pendiente) el trabajo para este campo."""
+    datos = {
+        "archivo": getattr(instancia, campo).name,
+        "campo_variantes": campo_variantes,
+        "intentos": 0,
+        "ejecutar_desde": timezone.now(),
+        "error": "",
+    }
+    clave = {"modelo": instancia._meta.label, "objeto_id": instancia.pk, "campo": campo}
+    if not TrabajoImagen.objects.filter(estado="pendiente", **clave).update(**datos):
+        TrabajoImagen.objects.create(**clave, **datos)
+
+
+def encolar_lote(instancias, campo, campo_variantes):
+    """Como encolar(), para objetos recién creados con bulk_create (un solo INSERT)."""
+    ahora = timezone.now()
+    TrabajoImagen.objects.bulk_create([
+        TrabajoImagen(
+            modelo=i._meta.label, objeto_id=i.pk, campo=campo, campo_variantes=campo_variantes,
+            archivo=getattr(i, campo).name, ejecutar_desde=ahora,
+        )
+        for i in instancias
+    ])
+
+
+def espera_reintento(intentos: int) -> timedelta:
+    """30 s, 60 s, 120 s, ... (tope 1 h) con ±20 % de jitter."""
+    segundos = min(ESPERA_MAX_SEGUNDOS, ESPERA_BASE_SEGUNDOS * 2 ** max(intentos - 1, 0))
+    return timedelta(seconds=segundos * random.uniform(0.8, 1.2))
+
+
+def liberar_abandonados():
+    """Devuelve a la cola los trabajos tomados por un worker que no terminó."""
+    limite = timezone.now() - TIEMPO_MAX_TOMADO
+    abandonados = TrabajoImagen.objects.filter(estado="procesando", tomado_en__lt=limite)
+    abandonados.filter(intentos__gte=MAX_INTENTOS - 1).update(
+        estado="error", intentos=F("intentos") + 1, error="El worker no terminó el trabajo.",
+    )
+    return abandonados.update(estado="pendiente", intentos=F("intentos") + 1, tomado_por="")
+
+
+def tomar(cantidad: int):
+    """
+    Reserva hasta `cantidad` trabajos listos para este worker. La reserva es un
+    UPDATE condicionado a estado='pendiente' con un token único, así que dos
+    workers nunca toman el mismo trabajo.
+    """
+    ahora = timezone.now()
+    ids = list(
+        TrabajoImagen.objects.filter(estado="pendiente", ejecutar_desde__lte=ahora)
+        .order_by("ejecutar_desde", "id")
+        .values_list("id", flat=True)[:cantidad]
+    )
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    TrabajoImagen.objects.filter(id__in=ids, estado="pendiente").update(
+        estado="procesando", tomado_por=token, tomado_en=ahora,
+    )
+    return list(TrabajoImagen.objects.filter(tomado_por=token, estado="procesando"))
+
+
+def inicializar_proceso():
+    """Initializer del pool: con 'spawn' el hijo arranca sin Django configurado."""
+    import django
+    if not apps.ready:
+        django.setup()
+
+
+def procesar_archivo(nombre: str):
+    """
+    Trabajo pesado (corre en los procesos del pool): valida, decodifica,
+    genera y escribe las variantes. No toca la base de datos.
+    """
+    with default_storage.open(nombre, "rb") as f:
+        variantes, archivos = imagenes.renderizar(f, nombre)
+    imagenes.guardar_archivos(archivos, default_storage)
+    return variantes
+
+
+def completar(trabajo, variantes):
+    """
+    Guarda las variantes en el objeto (solo si sigue teniendo el mismo archivo)
+    y marca el trabajo como hecho. Devuelve True si el objeto se actualizó.
+    """
+    modelo = apps.get_model(trabajo.modelo)
+    with transaction.atomic():
+        actualizado = modelo._base_manager.filter(
+            pk=trabajo.objeto_id, **{trabajo.campo: trabajo.archivo}
+        ).update(**{trabajo.campo_variantes: variantes})
+        TrabajoImagen.objects.filter(pk=trabajo.pk).update(
+            estado="hecho", intentos=F("intentos") + 1, tomado_por="", error="",
+        )
+    return bool(actualizado)
+
+
+def fallar(trabajo, exc):
+    """Programa el reintento con espera exponencial, o marca error si no tiene sentido reintentar."""
+    intentos = trabajo.intentos + 1
+    mensaje = f"{type(exc).__name__}: {exc}"
+    if isinstance(exc, ERRORES_PERMANENTES) or intentos >= MAX_INTENTOS:
+        cambios = {"estado": "error"}
+    else:
+        cambios = {"estado": "pendiente", "ejecutar_desde": timezone.now() + espera_reintento(intentos)}
+    TrabajoImagen.objects.filter(pk=trabajo.pk).update(
+        intentos=intentos, tomado_por="", error=mensaje, **cambios,
+    )
+    return cambios["estado"]
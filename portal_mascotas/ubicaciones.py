@@ -0,0 +1,123 @@
+# portal_mascotas/ubicaciones.py
+"""
+Resolución de región/ciudad a partir del texto libre `ubicacion`.
+
+Se ejecuta al guardar (Mascota / SolicitudPublicacion), de modo que los
+filtros del home sean igualdades sobre columnas indexadas en vez de una
+cadena de `icontains` por cada ciudad de la región.
+
+Las ciudades son exactamente las etiquetas de REGIONES_CIUDADES (lo que
+envía el <select> del home). Cada etiqueta aporta varios alias:
+  "Gran Valparaíso (Valparaíso, Viña del Mar, Concón, Quilpué y Villa Alemana)"
+    -> "gran valparaiso", "valparaiso", "vina del mar", "concon", ...
+"""
+import re
+from functools import lru_cache
+
+from portal_mascotas.constantes import REGIONES_CIUDADES
+from portal_mascotas.texto import normalizar
+
+# Prefijos que se quitan para obtener un alias corto
+_PREFIJOS_CIUDAD = ("gran ", "conurbacion ", "area metropolitana ")
+_PREFIJOS_REGION = ("region de la ", "region del ", "region de ", "region ")
+
+# Formas cortas habituales que no salen de quitar el prefijo
+_ALIAS_REGION_EXTRA = {
+    "Región del Libertador B. O’Higgins": ["o'higgins", "ohiggins", "libertador"],
+    "Región de Aysén del Gral. C. Ibáñez del Campo": ["aysen", "aisen"],
+    "Región de Magallanes y de la Antártica Chilena": ["magallanes"],
+    "Región Metropolitana de Santiago": ["metropolitana", "region metropolitana", "rm"],
+    "Región de La Araucanía": ["araucania"],
+    "Región del Biobío": ["bio bio", "bio-bio"],
+}
+
+
+def _partes_etiqueta(etiqueta: str):
+    """Alias normalizados de una etiqueta de ciudad: (alias, es_principal)."""
+    norm = normalizar(etiqueta)
+    yield norm, True
+
+    cabeza, _, resto = norm.partition("(")
+    cabeza = cabeza.strip()
+    trozos = [cabeza] + [t for t in cabeza.split("–")]
+    if resto:
+        interior = resto.rstrip(")")
+        for t in interior.split(","):
+            trozos.extend(t.split(" y "))
+
+    for t in trozos:
+        t = t.strip()
+        if not t:
+            continue
+        yield t, t == cabeza
+        for p in _PREFIJOS_CIUDAD:
+            if t.startswith(p):
+                yield t[len(p):], False
+
+
+def _alias_region(region: str):
+    norm = normalizar(region)
+    yield norm
+    for p in _PREFIJOS_REGION:
+        if norm.startswith(p):
+            yield norm[len(p):]
+            break
+    for extra in _ALIAS_REGION_EXTRA.get(region, []):
+        yield normalizar(extra)
+
+
+def _compilar(alias):
+    # El más largo primero: en cada posición gana la coincidencia más específica
+    ordenados = sorted(alias, key=len, reverse=True)
+    patron = "|".join(re.escape(a) for a in ordenados)
+    return re.compile(rf"(?<!\w)(?:{patron})(?!\w)")
+
+
+@lru_cache(maxsize=1)
+def _indices():
+    ciudades = {}   # alias -> (region, ciudad, es_principal)
+    for region, lista in REGIONES_CIUDADES.items():
+        for etiqueta in lista:
+            for alias, principal in _partes_etiqueta(etiqueta):
+                previo = ciudades.get(alias)
+                if previo is None or (principal and not previo[2]):
+                    ciudades[alias] = (region, etiqueta, principal)
+
+    regiones = {}   # alias -> region
+    for region in REGIONES_CIUDADES:
+        for alias in _alias_region(region):
+            regiones.setdefault(alias, region)
+
+    return ciudades, _compilar(ciudades), regiones, _compilar(regiones)
+
+
+def resolver_ubicacion(texto: str):
+    """
+    Devuelve (region, ciudad) para un texto libre, o ("", "") si no se reconoce.
+
+    Reglas:
+      - si el texto menciona una región, solo se aceptan ciudades de esa región;
+      - entre varias ciudades gana la que aparece más a la derecha
+        ("Santiago - Ñuñoa" -> Ñuñoa), y a igual posición la etiqueta principal;
+      - si solo se reconoce la región, se devuelve sin ciudad.
+    """
+    norm = normalizar(texto).strip()
+    if not norm:
+        return "", ""
+
+    ciudades, re_ciudades, regiones, re_regiones = _indices()
+
+    mencionadas = {regiones[m.group(0)] for m in re_regiones.finditer(norm)}
+    candidatas = [
+        (m.start(), ciudades[m.group(0)]) for m in re_ciudades.finditer(norm)
+    ]
+    if mencionadas:
+        candidatas = [c for c in candidatas if c[1][0] in mencionadas]
+
+    if candidatas:
+        _, (region, ciudad, _principal) = max(candidatas, key=lambda c: (c[0], c[1][2]))
+        return region, ciudad
+
+    if len(mencionadas) == 1:
+        return next(iter(mencionadas)), ""
+    return "", ""
@@ -10,6 +10,7 @@ urlpatterns = [
 
     # Home
     path("", core_views.home, name="home"),
+    path("api/facetas/", core_views.facetas_json, name="facetas"),
 
     # Publicar mascotas (selector + formulario + "mis publicaciones")
     path(
@@ -1,32 +1,21 @@
 # portal_mascotas/views.py
+from django.http import JsonResponse
 from django.shortcuts import render
-from django.db.models import Q
-from django.db.models.functions import Lower
 from registro_mascotas.models import Mascota
+from registro_mascotas.busqueda import ORDEN_RELEVANCIA, TOPE_RESULTADOS, buscar
+from registro_mascotas import facetas
+from portal_mascotas.cache_paginas import cache_anonimo
+from portal_mascotas.paginacion import paginar_desplazamiento, paginar_keyset
+from portal_mascotas.texto import normalizar
 from portal_mascotas.constantes import (
     TIPOS_MASCOTA, SEXOS, RANGOS_EDAD, REGIONES_CIUDADES
 )
 
-# --- Soporte opcional para búsqueda sin tildes en PostgreSQL ---
-try:
-    # Requiere: CREATE EXTENSION IF NOT EXISTS unaccent;
-    from django.contrib.postgres.functions import Unaccent
-    HAS_UNACCENT = True
-except Exception:
-    HAS_UNACCENT = False
-
-import unicodedata
-
-
-def _unaccent_py(s: str) -> str:
-    """Quita tildes en Python (para construir patrón si no hay Unaccent)."""
-    s = s or ""
-    return "".join(
-        c for c in unicodedata.normalize("NFKD", s)
-        if not unicodedata.combining(c)
-    )
+# Tamaño de página del listado principal (paginación por cursor)
+MASCOTAS_POR_PAGINA = 24
 
 
+@cache_anonimo
 def home(request):
     q     = (request.GET.get("q") or "").strip()
     tipo  = (request.GET.get("tipo") or "").strip()
@@ -37,16 +26,14 @@ def home(request):
     # nuevos
     region = (request.GET.get("region") or "").strip()
     ciudad = (request.GET.get("ciudad") or "").strip()
+    cursor = (request.GET.get("cursor") or "").strip()
 
-    qs = Mascota.objects.filter(estado="disponible").order_by("-fecha_registro")
+    qs = Mascota.objects.filter(estado="disponible")
+    orden = ("-fecha_registro", "-id")
 
-    # ===== Texto libre =====
+    # ===== Texto libre (índice FTS5 con ranking BM25; ver registro_mascotas.busqueda) =====
     if q:
-        qs = qs.filter(
-            Q(nombre__icontains=q) |
-            Q(raza__icontains=q) |
-            Q(descripcion__icontains=q)
-        )
+        qs, orden = buscar(qs, q)
 
     if tipo:
         qs = qs.filter(tipo=tipo)
@@ -62,92 +49,68 @@ def home(request):
         except (ValueError, IndexError):
             pass
 
-    if ubic:
-        # filtro de ubicación previo (no se rompe)
-        qs = qs.filter(ubicacion__icontains=ubic)
-
-    # ===== región / ciudad - filtro menos estricto =====
-    has_region_field = any(f.name == "region" for f in Mascota._meta.fields)
-    has_ciudad_field = any(f.name == "ciudad" for f in Mascota._meta.fields)
-    has_ubic_field   = any(f.name == "ubicacion" for f in Mascota._meta.fields)
-
-    # Anotaciones una sola vez para usar Unaccent+Lower en varios filtros (si procede)
-    annotations = {}
-    if HAS_UNACCENT:
-        if has_region_field:
-            annotations["region_norm"] = Unaccent(Lower("region"))
-        if has_ciudad_field:
-            annotations["ciudad_norm"] = Unaccent(Lower("ciudad"))
-        if has_ubic_field:
-            annotations["ubicacion_norm"] = Unaccent(Lower("ubicacion"))
-
-    if annotations:
-        qs = qs.annotate(**annotations)
+    # ===== ubicación libre (compatibilidad previa) =====
+    # Columnas *_norm persistidas (se calculan al guardar, ver Mascota.save)
+    persisted_norm = set(Mascota.CAMPOS_NORMALIZADOS.values())
 
     def contains_expr(field: str, value: str):
-        """Devuelve kwargs para __contains (con alias *_norm) o __icontains normal."""
+        """Devuelve kwargs para __contains (con columna *_norm) o __icontains normal."""
         if not value:
             return {}
-        if HAS_UNACCENT and f"{field}_norm" in annotations:
-            return {f"{field}_norm__contains": _unaccent_py(value).lower()}
+        if f"{field}_norm" in persisted_norm:
+            return {f"{field}_norm__contains": normalizar(value)}
         else:
-            # sin unaccent -> al menos case-insensitive
+            # sin columna normalizada -> al menos case-insensitive
             return {f"{field}__icontains": value}
 
-    # Filtro por ciudad (si el usuario la eligió)
-    if ciudad:
-        if has_ciudad_field:
-            qs = qs.filter(**contains_expr("ciudad", ciudad))
-        elif has_ubic_field:
-            qs = qs.filter(**contains_expr("ubicacion", ciudad))
+    if ubic:
+        # filtro de ubicación previo (no se rompe)
+        qs = qs.filter(**contains_expr("ubicacion", ubic))
 
-    # Filtro por región (directo + por ciudades de esa región si no hay ciudad seleccionada)
+    # ===== región / ciudad =====
+    # Se resuelven desde `ubicacion` al guardar (portal_mascotas.ubicaciones),
+    # así que aquí son igualdades sobre columnas indexadas.
+    if ciudad:
+        qs = qs.filter(ciudad=ciudad)
     if region:
-        region_q = Q()
-        if has_region_field:
-            region_q |= Q(**contains_expr("region", region))
-
-        if not ciudad:
-            ciudades_region = REGIONES_CIUDADES.get(region, [])
-            norm_cities = [_unaccent_py(c).lower() for c in ciudades_region] if HAS_UNACCENT else ciudades_region
-
-            if has_ciudad_field or has_ubic_field:
-                city_q = Q()
-                for i, c in enumerate(norm_cities):
-                    if not c:
-                        continue
-                    if has_ciudad_field:
-                        if HAS_UNACCENT and "ciudad_norm" in annotations:
-                            city_q |= Q(ciudad_norm__contains=c)
-                        else:
-                            city_q |= Q(ciudad__icontains=ciudades_region[i])
-                    if has_ubic_field:
-                        if HAS_UNACCENT and "ubicacion_norm" in annotations:
-                            city_q |= Q(ubicacion_norm__contains=c)
-                        else:
-                            city_q |= Q(ubicacion__icontains=ciudades_region[i])
-                region_q |= city_q
-
-        qs = qs.filter(region_q)
-
-    # ===== listas para selects =====
+        qs = qs.filter(region=region)
+
+    # ===== listas para selects (con conteos de disponibles: una sola lectura) =====
+    conteos = facetas.leer()
     regiones_disponibles = list(REGIONES_CIUDADES.keys())
     ciudades_disponibles = REGIONES_CIUDADES.get(region, []) if region else []
 
+    # ===== página (keyset sobre `orden`; sin OFFSET ni COUNT) =====
+    # La relevancia no es estable entre requests: esa va por desplazamiento, con tope
+    if orden == ORDEN_RELEVANCIA:
+        pagina = paginar_desplazamiento(qs, cursor, orden=orden, por_pagina=MASCOTAS_POR_PAGINA,
+                                        tope=TOPE_RESULTADOS)
+    else:
+        pagina = paginar_keyset(qs, cursor, orden=orden, por_pagina=MASCOTAS_POR_PAGINA)
+
     ctx = {
-        "mascotas": qs,
-        "tipos": TIPOS_MASCOTA,
-        "sexos": SEXOS,
-        "rangos_edad": RANGOS_EDAD,
+        "mascotas": pagina,
+        "pagina": pagina,
+        "tipos": [(k, label, conteos["tipo"].get(k, 0)) for k, label in TIPOS_MASCOTA],
+        "sexos": [(k, label, conteos["sexo"].get(k, 0)) for k, label in SEXOS],
+        "rangos_edad": [
+            (*rango, conteos["edad"].get(str(i), 0)) for i, rango in enumerate(RANGOS_EDAD)
+        ],
 
         "q": q, "tipo": tipo, "sexo": sexo, "edad": edad, "ubic": ubic,
 
         "region": region,
         "ciudad": ciudad,
-        "regiones": regiones_disponibles,
-        "ciudades": ciudades_disponibles,
+        "regiones": [(r, conteos["region"].get(r, 0)) for r in regiones_disponibles],
+        "ciudades": [(c, conteos["ciudad"].get(c, 0)) for c in ciudades_disponibles],
+        "conteos_ciudad": conteos["ciudad"],
 
         # Para JS en el template (dependiente sin recargar):
         "REGIONES_CIUDADES": REGIONES_CIUDADES,
     }
     return render(request, "portal_mascotas/home.html", ctx)
+
+
+def facetas_json(request):
+    """Conteos por faceta de mascotas disponibles: {faceta: {valor: total}}."""
+    return JsonResponse(facetas.leer())
@@ -1,27 +1,62 @@
 # registro_mascotas/admin.py
 from django import forms
 from django.contrib import admin, messages
+from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.html import format_html
-from django.utils.safestring import mark_safe
-from django.utils import timezone
-from django.http import HttpResponse
 from datetime import date
-import csv
 
+from portal_mascotas.admin_rendimiento import AdminRendimientoMixin, FiltroCiudad, FiltroFecha, FiltroRegion
+from portal_mascotas.exportar import ExportacionMixin, ExportarActionForm
+from portal_mascotas.imagenes import url_variante
 from .models import Mascota, SolicitudPublicacion
+from . import facetas, importacion, publicaciones
+
+ERRORES_EN_PANTALLA = 200
+
+
+class ImportarMascotasForm(forms.Form):
+    archivo = forms.FileField(label="Archivo", help_text=".csv, .jsonl o su versión .gz")
+    responsable = forms.CharField(
+        label="Responsable (username)", required=False,
+        help_text="Usuario/refugio a cargo de las mascotas. Vacío: tú.",
+    )
+    dry_run = forms.BooleanField(label="Solo validar (no insertar)", required=False)
+
+    def clean_archivo(self):
+        archivo = self.cleaned_data["archivo"]
+        formato, comprimido = importacion.detectar_formato(archivo.name)
+        if formato is None:
+            raise forms.ValidationError("Extensión no reconocida: usa .csv, .jsonl, .csv.gz o .jsonl.gz.")
+        self.formato, self.comprimido = formato, comprimido
+        return archivo
+
+    def clean_responsable(self):
+        username = self.cleaned_data["responsable"].strip()
+        if not username:
+            return None
+        try:
+            return get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise forms.ValidationError("No existe ese usuario.")
 
 
 # ===================== Mascota =====================
 @admin.register(Mascota)
-class MascotaAdmin(admin.ModelAdmin):
+class MascotaAdmin(AdminRendimientoMixin, ExportacionMixin, admin.ModelAdmin):
     list_display = (
         "id", "thumb", "nombre", "tipo", "raza", "edad_meses_calc",
         "sexo", "ubicacion", "estado", "responsable", "fecha_registro"
     )
-    list_filter = ("estado", "tipo", "sexo", "ubicacion", "fecha_registro")
+    # region/ciudad (columnas indexadas, opciones cacheadas) en vez del texto libre `ubicacion`
+    list_filter = ("estado", "tipo", "sexo", FiltroRegion, FiltroCiudad, ("fecha_registro", FiltroFecha))
     search_fields = ("nombre", "raza", "ubicacion", "responsable__username", "descripcion")
     readonly_fields = ("fecha_registro", "preview")
-    date_hierarchy = "fecha_registro"
+    list_select_related = ("responsable",)
+    autocomplete_fields = ("responsable",)
+    list_defer = ("descripcion",)
     list_per_page = 25
 
     # Permite edición inline del estado sin entrar al objeto
@@ -33,7 +68,23 @@ class MascotaAdmin(admin.ModelAdmin):
         "accion_marcar_disponible",
         "accion_marcar_reservado",
         "accion_marcar_adoptado",
-        "accion_exportar_csv",
+        "accion_exportar",
+    )
+
+    exportar_nombre = "mascotas"
+    exportar_select_related = ("responsable",)
+    exportar_columnas = (
+        ("id", "id"),
+        ("nombre", "nombre"),
+        ("tipo", "get_tipo_display"),
+        ("raza", "raza"),
+        ("edad_meses", "edad"),
+        ("sexo", "get_sexo_display"),
+        ("ubicacion", "ubicacion"),
+        ("estado", "get_estado_display"),
+        ("responsable_username", "responsable.username"),
+        ("fecha_registro", "fecha_registro"),
+        ("foto_path", "foto"),
     )
 
     fieldsets = (
@@ -67,8 +118,9 @@ class MascotaAdmin(admin.ModelAdmin):
     def thumb(self, obj):
         if obj.foto:
             return format_html(
-                '<img src="{}" style="height:48px;border-radius:6px;object-fit:cover" />',
-                obj.foto.url,
+                '<img src="{}" width="48" height="48" loading="lazy" decoding="async" '
+                'style="border-radius:6px;object-fit:cover" />',
+                url_variante(obj.foto, obj.foto_variantes, "thumb"),
             )
         return "—"
 
@@ -77,10 +129,46 @@ class MascotaAdmin(admin.ModelAdmin):
         if obj.foto:
             return format_html(
                 '<img src="{}" style="max-width:360px;border-radius:10px;" />',
-                obj.foto.url,
+                url_variante(obj.foto, obj.foto_variantes, "card"),
             )
         return "—"
 
+    # ---- Importación masiva (CSV / JSONL) ----
+    def get_urls(self):
+        propias = [
+            path(
+                "importar/",
+                self.admin_site.admin_view(self.importar_view),
+                name="registro_mascotas_mascota_importar",
+            ),
+        ]
+        return propias + super().get_urls()
+
+    def importar_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        resultado = None
+        form = ImportarMascotasForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            archivo = form.cleaned_data["archivo"]
+            resultado = importacion.importar(
+                archivo.open("rb"), form.formato, form.cleaned_data["responsable"] or request.user,
+                comprimido=form.comprimido, dry_run=form.cleaned_data["dry_run"],
+            )
+            if resultado.creadas:
+                messages.success(request, f"✅ {resultado.creadas} mascota(s) importadas.")
+        contexto = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Importar mascotas",
+            "form": form,
+            "resultado": resultado,
+            "dry_run": form.is_bound and form.is_valid() and form.cleaned_data["dry_run"],
+            "errores": resultado.errores[:ERRORES_EN_PANTALLA] if resultado else [],
+            "errores_omitidos": max(0, len(resultado.errores) - ERRORES_EN_PANTALLA) if resultado else 0,
+        }
+        return TemplateResponse(request, "admin/registro_mascotas/mascota/importar.html", contexto)
+
     # ---- Conveniencia: si no se especifica responsable, usar el usuario actual ----
     def save_model(self, request, obj, form, change):
         if not change and not getattr(obj, "responsable_id", None):
@@ -90,45 +178,25 @@ class MascotaAdmin(admin.ModelAdmin):
     # ---- Acciones rápidas de estado ----
     @admin.action(description="Marcar como Disponible")
     def accion_marcar_disponible(self, request, queryset):
-        updated = queryset.update(estado="disponible")
+        updated = facetas.cambiar_estado(queryset, "disponible")
         if updated:
             messages.success(request, f"✅ {updated} mascota(s) marcadas como Disponible.")
 
     @admin.action(description="Marcar como Reservado")
     def accion_marcar_reservado(self, request, queryset):
-        updated = queryset.update(estado="reservado")
+        updated = facetas.cambiar_estado(queryset, "reservado")
         if updated:
             messages.success(request, f"⏳ {updated} mascota(s) marcadas como Reservado.")
 
     @admin.action(description="Marcar como Adoptado")
     def accion_marcar_adoptado(self, request, queryset):
-        updated = queryset.update(estado="adoptado")
+        updated = facetas.cambiar_estado(queryset, "adoptado")
         if updated:
             messages.success(request, f"🎉 {updated} mascota(s) marcadas como Adoptado.")
 
-    # ---- Exportar CSV ----
-    @admin.action(description="Exportar selección a CSV")
-    def accion_exportar_csv(self, request, queryset):
-        now = timezone.now().strftime("%Y%m%d-%H%M%S")
-        response = HttpResponse(content_type="text/csv; charset=utf-8")
-        response["Content-Disposition"] = f'attachment; filename="mascotas-{now}.csv"'
-        writer = csv.writer(response)
-        writer.writerow([
-            "id", "nombre", "tipo", "raza", "edad_meses", "sexo", "ubicacion",
-            "estado", "responsable_username", "fecha_registro", "foto_path"
-        ])
-        for m in queryset:
-            writer.writerow([
-                m.id, m.nombre, m.get_tipo_display(), m.raza, getattr(m, "edad", ""),
-                m.get_sexo_display(), m.ubicacion, m.get_estado_display(),
-                getattr(m.responsable, "username", ""), m.fecha_registro.isoformat(),
-                getattr(m.foto, "name", ""),
-            ])
-        return response
-
 
 # ====== ActionForm (campo para motivo de rechazo) ======
-class RechazoActionForm(admin.helpers.ActionForm):
+class RechazoActionForm(ExportarActionForm):
     rechazo_motivo = forms.CharField(
         label="Motivo del rechazo",
         required=False,
@@ -142,20 +210,47 @@ class RechazoActionForm(admin.helpers.ActionForm):
 
 # ===================== SolicitudPublicacion =====================
 @admin.register(SolicitudPublicacion)
-class SolicitudPublicacionAdmin(admin.ModelAdmin):
+class SolicitudPublicacionAdmin(AdminRendimientoMixin, ExportacionMixin, admin.ModelAdmin):
     list_display = (
         "id", "thumb", "nombre", "tipo", "raza", "edad", "sexo",
         "ubicacion", "contacto_nombre", "contacto_email",
         "estado", "usuario", "fecha_creacion"
     )
-    list_filter = ("estado", "tipo", "sexo", "fecha_creacion")
+    list_filter = ("estado", "tipo", "sexo", FiltroRegion, ("fecha_creacion", FiltroFecha))
+    list_select_related = ("usuario",)
+    list_defer = ("descripcion", "contacto_direccion", "rechazo_motivo", "aceptacion_mensaje")
     search_fields = (
         "nombre", "raza", "ubicacion", "usuario__username",
         "contacto_nombre", "contacto_email", "contacto_telefono"
     )
-    actions = ("accion_aceptar_publicacion", "accion_rechazar_publicacion")
+    actions = ("accion_aceptar_publicacion", "accion_rechazar_publicacion", "accion_exportar")
     action_form = RechazoActionForm
-    date_hierarchy = "fecha_creacion"
+
+    class Media:
+        # Muestra el cuadro "Motivo del rechazo" solo con la acción de rechazar
+        js = ("registro_mascotas/js/admin_rechazo.js",)
+
+    exportar_nombre = "solicitudes-publicacion"
+    exportar_select_related = ("usuario",)
+    exportar_columnas = (
+        ("id", "id"),
+        ("nombre", "nombre"),
+        ("tipo", "get_tipo_display"),
+        ("raza", "raza"),
+        ("edad_meses", "edad"),
+        ("sexo", "get_sexo_display"),
+        ("ubicacion", "ubicacion"),
+        ("region", "region"),
+        ("ciudad", "ciudad"),
+        ("estado", "estado"),
+        ("usuario_username", "usuario.username"),
+        ("contacto_nombre", "contacto_nombre"),
+        ("contacto_email", "contacto_email"),
+        ("contacto_telefono", "contacto_telefono"),
+        ("mascota_id", "mascota_id"),
+        ("fecha_creacion", "fecha_creacion"),
+        ("foto_path", "foto"),
+    )
     list_per_page = 25
 
     readonly_fields = (
@@ -163,7 +258,7 @@ class SolicitudPublicacionAdmin(admin.ModelAdmin):
         "descripcion", "ubicacion", "foto", "estado", "fecha_creacion",
         "contacto_nombre", "contacto_email", "contacto_direccion", "contacto_telefono",
         "acepta_declaracion",
-        "rechazo_motivo", "aceptacion_mensaje",
+        "rechazo_motivo", "aceptacion_mensaje", "mascota", "fecha_revision",
         "preview",
     )
 
@@ -191,7 +286,7 @@ class SolicitudPublicacionAdmin(admin.ModelAdmin):
             )
         }),
         ("Revisión", {
-            "fields": ("rechazo_motivo", "aceptacion_mensaje"),
+            "fields": ("rechazo_motivo", "aceptacion_mensaje", "mascota", "fecha_revision"),
         }),
     )
 
@@ -200,8 +295,9 @@ class SolicitudPublicacionAdmin(admin.ModelAdmin):
     def thumb(self, obj):
         if obj.foto:
             return format_html(
-                '<img src="{}" style="height:48px;border-radius:6px;object-fit:cover" />',
-                obj.foto.url,
+                '<img src="{}" width="48" height="48" loading="lazy" decoding="async" '
+                'style="border-radius:6px;object-fit:cover" />',
+                url_variante(obj.foto, obj.foto_variantes, "thumb"),
             )
         return "—"
 
@@ -210,28 +306,15 @@ class SolicitudPublicacionAdmin(admin.ModelAdmin):
         if obj.foto:
             return format_html(
                 '<img src="{}" style="max-width:360px;border-radius:10px;" />',
-                obj.foto.url,
+                url_variante(obj.foto, obj.foto_variantes, "card"),
             )
         return "—"
 
     # ---- Acciones ----
     @admin.action(description="Aceptar publicación (crear Mascota)")
     def accion_aceptar_publicacion(self, request, queryset):
-        aprobadas = 0
-        ya_procesadas = 0
-        for s in queryset:
-            if s.estado != "pendiente":
-                ya_procesadas += 1
-                continue
-            Mascota.objects.create(
-                nombre=s.nombre, tipo=s.tipo, raza=s.raza, edad=s.edad, sexo=s.sexo,
-                descripcion=s.descripcion, ubicacion=s.ubicacion, foto=s.foto,
-                estado="disponible", responsable=s.usuario
-            )
-            s.estado = "aprobada"
-            s.aceptacion_mensaje = "✅ Tu solicitud fue aprobada. La mascota ya está publicada en el portal."
-            s.save(update_fields=["estado", "aceptacion_mensaje"])
-            aprobadas += 1
+        mascotas, ya_procesadas = publicaciones.aprobar(queryset)
+        aprobadas = len(mascotas)
 
         if aprobadas:
             messages.success(request, f"✅ {aprobadas} solicitud(es) aceptada(s) y convertida(s) en Mascota.")
@@ -248,61 +331,9 @@ class SolicitudPublicacionAdmin(admin.ModelAdmin):
             )
             return
 
-        rechazadas = 0
-        for s in queryset:
-            if s.estado == "pendiente":
-                s.estado = "rechazada"
-                s.rechazo_motivo = motivo
-                s.save(update_fields=["estado", "rechazo_motivo"])
-                rechazadas += 1
+        rechazadas = publicaciones.rechazar(queryset, motivo)
 
         if rechazadas:
             messages.success(request, f"🛑 {rechazadas} solicitud(es) rechazadas.")
         else:
             messages.info(request, "No había solicitudes 'pendientes' para rechazar.")
-
-    # ---- Mostrar/ocultar textarea por acción (inyectado al final del body) ----
-    def changelist_view(self, request, extra_context=None):
-        resp = super().changelist_view(request, extra_context=extra_context)
-        try:
-            if hasattr(resp, "render") and callable(resp.render):
-                resp.render()
-            html = resp.content.decode("utf-8")
-
-            js = """
-<script>
-(function(){
-  function getNodes(){
-    var sel   = document.getElementById('action');
-    var ta    = document.querySelector('textarea[name="rechazo_motivo"]');
-    var label = null;
-    if(ta){
-      var prev = ta.previousElementSibling;
-      if(prev && prev.tagName && prev.tagName.toLowerCase()==='label'){ label = prev; }
-      if(!label && ta.id){ label = document.querySelector('label[for="'+ta.id+'"]'); }
-    }
-    return { sel: sel, ta: ta, label: label };
-  }
-  function setVisible(show){
-    var n = getNodes();
-    if(!n.ta) return;
-    n.ta.style.display    = show ? '' : 'none';
-    if(n.label){ n.label.style.display = show ? '' : 'none'; }
-  }
-  function toggle(){
-    var n = getNodes();
-    if(!n.sel) return;
-    setVisible(n.sel.value === 'accion_rechazar_publicacion');
-  }
-  document.addEventListener('DOMContentLoaded', function(){
-    toggle(); // estado inicial
-    var sel = document.getElementById('action');
-    if(sel){ sel.addEventListener('change', toggle); }
-  });
-})();
-</script>
-"""
-            resp.content = mark_safe(html.replace("</body>", js + "</body>"))
-        except Exception:
-            return resp
-        return resp
\ No newline at end of file
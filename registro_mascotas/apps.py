@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RegistroMascotasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'registro_mascotas'
+
+    def ready(self):
+        from registro_mascotas import signals  # noqa: F401  (conecta receptores)
@@ -0,0 +1,140 @@
+# registro_mascotas/busqueda.py
+"""
+Búsqueda de texto libre sobre Mascota con un índice FTS5 de SQLite.
+
+La tabla virtual `registro_mascotas_mascota_fts` (migración 0009) es de
+"contenido externo": indexa nombre, raza, descripcion y ubicacion de
+`registro_mascotas_mascota` sin duplicar el texto, y se mantiene sincronizada
+con triggers AFTER INSERT/UPDATE/DELETE. Así cubre save(), delete(),
+bulk_create() y queryset.update() por igual.
+
+Tokenizador: unicode61 con remove_diacritics=2 ("Ñuñoa" == "nunoa").
+Cada palabra de la consulta se busca como prefijo ("perr" -> perro, perros).
+En otros motores se cae a icontains (sin índice ni plegado de tildes).
+
+Ojo: en SQLite, AddField/AlterField sobre Mascota reconstruye la tabla y
+borra los triggers. Esas migraciones deben terminar con un RunPython que
+llame a `crear_indice` (es idempotente; ver 0011).
+"""
+import re
+
+from django.db import connection
+from django.db.models import F, Lookup, Q, TextField
+
+from portal_mascotas.texto import normalizar
+
+FTS_TABLA = "registro_mascotas_mascota_fts"
+
+# Pesos BM25 por columna: nombre, raza, descripcion, ubicacion.
+# Se guardan como configuración `rank` de la tabla FTS (migración 0009).
+PESOS_BM25 = (10.0, 5.0, 1.0, 2.0)
+
+# Orden de resultados con búsqueda: relevancia (bm25, menor es mejor) y luego id.
+# BM25 depende de estadísticas de todo el índice (largo medio, frecuencia de
+# cada término): cualquier alta o baja cambia la relevancia de todas las filas.
+# Un cursor keyset con el puntaje de la página 1 saltaría o repetiría
+# resultados en la 2, así que estos resultados se paginan por desplazamiento
+# (paginacion.paginar_desplazamiento) hasta TOPE_RESULTADOS; quien necesita
+# más debe afinar la búsqueda.
+ORDEN_RELEVANCIA = ("relevancia", "-id")
+TOPE_RESULTADOS = 240
+
+_PALABRA = re.compile(r"\w+", re.UNICODE)
+
+
+class CampoMatch(TextField):
+    """Columna oculta de FTS5 que admite el lookup `__match`."""
+
+
+@CampoMatch.register_lookup
+class Match(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+def fts_disponible() -> bool:
+    return connection.vendor == "sqlite"
+
+
+def expresion_fts(texto: str) -> str:
+    """
+    Convierte texto libre en una expresión MATCH segura:
+    'Perro   café!' -> '"perro"* "cafe"*'   (AND implícito entre términos)
+    """
+    palabras = _PALABRA.findall(normalizar(texto))
+    return " ".join(f'"{p}"*' for p in palabras)
+
+
+def buscar(qs, texto: str):
+    """
+    Filtra `qs` (de Mascota) por el texto y anota `relevancia` (BM25).
+    Devuelve (queryset, orden). Con ORDEN_RELEVANCIA se pagina con
+    paginar_desplazamiento; con cualquier otro, con paginar_keyset.
+
+    SQL resultante: JOIN con la tabla FTS por rowid, WHERE fts MATCH ?,
+    ORDER BY fts.rank; SQLite recorre primero el índice invertido y luego
+    busca cada mascota por clave primaria.
+    """
+    if not fts_disponible():
+        return _buscar_sin_fts(qs, texto), ("-fecha_registro", "-id")
+
+    expr = expresion_fts(texto)
+    if not expr:
+        return qs, ("-fecha_registro", "-id")
+
+    qs = qs.filter(fts__documento__match=expr).annotate(relevancia=F("fts__rank"))
+    return qs, ORDEN_RELEVANCIA
+
+
+def _buscar_sin_fts(qs, texto: str):
+    return qs.filter(
+        Q(nombre__icontains=texto) |
+        Q(raza__icontains=texto) |
+        Q(descripcion__icontains=texto)
+    )
+
+
+def crear_indice(schema_editor):
+    """SQL de creación (tabla virtual + triggers). Usado por la migración."""
+    tabla = "registro_mascotas_mascota"
+    columnas = "nombre, raza, descripcion, ubicacion"
+    nuevos = "new.id, new.nombre, new.raza, new.descripcion, new.ubicacion"
+    viejos = "old.id, old.nombre, old.raza, old.descripcion, old.ubicacion"
+    sentencias = [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLA} USING fts5(
+                {columnas},
+                content='{tabla}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLA}_ai AFTER INSERT ON {tabla} BEGIN
+                INSERT INTO {FTS_TABLA}(rowid, {columnas}) VALUES ({nuevos});
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLA}_ad AFTER DELETE ON {tabla} BEGIN
+                INSERT INTO {FTS_TABLA}({FTS_TABLA}, rowid, {columnas}) VALUES ('delete', {viejos});
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLA}_au AFTER UPDATE OF {columnas} ON {tabla} BEGIN
+                INSERT INTO {FTS_TABLA}({FTS_TABLA}, rowid, {columnas}) VALUES ('delete', {viejos});
+                INSERT INTO {FTS_TABLA}(rowid, {columnas}) VALUES ({nuevos});
+            END""",
+        # Ranking por defecto (columna `rank`) con pesos por columna
+        f"INSERT INTO {FTS_TABLA}({FTS_TABLA}, rank) VALUES "
+        f"('rank', 'bm25({', '.join(str(p) for p in PESOS_BM25)})')",
+        # Indexa las filas que ya existían
+        f"INSERT INTO {FTS_TABLA}({FTS_TABLA}) VALUES ('rebuild')",
+    ]
+    for sql in sentencias:
+        schema_editor.execute(sql)
+
+
+def eliminar_indice(schema_editor):
+    for sql in (
+        f"DROP TRIGGER IF EXISTS {FTS_TABLA}_ai",
+        f"DROP TRIGGER IF EXISTS {FTS_TABLA}_ad",
+        f"DROP TRIGGER IF EXISTS {FTS_TABLA}_au",
+        f"DROP TABLE IF EXISTS {FTS_TABLA}",
+    ):
+        schema_editor.execute(sql)
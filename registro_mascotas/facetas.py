@@ -0,0 +1,149 @@
+# registro_mascotas/facetas.py
+"""
+Conteos por faceta (tipo, sexo, rango de edad, región, ciudad) de las
+mascotas disponibles, guardados en la tabla resumen ConteoFaceta.
+
+Se mantienen de forma incremental:
+  - save()/delete() de Mascota -> señales (registro_mascotas.signals)
+  - acciones masivas del admin -> cambiar_estado(queryset, estado)
+  - bulk_create -> registrar_altas(mascotas)
+Leer todos los conteos es una sola consulta (leer()). Si alguna vez se
+desalinean, `manage.py recalcular_facetas` los reconstruye desde cero.
+
+Los caminos masivos también invalidan la caché del home (al confirmar la
+transacción), igual que las señales para save()/delete().
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from portal_mascotas.cache_paginas import invalidar_home
+from portal_mascotas.constantes import RANGOS_EDAD
+
+FACETAS = ("tipo", "sexo", "edad", "region", "ciudad")
+ESTADO_VISIBLE = "disponible"
+
+# Campos de Mascota de los que dependen las facetas
+CAMPOS = ("estado", "tipo", "sexo", "edad", "region", "ciudad")
+
+
+def rangos_de_edad(edad):
+    """Índices de RANGOS_EDAD que incluyen `edad` (los bordes pertenecen a dos rangos,
+    igual que el filtro edad__gte/edad__lte del home)."""
+    if edad is None:
+        return []
+    return [str(i) for i, (lo, hi, _) in enumerate(RANGOS_EDAD) if lo <= edad <= hi]
+
+
+def claves(valores) -> Counter:
+    """Claves (faceta, valor) a las que aporta una mascota con estos valores."""
+    c = Counter()
+    if not valores or valores.get("estado") != ESTADO_VISIBLE:
+        return c
+    for faceta in ("tipo", "sexo", "region", "ciudad"):
+        if valores.get(faceta):
+            c[(faceta, valores[faceta])] += 1
+    for idx in rangos_de_edad(valores.get("edad")):
+        c[("edad", idx)] += 1
+    return c
+
+
+def valores_de(obj):
+    return {campo: getattr(obj, campo) for campo in CAMPOS}
+
+
+def diferencia(anteriores, actuales) -> Counter:
+    """Deltas (puede haber negativos) entre dos estados de una mascota."""
+    deltas = Counter(claves(actuales))
+    deltas.subtract(claves(anteriores))
+    return deltas
+
+
+def aplicar(deltas):
+    """Suma los deltas en ConteoFaceta (UPDATE total = total + n; crea la fila si falta)."""
+    from registro_mascotas.models import ConteoFaceta
+
+    for (faceta, valor), n in deltas.items():
+        if not n:
+            continue
+        filtro = ConteoFaceta.objects.filter(faceta=faceta, valor=valor)
+        if filtro.update(total=F("total") + n):
+            continue
+        try:
+            with transaction.atomic():
+                ConteoFaceta.objects.create(faceta=faceta, valor=valor, total=n)
+        except IntegrityError:
+            # Otro proceso la creó entre medio
+            filtro.update(total=F("total") + n)
+
+
+def registrar_altas(mascotas):
+    """Para mascotas creadas sin save() (bulk_create)."""
+    deltas = Counter()
+    for m in mascotas:
+        deltas.update(claves(valores_de(m)))
+    aplicar(deltas)
+    if deltas:
+        transaction.on_commit(invalidar_home)
+
+
+def cambiar_estado(queryset, estado):
+    """
+    Equivalente a queryset.update(estado=estado) que además ajusta los conteos.
+    Las filas que cambian se agrupan por sus valores de faceta (una consulta
+    GROUP BY acotada a la selección) antes de actualizar.
+    """
+    with transaction.atomic():
+        grupos = (
+            queryset.exclude(estado=estado)
+            .order_by()
+            .values(*CAMPOS)
+            .annotate(n=Count("id"))
+        )
+        deltas = Counter()
+        for g in grupos:
+            n = g.pop("n")
+            for clave, v in diferencia(g, {**g, "estado": estado}).items():
+                deltas[clave] += v * n
+        actualizadas = queryset.update(estado=estado)
+        aplicar(deltas)
+        if actualizadas:
+            transaction.on_commit(invalidar_home)
+    return actualizadas
+
+
+def leer():
+    """{faceta: {valor: total}} para todas las facetas, en una consulta."""
+    from registro_mascotas.models import ConteoFaceta
+
+    conteos = {f: {} for f in FACETAS}
+    for faceta, valor, total in ConteoFaceta.objects.filter(total__gt=0).values_list("faceta", "valor", "total"):
+        conteos.setdefault(faceta, {})[valor] = total
+    return conteos
+
+
+def recalcular(Mascota=None, ConteoFaceta=None):
+    """Reconstruye la tabla resumen desde cero (también usado por la migración)."""
+    if Mascota is None or ConteoFaceta is None:
+        from registro_mascotas.models import Mascota, ConteoFaceta
+
+    visibles = Mascota.objects.filter(estado=ESTADO_VISIBLE).order_by()
+    filas = []
+    for faceta in ("tipo", "sexo", "region", "ciudad"):
+        for g in visibles.exclude(**{faceta: ""}).values(faceta).annotate(n=Count("id")):
+            filas.append(ConteoFaceta(faceta=faceta, valor=g[faceta], total=g["n"]))
+
+    por_rango = visibles.aggregate(**{
+        f"r{i}": Count("id", filter=Q(edad__gte=lo, edad__lte=hi))
+        for i, (lo, hi, _) in enumerate(RANGOS_EDAD)
+    })
+    filas += [
+        ConteoFaceta(faceta="edad", valor=clave[1:], total=n)
+        for clave, n in por_rango.items() if n
+    ]
+
+    with transaction.atomic():
+        ConteoFaceta.objects.all().delete()
+        ConteoFaceta.objects.bulk_create(filas)
+    return len(filas)
@@ -0,0 +1,313 @@
+# registro_mascotas/importacion.py
+"""
+Importación masiva de mascotas desde CSV / JSONL (planillas de refugios).
+
+    resultado = importar(archivo_binario, "csv", responsable, directorio_fotos="/srv/fotos")
+
+- El archivo se lee en streaming (csv.DictReader / una línea JSON a la vez,
+  opcionalmente .gz): la memoria depende del tamaño del lote, no del archivo.
+  Los problemas de lectura (líneas que no son UTF-8, un .gz corrupto) se
+  informan como errores con su número de línea, igual que los de validación.
+- Cada fila se valida contra los choices de Mascota (TIPOS_MASCOTA, SEXOS,
+  ESTADOS_MASCOTA; se acepta la clave o la etiqueta, sin importar tildes ni
+  mayúsculas) y los largos de los campos. Una fila inválida se informa con su
+  número de línea y no detiene la importación.
+- Las filas válidas se insertan con bulk_create en lotes de `tam_lote`, cada
+  lote en su propia transacción. Si un lote falla en la BD se reintenta fila
+  por fila para aislar la culpable.
+- bulk_create no llama a save(): los campos derivados, las facetas y las
+  variantes de imagen se actualizan aquí (igual que publicaciones.aprobar).
+
+Columnas: nombre, tipo, raza, edad (meses), sexo, descripcion, ubicacion y,
+opcionales, estado y foto (nombre de archivo dentro de `directorio_fotos`).
+Las fotos se copian al storage (direccionado por contenido) antes de insertar;
+si luego el lote falla, quedan huérfanas hasta el próximo `limpiar_media`.
+"""
+import csv
+import gzip
+import json
+import os
+import zlib
+from dataclasses import dataclass, field
+
+from django.core.files import File
+from django.db import DatabaseError, transaction
+from PIL import Image, UnidentifiedImageError
+
+from portal_mascotas.constantes import ESTADOS_MASCOTA, SEXOS, TIPOS_MASCOTA
+from portal_mascotas.imagenes import ImagenRechazada, sincronizar_variantes_lote, validar
+from portal_mascotas.texto import normalizar
+from registro_mascotas import facetas
+from registro_mascotas.models import Mascota
+
+FORMATOS = ("csv", "jsonl")
+TAM_LOTE = 500
+OBLIGATORIOS = ("nombre", "tipo", "raza", "edad", "sexo", "descripcion", "ubicacion")
+TEXTOS = ("nombre", "raza", "descripcion", "ubicacion")
+ERROR_CODIFICACION = "La línea no está en UTF-8: guarda la planilla como «CSV UTF-8» y vuelve a importarla."
+
+
+@dataclass
+class ResultadoImportacion:
+    leidas: int = 0
+    validas: int = 0
+    creadas: int = 0
+    errores: list = field(default_factory=list)    # [(línea, mensaje)]
+
+    @property
+    def con_error(self) -> int:
+        return len({linea for linea, _ in self.errores})
+
+
+def detectar_formato(nombre: str):
+    """('csv' | 'jsonl' | None, comprimido) a partir del nombre del archivo."""
+    nombre = nombre.lower()
+    comprimido = nombre.endswith(".gz")
+    if comprimido:
+        nombre = nombre[:-3]
+    if nombre.endswith(".csv"):
+        return "csv", comprimido
+    if nombre.endswith((".jsonl", ".ndjson")):
+        return "jsonl", comprimido
+    return None, comprimido
+
+
+def _lineas(binario, estado):
+    """
+    Decodifica el archivo línea a línea. Una línea que no es UTF-8 (planilla
+    exportada en Latin-1 / Windows-1252) se entrega con � y su número queda
+    en estado["malas"]: la fila se informa y el resto del archivo sigue.
+    """
+    for n, bruta in enumerate(binario, start=1):
+        estado["linea"] = n
+        # utf-8-sig: las planillas exportadas desde Excel suelen traer BOM
+        codificacion = "utf-8-sig" if n == 1 else "utf-8"
+        try:
+            yield bruta.decode(codificacion)
+        except UnicodeDecodeError:
+            estado["malas"].add(n)
+            yield bruta.decode(codificacion, errors="replace")
+
+
+def leer_filas(binario, formato, comprimido=False):
+    """
+    Genera (línea, datos, error) por cada fila de un archivo binario abierto.
+    `datos` es un dict con claves en minúscula; `error` un texto si la fila
+    no se pudo interpretar. Si el archivo deja de poder leerse (un .gz
+    corrupto o truncado, un CSV mal formado) se entrega un último error con
+    la línea donde ocurrió y se termina.
+    """
+    if comprimido:
+        binario = gzip.GzipFile(fileobj=binario)
+    estado = {"linea": 0, "malas": set()}
+    filas = _filas_csv if formato == "csv" else _filas_jsonl
+    try:
+        yield from filas(_lineas(binario, estado), estado)
+    except (OSError, EOFError, zlib.error, csv.Error) as e:
+        # gzip.BadGzipFile es un OSError; EOFError: .gz truncado
+        yield estado["linea"] + 1, None, f"No se pudo seguir leyendo el archivo: {e}"
+
+
+def _filas_csv(lineas, estado):
+    lector = csv.DictReader(lineas)
+    encabezado = lector.fieldnames or []
+    if 1 in estado["malas"]:
+        yield 1, None, ERROR_CODIFICACION
+        return
+    lector.fieldnames = [(c or "").strip().lower() for c in encabezado]
+    anterior = lector.line_num
+    for fila in lector:
+        # Una fila puede ocupar varias líneas (campos entre comillas)
+        desde, anterior = anterior + 1, lector.line_num
+        if estado["malas"].intersection(range(desde, anterior + 1)):
+            yield lector.line_num, None, ERROR_CODIFICACION
+            continue
+        if None in fila:
+            yield lector.line_num, None, "La fila tiene más columnas que el encabezado."
+            continue
+        yield lector.line_num, fila, None
+
+
+def _filas_jsonl(lineas, estado):
+    for n, linea in enumerate(lineas, start=1):
+        if not linea.strip():
+            continue
+        if n in estado["malas"]:
+            yield n, None, ERROR_CODIFICACION
+            continue
+        try:
+            fila = json.loads(linea)
+        except ValueError as e:
+            yield n, None, f"JSON inválido: {e}"
+            continue
+        if not isinstance(fila, dict):
+            yield n, None, "Cada línea debe ser un objeto JSON."
+            continue
+        yield n, {str(k).strip().lower(): v for k, v in fila.items()}, None
+
+
+def _opciones(choices):
+    """{clave o etiqueta normalizada: clave} para aceptar 'Hámster', 'hamster', 'HAMSTER'."""
+    mapa = {}
+    for clave, etiqueta in choices:
+        mapa[normalizar(clave).strip()] = clave
+        mapa[normalizar(etiqueta).strip()] = clave
+    return mapa
+
+
+OPCIONES = {
+    "tipo": _opciones(TIPOS_MASCOTA),
+    "sexo": _opciones(SEXOS),
+    "estado": _opciones(ESTADOS_MASCOTA),
+}
+LARGOS = {c: Mascota._meta.get_field(c).max_length for c in TEXTOS}
+
+
+def _texto(valor):
+    return "" if valor is None else str(valor).strip()
+
+
+def validar_fila(datos):
+    """(campos para Mascota, nombre de foto o "", [errores]) de una fila ya leída."""
+    errores = []
+    campos = {}
+    for c in OBLIGATORIOS:
+        if not _texto(datos.get(c)):
+            errores.append(f"Falta '{c}'.")
+
+    for c in TEXTOS:
+        valor = _texto(datos.get(c))
+        if LARGOS[c] and len(valor) > LARGOS[c]:
+            errores.append(f"'{c}' supera {LARGOS[c]} caracteres.")
+        campos[c] = valor
+
+    for c, opciones in OPCIONES.items():
+        valor = _texto(datos.get(c))
+        if not valor:
+            continue
+        clave = opciones.get(normalizar(valor).strip())
+        if clave is None:
+            validas = ", ".join(sorted(set(opciones.values())))
+            errores.append(f"'{c}' no válido: {valor!r} (opciones: {validas}).")
+        campos[c] = clave
+    campos.setdefault("estado", facetas.ESTADO_VISIBLE)
+
+    edad = _texto(datos.get("edad"))
+    if edad:
+        try:
+            campos["edad"] = int(edad)
+            if campos["edad"] < 0:
+                raise ValueError
+        except ValueError:
+            errores.append(f"'edad' debe ser un número entero de meses: {edad!r}.")
+
+    return campos, _texto(datos.get("foto")), errores
+
+
+class Fotos:
+    """Toma fotos desde un directorio local y las copia al storage del campo `foto`."""
+
+    def __init__(self, directorio, guardar=True):
+        self.raiz = os.path.realpath(directorio)
+        self.guardar = guardar
+        self.campo = Mascota._meta.get_field("foto")
+        self._guardadas = {}          # nombre en el CSV -> nombre en el storage
+
+    def importar(self, nombre):
+        """Nombre en el storage de la foto `nombre`; lanza ValueError si no sirve."""
+        if nombre in self._guardadas:
+            return self._guardadas[nombre]
+        ruta = os.path.realpath(os.path.join(self.raiz, nombre))
+        if os.path.commonpath([ruta, self.raiz]) != self.raiz:
+            raise ValueError(f"La foto {nombre!r} está fuera del directorio de fotos.")
+        if not os.path.isfile(ruta):
+            raise ValueError(f"No existe la foto {nombre!r}.")
+        try:
+            with Image.open(ruta) as img:     # solo lee la cabecera
+                validar(img)
+        except (UnidentifiedImageError, ImagenRechazada, OSError) as e:
+            raise ValueError(f"Foto {nombre!r} no válida: {e}")
+        if not self.guardar:
+            return nombre
+        with open(ruta, "rb") as f:
+            destino = self.campo.generate_filename(None, os.path.basename(ruta))
+            guardada = self.campo.storage.save(destino, File(f), max_length=self.campo.max_length)
+        self._guardadas[nombre] = guardada
+        return guardada
+
+
+def _insertar(pendientes, resultado):
+    """Inserta un lote [(línea, Mascota)]; si la BD lo rechaza, fila por fila."""
+    try:
+        with transaction.atomic():
+            creadas = Mascota.objects.bulk_create([m for _, m in pendientes])
+            _despues_de_insertar(creadas)
+        return len(creadas)
+    except DatabaseError:
+        pass
+
+    creadas = 0
+    for linea, m in pendientes:
+        m.pk = None
+        try:
+            with transaction.atomic():
+                _despues_de_insertar(Mascota.objects.bulk_create([m]))
+            creadas += 1
+        except DatabaseError as e:
+            resultado.errores.append((linea, f"Error de base de datos: {e}"))
+    return creadas
+
+
+def _despues_de_insertar(mascotas):
+    # Lo que save() y las señales harían por cada una
+    facetas.registrar_altas(mascotas)
+    sincronizar_variantes_lote([m for m in mascotas if m.foto], "foto", "foto_variantes")
+
+
+def importar(binario, formato, responsable, comprimido=False, directorio_fotos=None,
+             tam_lote=TAM_LOTE, dry_run=False, progreso=None):
+    """
+    Importa las mascotas de `binario` (archivo abierto en modo binario) a nombre
+    de `responsable`. Con dry_run solo valida (también que las fotos existan).
+    `progreso(resultado)` se llama después de cada lote.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}")
+    fotos = Fotos(directorio_fotos, guardar=not dry_run) if directorio_fotos else None
+    resultado = ResultadoImportacion()
+    pendientes = []
+
+    for linea, datos, error in leer_filas(binario, formato, comprimido):
+        resultado.leidas += 1
+        if error:
+            resultado.errores.append((linea, error))
+            continue
+        campos, foto, errores = validar_fila(datos)
+        if foto and not errores:
+            if fotos is None:
+                errores.append("La fila trae 'foto' pero no se indicó un directorio de fotos.")
+            else:
+                try:
+                    campos["foto"] = fotos.importar(foto)
+                except ValueError as e:
+                    errores.append(str(e))
+        if errores:
+            resultado.errores.extend((linea, e) for e in errores)
+            continue
+
+        resultado.validas += 1
+        m = Mascota(**campos, responsable=responsable)
+        m.actualizar_campos_derivados()   # bulk_create no llama a save()
+        pendientes.append((linea, m))
+        if len(pendientes) >= tam_lote:
+            if not dry_run:
+                resultado.creadas += _insertar(pendientes, resultado)
+            pendientes = []
+            if progreso:
+                progreso(resultado)
+
+    if pendientes and not dry_run:
+        resultado.creadas += _insertar(pendientes, resultado)
+    if progreso:
+        progreso(resultado)
+    return resultado
@@ -0,0 +1,78 @@
+# registro_mascotas/management/commands/importar_mascotas.py
+"""
+Importa mascotas desde un CSV / JSONL (opcionalmente .gz) de un refugio.
+
+    python manage.py importar_mascotas refugio.csv --responsable refugio_norte
+    python manage.py importar_mascotas refugio.jsonl.gz --responsable refugio_norte --fotos /srv/fotos
+    python manage.py importar_mascotas refugio.csv --responsable refugio_norte --dry-run
+
+Las filas con errores se informan (línea y motivo) y no detienen el resto.
+Ver registro_mascotas.importacion para el formato de las columnas.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from registro_mascotas import importacion
+
+AVISO_CADA = 2.0      # segundos entre líneas de avance
+
+
+class Command(BaseCommand):
+    help = "Importa mascotas en bloque desde un archivo CSV o JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivo", help="Ruta del .csv / .jsonl (se aceptan .gz).")
+        parser.add_argument("--responsable", required=True,
+                            help="Username del usuario (refugio) a cargo de las mascotas.")
+        parser.add_argument("--formato", choices=importacion.FORMATOS,
+                            help="Formato del archivo (por defecto, según la extensión).")
+        parser.add_argument("--fotos", default=None,
+                            help="Directorio local donde buscar la columna 'foto'.")
+        parser.add_argument("--lote", type=int, default=importacion.TAM_LOTE,
+                            help=f"Filas por transacción/bulk_create (default: {importacion.TAM_LOTE}).")
+        parser.add_argument("--dry-run", action="store_true", help="Solo valida; no inserta nada.")
+        parser.add_argument("--max-errores", type=int, default=50,
+                            help="Errores a listar en pantalla (default: 50).")
+
+    def handle(self, *args, **opts):
+        formato, comprimido = importacion.detectar_formato(opts["archivo"])
+        formato = opts["formato"] or formato
+        if formato is None:
+            raise CommandError("No se pudo deducir el formato; usa --formato csv|jsonl.")
+        try:
+            responsable = get_user_model().objects.get(username=opts["responsable"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No existe el usuario {opts['responsable']!r}.")
+
+        inicio = ultimo_aviso = time.monotonic()
+
+        def progreso(r):
+            nonlocal ultimo_aviso
+            if time.monotonic() - ultimo_aviso >= AVISO_CADA:
+                ultimo_aviso = time.monotonic()
+                self.stdout.write(f"  {r.leidas} fila(s) leídas, {r.creadas} creada(s), {r.con_error} con error…")
+
+        try:
+            with open(opts["archivo"], "rb") as f:
+                r = importacion.importar(
+                    f, formato, responsable, comprimido=comprimido,
+                    directorio_fotos=opts["fotos"], tam_lote=opts["lote"],
+                    dry_run=opts["dry_run"], progreso=progreso,
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        segundos = time.monotonic() - inicio
+
+        for linea, mensaje in r.errores[:opts["max_errores"]]:
+            self.stdout.write(self.style.WARNING(f"  línea {linea}: {mensaje}"))
+        if len(r.errores) > opts["max_errores"]:
+            self.stdout.write(f"  … y {len(r.errores) - opts['max_errores']} error(es) más.")
+
+        ritmo = r.leidas / segundos if segundos else 0
+        resumen = f"{r.leidas} fila(s) en {segundos:.1f} s ({ritmo:.0f} filas/s): "
+        if opts["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(resumen + f"{r.validas} válida(s), {r.con_error} con error (dry-run)."))
+        else:
+            self.stdout.write(self.style.SUCCESS(resumen + f"{r.creadas} creada(s), {r.con_error} con error."))
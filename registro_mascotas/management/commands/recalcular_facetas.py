@@ -0,0 +1,12 @@
+# registro_mascotas/management/commands/recalcular_facetas.py
+from django.core.management.base import BaseCommand
+
+from registro_mascotas import facetas
+
+
+class Command(BaseCommand):
+    help = "Reconstruye desde cero los conteos por faceta de mascotas disponibles."
+
+    def handle(self, *args, **opts):
+        filas = facetas.recalcular()
+        self.stdout.write(self.style.SUCCESS(f"Listo: {filas} conteo(s) de faceta."))
@@ -0,0 +1,64 @@
+# registro_mascotas/management/commands/resolver_ubicaciones.py
+"""
+Rellena `region` y `ciudad` (resueltas desde `ubicacion`) en filas existentes
+de Mascota y SolicitudPublicacion.
+
+    python manage.py resolver_ubicaciones            # solo filas sin región
+    python manage.py resolver_ubicaciones --todas    # recalcula todo
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from portal_mascotas.ubicaciones import resolver_ubicacion
+from registro_mascotas import facetas
+from registro_mascotas.models import Mascota, SolicitudPublicacion
+
+
+class Command(BaseCommand):
+    help = "Resuelve región/ciudad desde el texto de ubicación en filas existentes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--todas", action="store_true",
+                            help="Recalcula todas las filas, no solo las que no tienen región.")
+        parser.add_argument("--lote", type=int, default=1000,
+                            help="Filas por bulk_update (default: 1000).")
+
+    def handle(self, *args, **opts):
+        for modelo in (Mascota, SolicitudPublicacion):
+            actualizadas, sin_resolver = self._procesar(modelo, opts["todas"], opts["lote"])
+            self.stdout.write(
+                f"{modelo.__name__}: {actualizadas} actualizada(s), "
+                f"{sin_resolver} sin región reconocible."
+            )
+            if modelo is Mascota and actualizadas:
+                # bulk_update no pasa por las señales: reconstruir conteos de región/ciudad
+                facetas.recalcular()
+        self.stdout.write(self.style.SUCCESS("Listo."))
+
+    def _procesar(self, modelo, todas, tam_lote):
+        qs = modelo.objects.only("id", "ubicacion", "region", "ciudad").order_by("id")
+        if not todas:
+            qs = qs.filter(region="")
+
+        actualizadas = sin_resolver = 0
+        lote = []
+        for obj in qs.iterator(chunk_size=tam_lote):
+            region, ciudad = resolver_ubicacion(obj.ubicacion)
+            if not region:
+                sin_resolver += 1
+            if (region, ciudad) == (obj.region, obj.ciudad):
+                continue
+            obj.region, obj.ciudad = region, ciudad
+            lote.append(obj)
+            if len(lote) >= tam_lote:
+                actualizadas += self._guardar(modelo, lote)
+                lote = []
+        if lote:
+            actualizadas += self._guardar(modelo, lote)
+        return actualizadas, sin_resolver
+
+    @staticmethod
+    def _guardar(modelo, lote):
+        with transaction.atomic():
+            modelo.objects.bulk_update(lote, ["region", "ciudad"])
+        return len(lote)
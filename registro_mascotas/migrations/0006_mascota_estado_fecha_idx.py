@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_mascotas', '0005_solicitudpublicacion_aceptacion_mensaje_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mascota',
+            index=models.Index(fields=['estado', '-fecha_registro', '-id'], name='mascota_estado_fecha_idx'),
+        ),
+    ]
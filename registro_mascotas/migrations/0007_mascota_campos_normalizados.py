@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:17
+
+from django.db import migrations, models
+
+from portal_mascotas.texto import normalizar
+
+
+def rellenar_normalizados(apps, schema_editor):
+    Mascota = apps.get_model('registro_mascotas', 'Mascota')
+    lote = []
+    for m in Mascota.objects.only('id', 'nombre', 'raza', 'ubicacion').iterator(chunk_size=1000):
+        m.nombre_norm = normalizar(m.nombre)
+        m.raza_norm = normalizar(m.raza)
+        m.ubicacion_norm = normalizar(m.ubicacion)
+        lote.append(m)
+        if len(lote) >= 1000:
+            Mascota.objects.bulk_update(lote, ['nombre_norm', 'raza_norm', 'ubicacion_norm'])
+            lote = []
+    if lote:
+        Mascota.objects.bulk_update(lote, ['nombre_norm', 'raza_norm', 'ubicacion_norm'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_mascotas', '0006_mascota_estado_fecha_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mascota',
+            name='nombre_norm',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='mascota',
+            name='raza_norm',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='mascota',
+            name='ubicacion_norm',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=200),
+        ),
+        migrations.RunPython(rellenar_normalizados, migrations.RunPython.noop),
+    ]
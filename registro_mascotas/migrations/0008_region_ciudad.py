@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_mascotas', '0007_mascota_campos_normalizados'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mascota',
+            name='ciudad',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=120),
+        ),
+        migrations.AddField(
+            model_name='mascota',
+            name='region',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=80),
+        ),
+        migrations.AddField(
+            model_name='solicitudpublicacion',
+            name='ciudad',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=120),
+        ),
+        migrations.AddField(
+            model_name='solicitudpublicacion',
+            name='region',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=80),
+        ),
+    ]
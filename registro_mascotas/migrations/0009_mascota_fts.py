@@ -0,0 +1,43 @@
+# Índice de texto completo (SQLite FTS5) para la búsqueda del home.
+# Ver registro_mascotas/busqueda.py. En otros motores la tabla no se crea.
+
+import django.db.models.deletion
+import registro_mascotas.busqueda
+from django.db import migrations, models
+
+
+def crear(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from registro_mascotas.busqueda import crear_indice
+    crear_indice(schema_editor)
+
+
+def eliminar(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from registro_mascotas.busqueda import eliminar_indice
+    eliminar_indice(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_mascotas', '0008_region_ciudad'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear, eliminar),
+        migrations.CreateModel(
+            name='MascotaFTS',
+            fields=[
+                ('mascota', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='fts', serialize=False, to='registro_mascotas.mascota')),
+                ('documento', registro_mascotas.busqueda.CampoMatch(db_column='registro_mascotas_mascota_fts')),
+                ('rank', models.FloatField(db_column='rank')),
+            ],
+            options={
+                'db_table': 'registro_mascotas_mascota_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:27
+
+from django.db import migrations, models
+
+
+def calcular_conteos(apps, schema_editor):
+    from registro_mascotas.facetas import recalcular
+    recalcular(
+        apps.get_model('registro_mascotas', 'Mascota'),
+        apps.get_model('registro_mascotas', 'ConteoFaceta'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_mascotas', '0009_mascota_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConteoFaceta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('faceta', models.CharField(max_length=10)),
+                ('valor', models.CharField(max_length=120)),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Conteo de faceta',
+                'verbose_name_plural': 'Conteos de facetas',
+                'constraints': [models.UniqueConstraint(fields=('faceta', 'valor'), name='conteo_faceta_unico')],
+            },
+        ),
+        migrations.RunPython(calcular_conteos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:32
+
+from django.db import migrations, models
+
+
+def recrear_indice_fts(apps, schema_editor):
+    # En SQLite, AddField reconstruye registro_mascotas_mascota y se pierden
+    # los triggers del índice FTS (migración 0009): se vuelven a crear.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from registro_mascotas.busqueda import crear_indice
+    crear_indice(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_mascotas', '0010_conteofaceta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mascota',
+            name='foto_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='solicitudpublicacion',
+            name='foto_variantes',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(recrear_indice_fts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_mascotas', '0011_foto_variantes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solicitudpublicacion',
+            name='mascota',
+            field=models.OneToOneField(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='solicitud_origen', to='registro_mascotas.mascota'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:44
+
+from django.db import migrations, models
+
+
+def recrear_indice_fts(apps, schema_editor):
+    # AlterField reconstruye registro_mascotas_mascota en SQLite y se pierden
+    # los triggers del índice FTS (migración 0009): se vuelven a crear.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from registro_mascotas.busqueda import crear_indice
+    crear_indice(schema_editor)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_mascotas', '0012_solicitudpublicacion_mascota'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mascota',
+            name='nombre_norm',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='mascota',
+            name='raza_norm',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='mascota',
+            name='ubicacion_norm',
+            field=models.CharField(blank=True, default='', editable=False, max_length=200),
+        ),
+        migrations.RunPython(recrear_indice_fts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_mascotas', '0013_mascota_norm_sin_indices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solicitudpublicacion',
+            name='fecha_revision',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
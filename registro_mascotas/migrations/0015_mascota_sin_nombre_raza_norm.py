@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:06
+
+from django.db import migrations
+
+
+def recrear_indice_fts(apps, schema_editor):
+    # RemoveField puede reconstruir registro_mascotas_mascota en SQLite y se
+    # pierden los triggers del índice FTS (migración 0009): se vuelven a crear.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from registro_mascotas.busqueda import crear_indice
+    crear_indice(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_mascotas', '0014_solicitudpublicacion_fecha_revision'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='mascota',
+            name='nombre_norm',
+        ),
+        migrations.RemoveField(
+            model_name='mascota',
+            name='raza_norm',
+        ),
+        migrations.RunPython(recrear_indice_fts, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,20 @@
 from django.db import models
 from django.conf import settings
 from portal_mascotas.constantes import TIPOS_MASCOTA, SEXOS, ESTADOS_MASCOTA
+from portal_mascotas.imagenes import sincronizar_variantes
+from portal_mascotas.texto import normalizar
+from portal_mascotas.ubicaciones import resolver_ubicacion
+from registro_mascotas.busqueda import FTS_TABLA, CampoMatch
+
+
+def _ampliar_update_fields(kwargs, derivados):
+    """Si save(update_fields=...) toca un campo origen, incluye también sus derivados."""
+    update_fields = kwargs.get('update_fields')
+    if update_fields is None:
+        return
+    extra = [d for origen, ds in derivados.items() if origen in update_fields for d in ds]
+    kwargs['update_fields'] = list(update_fields) + extra
+
 
 class Mascota(models.Model):
     nombre = models.CharField(max_length=100, help_text="Nombre de la mascota")
@@ -12,6 +26,8 @@ class Mascota(models.Model):
     descripcion = models.TextField(help_text="Descripción de la mascota")
     ubicacion = models.CharField(max_length=200, help_text="Ciudad o ubicación donde se encuentra la mascota")
     foto = models.ImageField(upload_to='mascotas/', blank=True, null=True)
+    # Rutas de las variantes redimensionadas de `foto` (ver portal_mascotas.imagenes)
+    foto_variantes = models.JSONField(default=dict, blank=True, editable=False)
     estado = models.CharField(max_length=15, choices=ESTADOS_MASCOTA, default='disponible')
     fecha_registro = models.DateTimeField(auto_now_add=True)
     responsable = models.ForeignKey(
@@ -20,14 +36,101 @@ class Mascota(models.Model):
         related_name='mascotas_registradas'
     )
 
+    # Copia normalizada (sin tildes, minúsculas) para el filtro `ubic` del home; se
+    # calcula al guardar. El texto libre (nombre, raza…) va por el índice FTS5.
+    # Sin índice: el filtro es __contains (LIKE '%x%') y un B-tree no sirve para eso.
+    ubicacion_norm = models.CharField(max_length=200, blank=True, default='', editable=False)
+
+    # Región/ciudad resueltas desde `ubicacion` al guardar (filtros por igualdad)
+    region = models.CharField(max_length=80, blank=True, default='', editable=False, db_index=True)
+    ciudad = models.CharField(max_length=120, blank=True, default='', editable=False, db_index=True)
+
+    # campo origen -> columna normalizada
+    CAMPOS_NORMALIZADOS = {
+        'ubicacion': 'ubicacion_norm',
+    }
+    # campo origen -> campos que se recalculan a partir de él
+    CAMPOS_DERIVADOS = {
+        'ubicacion': ['ubicacion_norm', 'region', 'ciudad'],
+    }
+
     class Meta:
         verbose_name = "Mascota"
         verbose_name_plural = "Mascotas"
         ordering = ['-fecha_registro']
+        indexes = [
+            # Listado público: WHERE estado = ... ORDER BY fecha_registro DESC, id DESC (keyset)
+            models.Index(fields=['estado', '-fecha_registro', '-id'], name='mascota_estado_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nombre} ({self.tipo})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Valores tal como vienen de la BD (para detectar cambios en las señales)
+        instancia._valores_originales = dict(zip(field_names, values))
+        return instancia
+
+    def valores_originales(self, campos):
+        """Valores de `campos` al cargarse desde la BD, o None si es nueva o alguno estaba diferido."""
+        originales = getattr(self, '_valores_originales', None)
+        if originales is None or any(c not in originales for c in campos):
+            return None
+        return {c: originales[c] for c in campos}
+
+    def actualizar_campos_derivados(self):
+        """Recalcula columnas normalizadas y región/ciudad (también para bulk_create)."""
+        for origen, destino in self.CAMPOS_NORMALIZADOS.items():
+            setattr(self, destino, normalizar(getattr(self, origen)))
+        self.region, self.ciudad = resolver_ubicacion(self.ubicacion)
+
+    def save(self, *args, **kwargs):
+        self.actualizar_campos_derivados()
+        _ampliar_update_fields(kwargs, self.CAMPOS_DERIVADOS)
+        super().save(*args, **kwargs)
+        sincronizar_variantes(self, 'foto', 'foto_variantes', kwargs.get('update_fields'))
+
+
+class MascotaFTS(models.Model):
+    """
+    Vista de solo lectura sobre la tabla virtual FTS5 (ver registro_mascotas.busqueda).
+    Permite hacer JOIN desde Mascota (`mascota.fts`) y ordenar por `rank` (BM25).
+    La crea y mantiene la migración 0009 con triggers; Django no la gestiona.
+    """
+    mascota = models.OneToOneField(
+        Mascota, primary_key=True, db_column='rowid',
+        on_delete=models.DO_NOTHING, related_name='fts',
+    )
+    # Columna oculta con el nombre de la tabla: destino de `MATCH`
+    documento = CampoMatch(db_column=FTS_TABLA)
+    rank = models.FloatField(db_column='rank')
+
+    class Meta:
+        managed = False
+        db_table = FTS_TABLA
+
+
+class ConteoFaceta(models.Model):
+    """
+    Tabla resumen: cuántas mascotas disponibles hay por valor de cada faceta
+    del home (tipo, sexo, rango de edad, región, ciudad). Ver registro_mascotas.facetas.
+    """
+    faceta = models.CharField(max_length=10)
+    valor = models.CharField(max_length=120)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Conteo de faceta"
+        verbose_name_plural = "Conteos de facetas"
+        constraints = [
+            models.UniqueConstraint(fields=['faceta', 'valor'], name='conteo_faceta_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.faceta}={self.valor}: {self.total}"
+
 
 class SolicitudPublicacion(models.Model):
     """
@@ -48,6 +151,9 @@ class SolicitudPublicacion(models.Model):
     descripcion = models.TextField()
     ubicacion = models.CharField(max_length=200)
     foto = models.ImageField(upload_to='mascotas/solicitudes/', blank=True, null=True)
+    foto_variantes = models.JSONField(default=dict, blank=True, editable=False)
+    region = models.CharField(max_length=80, blank=True, default='', editable=False, db_index=True)
+    ciudad = models.CharField(max_length=120, blank=True, default='', editable=False, db_index=True)
 
     # 👤 Datos de contacto del solicitante
     contacto_nombre = models.CharField(max_length=100, default='', blank=True)
@@ -62,12 +168,29 @@ class SolicitudPublicacion(models.Model):
     estado = models.CharField(max_length=15, default='pendiente')  # pendiente | aprobada | rechazada
     rechazo_motivo = models.TextField(default='', blank=True)      # motivo mostrado al usuario cuando se rechaza
     aceptacion_mensaje = models.TextField(default='', blank=True)  # mensaje automático al aprobar
+    # Mascota creada al aprobar (hace idempotente la aprobación)
+    mascota = models.OneToOneField(
+        Mascota, null=True, blank=True, editable=False,
+        on_delete=models.SET_NULL, related_name='solicitud_origen',
+    )
 
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Cuándo se aprobó o rechazó; también identifica las filas de cada acción del admin
+    fecha_revision = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ['-fecha_creacion']
 
+    CAMPOS_DERIVADOS = {
+        'ubicacion': ['region', 'ciudad'],
+    }
+
     def __str__(self):
         return f"SolicitudPublicacion({self.nombre}) de {self.usuario}"
 
+    def save(self, *args, **kwargs):
+        self.region, self.ciudad = resolver_ubicacion(self.ubicacion)
+        _ampliar_update_fields(kwargs, self.CAMPOS_DERIVADOS)
+        super().save(*args, **kwargs)
+        sincronizar_variantes(self, 'foto', 'foto_variantes', kwargs.get('update_fields'))
+
@@ -0,0 +1,110 @@
+# registro_mascotas/publicaciones.py
+"""
+Aprobación y rechazo de SolicitudPublicacion por lotes (acciones del admin).
+
+Ambas operaciones son por conjuntos y transaccionales: el costo en consultas
+no depende de cuántas solicitudes se seleccionen, y dos administradores
+aprobando a la vez no pueden crear mascotas duplicadas:
+
+  - las filas pendientes se bloquean con select_for_update (PostgreSQL/MySQL);
+  - además se "reservan" con un UPDATE condicionado a estado='pendiente'
+    (en SQLite, donde select_for_update no bloquea, ese UPDATE toma el
+    candado de escritura y las filas que otro ya aprobó quedan fuera);
+  - cada solicitud aprobada queda enlazada a su Mascota (`solicitud.mascota`),
+    así que repetir la acción sobre la misma selección no crea nada.
+
+El aviso por correo a cada usuario se encola en la misma transacción
+(portal_mascotas.correos), solo para las filas que cambió esta acción: el
+UPDATE marca `fecha_revision` con su propio instante y se relee por ese
+valor, así que si dos administradores rechazan la misma selección a la vez,
+cada solicitud recibe un solo aviso.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from portal_mascotas import correos
+from portal_mascotas.imagenes import sincronizar_variantes_lote
+from registro_mascotas import facetas
+from registro_mascotas.models import Mascota, SolicitudPublicacion
+
+MENSAJE_APROBACION = "✅ Tu solicitud fue aprobada. La mascota ya está publicada en el portal."
+ASUNTO_APROBACION = "{nombre} ya está publicado en AdoptaPortal"
+ASUNTO_RECHAZO = "Tu solicitud para publicar a {nombre} fue rechazada"
+CUERPO_RECHAZO = "Revisamos tu solicitud y no pudimos publicarla.\n\nMotivo: {motivo}"
+
+# Campos que pasan tal cual de la solicitud a la Mascota
+CAMPOS_COPIADOS = (
+    "nombre", "tipo", "raza", "edad", "sexo", "descripcion", "ubicacion",
+    "foto", "foto_variantes",
+)
+
+
+def _mascota_desde(solicitud):
+    m = Mascota(
+        **{c: getattr(solicitud, c) for c in CAMPOS_COPIADOS},
+        estado=facetas.ESTADO_VISIBLE,
+        responsable_id=solicitud.usuario_id,
+    )
+    m.actualizar_campos_derivados()   # bulk_create no llama a save()
+    return m
+
+
+def aprobar(queryset):
+    """
+    Crea una Mascota por cada solicitud pendiente de `queryset` y las marca
+    aprobadas. Devuelve (mascotas creadas, cuántas de la selección ya estaban
+    procesadas); la selección se lee una vez, junto con las pendientes.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        seleccion = list(queryset.select_for_update().values_list("pk", "estado", "mascota_id"))
+        ids = [pk for pk, estado, mascota_id in seleccion if estado == "pendiente" and mascota_id is None]
+        if not ids:
+            return [], len(seleccion)
+        SolicitudPublicacion.objects.filter(pk__in=ids, estado="pendiente").update(
+            estado="aprobada", aceptacion_mensaje=MENSAJE_APROBACION, fecha_revision=ahora,
+        )
+        solicitudes = list(
+            SolicitudPublicacion.objects.filter(pk__in=ids, estado="aprobada", mascota__isnull=True)
+            .select_related("usuario")
+            .order_by("pk")
+        )
+        mascotas = Mascota.objects.bulk_create([_mascota_desde(s) for s in solicitudes])
+        for s, m in zip(solicitudes, mascotas):
+            s.mascota = m
+        SolicitudPublicacion.objects.bulk_update(solicitudes, ["mascota"])
+
+        # Lo que save() y las señales harían por cada una
+        facetas.registrar_altas(mascotas)
+        sincronizar_variantes_lote(mascotas, "foto", "foto_variantes")
+        correos.encolar_lote(
+            (s.usuario.email or s.contacto_email, ASUNTO_APROBACION.format(nombre=s.nombre),
+             MENSAJE_APROBACION, "publicacion_aprobada")
+            for s in solicitudes
+        )
+    return mascotas, len(seleccion) - len(mascotas)
+
+
+def rechazar(queryset, motivo):
+    """Marca como rechazadas las solicitudes pendientes de `queryset`; devuelve cuántas."""
+    ahora = timezone.now()
+    with transaction.atomic():
+        seleccion = queryset.values("pk")
+        rechazadas = (
+            SolicitudPublicacion.objects
+            .filter(pk__in=seleccion, estado="pendiente")
+            .update(estado="rechazada", rechazo_motivo=motivo, fecha_revision=ahora)
+        )
+        if rechazadas:
+            # Solo las que cambió este UPDATE (otro admin pudo rechazar parte de la selección)
+            avisar = (
+                SolicitudPublicacion.objects
+                .filter(pk__in=seleccion, estado="rechazada", fecha_revision=ahora)
+                .values_list("usuario__email", "contacto_email", "nombre")
+            )
+            correos.encolar_lote(
+                (email or contacto, ASUNTO_RECHAZO.format(nombre=nombre),
+                 CUERPO_RECHAZO.format(motivo=motivo), "publicacion_rechazada")
+                for email, contacto, nombre in avisar
+            )
+    return rechazadas
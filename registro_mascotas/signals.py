@@ -0,0 +1,51 @@
+# registro_mascotas/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from portal_mascotas.cache_paginas import invalidar_home
+from registro_mascotas import facetas
+from registro_mascotas.models import Mascota
+
+
+def _valores_previos(instance):
+    """Valores de faceta antes de este save (desde la carga; o de la BD si estaban diferidos)."""
+    previos = instance.valores_originales(facetas.CAMPOS)
+    if previos is None and instance.pk is not None:
+        previos = (
+            Mascota.objects.filter(pk=instance.pk).values(*facetas.CAMPOS).first()
+        )
+    return previos
+
+
+@receiver(pre_save, sender=Mascota, dispatch_uid="mascota_facetas_pre_save")
+def recordar_facetas_previas(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._facetas_previas = None if instance._state.adding else _valores_previos(instance)
+
+
+@receiver(post_save, sender=Mascota, dispatch_uid="mascota_facetas_save")
+def actualizar_facetas_al_guardar(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    actuales = facetas.valores_de(instance)
+    previos = None if created else getattr(instance, "_facetas_previas", None)
+    if update_fields is not None and previos is not None:
+        # Con update_fields solo cambia en la BD lo guardado; lo demás conserva
+        # el valor previo aunque en memoria sea otro
+        actuales = {c: actuales[c] if c in update_fields else previos[c] for c in facetas.CAMPOS}
+    facetas.aplicar(facetas.diferencia(previos, actuales))
+    # El home solo muestra disponibles: invalidar si la mascota es o era visible
+    if facetas.ESTADO_VISIBLE in (actuales["estado"], (previos or {}).get("estado")):
+        transaction.on_commit(invalidar_home)
+    # Lo guardado pasa a ser el nuevo punto de comparación
+    instance._valores_originales = {**getattr(instance, "_valores_originales", {}), **actuales}
+
+
+@receiver(post_delete, sender=Mascota, dispatch_uid="mascota_facetas_delete")
+def actualizar_facetas_al_borrar(sender, instance, **kwargs):
+    previos = instance.valores_originales(facetas.CAMPOS) or facetas.valores_de(instance)
+    facetas.aplicar(facetas.diferencia(previos, None))
+    if previos.get("estado") == facetas.ESTADO_VISIBLE:
+        transaction.on_commit(invalidar_home)
@@ -0,0 +1,32 @@
+// registro_mascotas/static/registro_mascotas/js/admin_rechazo.js
+// Changelist de SolicitudPublicacion: el cuadro "Motivo del rechazo" solo se
+// muestra cuando la acción elegida es "Rechazar publicación".
+(function () {
+  var ACCION = 'accion_rechazar_publicacion';
+
+  function nodos() {
+    var sel = document.querySelector('select[name="action"]');
+    var ta = document.querySelector('textarea[name="rechazo_motivo"]');
+    var label = null;
+    if (ta) {
+      var prev = ta.previousElementSibling;
+      if (prev && prev.tagName && prev.tagName.toLowerCase() === 'label') { label = prev; }
+      if (!label && ta.id) { label = document.querySelector('label[for="' + ta.id + '"]'); }
+    }
+    return { sel: sel, ta: ta, label: label };
+  }
+
+  function alternar() {
+    var n = nodos();
+    if (!n.sel || !n.ta) return;
+    var mostrar = n.sel.value === ACCION;
+    n.ta.style.display = mostrar ? '' : 'none';
+    if (n.label) { n.label.style.display = mostrar ? '' : 'none'; }
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    alternar();
+    var sel = nodos().sel;
+    if (sel) { sel.addEventListener('change', alternar); }
+  });
+})();
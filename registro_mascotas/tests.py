@@ -1,3 +1,513 @@
+import gzip
+import os
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.db.models import QuerySet
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from portal_mascotas.ubicaciones import resolver_ubicacion
+from portal_mascotas.models import CorreoPendiente, TrabajoImagen
+from . import busqueda, facetas, importacion, publicaciones
+from .models import Mascota, SolicitudPublicacion
+
+
+class PresupuestoConsultasAdminTests(TestCase):
+    """
+    Presupuesto de consultas de los changelists del admin: fijo e
+    independiente de cuántas filas haya (sin N+1 ni COUNT(*) extra).
+    """
+    PRESUPUESTO = {
+        "admin:registro_mascotas_mascota_changelist": 7,
+        "admin:registro_mascotas_solicitudpublicacion_changelist": 7,
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser("admin", "admin@example.com", "x")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def crear_filas(self, n):
+        usuarios = get_user_model().objects.bulk_create([
+            get_user_model()(username=f"u{len(self.creados) + i}", email=f"u{len(self.creados) + i}@example.com")
+            for i in range(n)
+        ])
+        self.creados.extend(usuarios)
+        mascotas = [
+            Mascota(nombre=f"M{u.pk}", tipo="perro", raza="Mestizo", edad=12, sexo="macho",
+                    descripcion="x" * 500, ubicacion="Santiago, Región Metropolitana", responsable=u)
+            for u in usuarios
+        ]
+        for m in mascotas:
+            m.actualizar_campos_derivados()
+        Mascota.objects.bulk_create(mascotas)
+        SolicitudPublicacion.objects.bulk_create([
+            SolicitudPublicacion(usuario=u, nombre=f"S{u.pk}", tipo="gato", raza="Mestizo", edad=6,
+                                 sexo="hembra", descripcion="y" * 500, ubicacion="Valparaíso",
+                                 contacto_nombre="Contacto", contacto_email="c@example.com",
+                                 contacto_telefono="123", contacto_direccion="Calle 1",
+                                 acepta_declaracion=True)
+            for u in usuarios
+        ])
+
+    def consultas(self, nombre_url, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse(nombre_url), params)
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx)
+
+    def test_presupuesto_no_crece_con_las_filas(self):
+        self.creados = []
+        self.crear_filas(5)
+        pocas = {url: self.consultas(url) for url in self.PRESUPUESTO}
+        self.crear_filas(45)
+        for url, presupuesto in self.PRESUPUESTO.items():
+            cache.clear()
+            muchas = self.consultas(url)
+            self.assertLessEqual(muchas, presupuesto, url)
+            self.assertEqual(muchas, pocas[url], url)
+
+    def test_filtros_de_region_cacheados(self):
+        self.creados = []
+        self.crear_filas(3)
+        url = "admin:registro_mascotas_mascota_changelist"
+        region = Mascota.objects.values_list("region", flat=True).first()
+        self.assertTrue(region)
+        primera = self.consultas(url, region=region)
+        self.assertLessEqual(primera, self.PRESUPUESTO[url])
+        # Las opciones de región/ciudad quedan en caché: la segunda carga no repite los DISTINCT
+        self.assertEqual(self.consultas(url, region=region), primera - 2)
+
+
+def nueva_mascota(responsable, **campos):
+    datos = {"nombre": "Toby", "tipo": "perro", "raza": "Mestizo", "edad": 12, "sexo": "macho",
+             "descripcion": "Juguetón", "ubicacion": "Santiago - Ñuñoa", **campos}
+    return Mascota.objects.create(responsable=responsable, **datos)
+
+
+class UbicacionesTests(TestCase):
+    RM = "Región Metropolitana de Santiago"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("ubic", "ubic@example.com", "x")
+
+    def test_resolver_ubicacion(self):
+        casos = {
+            "santiago - ñuñoa": (self.RM, "Ñuñoa"),
+            "Viña del Mar": ("Región de Valparaíso",
+                             "Gran Valparaíso (Valparaíso, Viña del Mar, Concón, Quilpué y Villa Alemana)"),
+            "Osorno, Los Lagos": ("Región de Los Lagos", "Osorno"),
+            "en algún lugar de la RM": (self.RM, ""),
+            "Narnia": ("", ""),
+            "": ("", ""),
+        }
+        for texto, esperado in casos.items():
+            with self.subTest(texto=texto):
+                self.assertEqual(resolver_ubicacion(texto), esperado)
+
+    def test_filtros_del_home_por_region_y_ciudad(self):
+        mascota = nueva_mascota(self.usuario)
+        self.assertEqual((mascota.region, mascota.ciudad), (self.RM, "Ñuñoa"))
+        self.client.force_login(self.usuario)
+        for params, total in (({"region": self.RM}, 1), ({"region": self.RM, "ciudad": "Ñuñoa"}, 1),
+                              ({"region": self.RM, "ciudad": "Maipú"}, 0), ({"region": "Región de Los Lagos"}, 0)):
+            with self.subTest(**params):
+                self.assertEqual(len(self.client.get(reverse("home"), params).context["pagina"]), total)
+
+    def test_update_fields_con_ubicacion_recalcula(self):
+        mascota = nueva_mascota(self.usuario)
+        mascota.ubicacion = "Osorno"
+        mascota.save(update_fields=["ubicacion"])
+        mascota.refresh_from_db()
+        self.assertEqual((mascota.region, mascota.ciudad), ("Región de Los Lagos", "Osorno"))
+
+    def test_resolver_ubicaciones_rellena_filas_existentes(self):
+        mascota = nueva_mascota(self.usuario)
+        Mascota.objects.update(region="", ciudad="")
+        call_command("resolver_ubicaciones", stdout=StringIO())
+        mascota.refresh_from_db()
+        self.assertEqual((mascota.region, mascota.ciudad), (self.RM, "Ñuñoa"))
+
+
+class BusquedaFTSTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("fts", "fts@example.com", "x")
+        cls.toby = nueva_mascota(cls.usuario, nombre="Toby", raza="Mestizo",
+                                 descripcion="Perro juguetón de Ñuñoa", ubicacion="Santiago")
+        cls.perla = nueva_mascota(cls.usuario, nombre="Perla", raza="Poodle", sexo="hembra",
+                                  descripcion="Tranquila", ubicacion="Copiapó")
+        for i in range(30):
+            nueva_mascota(cls.usuario, nombre=f"Gato{i}", tipo="gato", raza="Persa",
+                          descripcion="Un gato muy mestizo", ubicacion="Arica")
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def pagina(self, q, cursor=""):
+        return self.client.get(reverse("home"), {"q": q, "cursor": cursor}).context["pagina"]
+
+    def ids(self, q):
+        return [m.pk for m in self.pagina(q)]
+
+    def test_triggers_presentes_tras_migrar(self):
+        # Una migración que reconstruya la tabla sin llamar a crear_indice los borraría
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+                           [Mascota._meta.db_table])
+            nombres = {fila[0] for fila in cursor.fetchall()}
+        self.assertEqual(nombres, {f"{busqueda.FTS_TABLA}_{s}" for s in ("ai", "ad", "au")})
+
+    def test_expresion_fts_segura(self):
+        self.assertEqual(busqueda.expresion_fts("Perro   café!"), '"perro"* "cafe"*')
+        self.assertEqual(busqueda.expresion_fts('" OR *'), '"or"*')
+        self.assertEqual(busqueda.expresion_fts("!!!"), "")
+        self.assertEqual(self.client.get(reverse("home"), {"q": "!!!"}).status_code, 200)
+
+    def test_sin_tildes_y_por_prefijo(self):
+        self.assertEqual(self.ids("nunoa"), [self.toby.pk])
+        self.assertEqual(self.ids("COPIAPO"), [self.perla.pk])
+        self.assertEqual(self.ids("pood"), [self.perla.pk])
+
+    def test_ranking_nombre_y_raza_pesan_mas(self):
+        # "mestizo" está en la raza de Toby y en la descripción de los 30 gatos
+        primera = self.pagina("mestizo")
+        self.assertEqual(primera.items[0].pk, self.toby.pk)
+        self.assertTrue(primera.tiene_siguiente)
+        segunda = self.pagina("mestizo", primera.siguiente)
+        self.assertEqual(len({m.pk for m in primera} | {m.pk for m in segunda}), 31)
+
+    def test_pagina_dos_no_depende_del_puntaje(self):
+        # Las altas cambian las estadísticas de BM25 y con ellas el puntaje de todas las filas
+        primera = self.pagina("mestizo")
+        Mascota.objects.bulk_create([
+            Mascota(nombre=f"Otro{i}", tipo="ave", raza="Loro", edad=1, sexo="macho",
+                    descripcion="un loro muy conversador " * 20, ubicacion="Arica", responsable=self.usuario)
+            for i in range(50)
+        ])
+        segunda = self.pagina("mestizo", primera.siguiente)
+        vistos = [m.pk for m in primera] + [m.pk for m in segunda]
+        self.assertEqual(len(vistos), 31)
+        self.assertEqual(len(set(vistos)), 31)
+
+    def test_relevancia_con_tope_de_resultados(self):
+        with mock.patch("portal_mascotas.views.TOPE_RESULTADOS", 30):
+            primera = self.pagina("mestizo")
+            segunda = self.pagina("mestizo", primera.siguiente)
+        self.assertEqual((len(primera), len(segunda)), (24, 6))
+        self.assertFalse(segunda.tiene_siguiente)
+
+    def test_indice_sigue_a_la_tabla(self):
+        self.perla.descripcion = "Ahora vive en Ñuñoa"
+        self.perla.save()
+        self.assertCountEqual(self.ids("nunoa"), [self.toby.pk, self.perla.pk])
+        Mascota.objects.filter(pk=self.perla.pk).update(raza="Caniche")
+        self.assertEqual(self.ids("caniche"), [self.perla.pk])
+        nuevas = [Mascota(nombre="Bulk", tipo="ave", raza="Loro", edad=1, sexo="macho",
+                          descripcion="x", ubicacion="Arica", responsable=self.usuario)]
+        Mascota.objects.bulk_create(nuevas)
+        self.assertEqual(len(self.ids("loro")), 1)
+        self.toby.delete()
+        self.assertEqual(self.ids("nunoa"), [self.perla.pk])
+
+
+class FacetasTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("facetas", "facetas@example.com", "x")
+
+    def setUp(self):
+        self.perro = nueva_mascota(self.usuario, tipo="perro", edad=6, ubicacion="Osorno")
+        self.gato = nueva_mascota(self.usuario, tipo="gato", edad=30, sexo="hembra", ubicacion="Santiago - Buin")
+
+    def comprobar(self):
+        """Los conteos incrementales coinciden con un recálculo desde cero."""
+        incrementales = facetas.leer()
+        facetas.recalcular()
+        self.assertEqual(incrementales, facetas.leer())
+        return incrementales
+
+    def test_altas_y_rangos_de_edad(self):
+        conteos = self.comprobar()
+        self.assertEqual(conteos["tipo"], {"perro": 1, "gato": 1})
+        # Los bordes de rango cuentan en los dos rangos que los incluyen
+        self.assertEqual(conteos["edad"], {"0": 1, "1": 1, "3": 1})
+
+    def test_save_y_delete(self):
+        self.perro.estado = "adoptado"
+        self.perro.save()
+        self.assertNotIn("perro", self.comprobar()["tipo"])
+
+        perro = Mascota.objects.only("id", "estado").get(pk=self.perro.pk)
+        perro.estado = "disponible"
+        perro.save(update_fields=["estado"])
+        self.assertEqual(self.comprobar()["tipo"]["perro"], 1)
+
+        self.gato.ubicacion = "Arica"
+        self.gato.save()
+        self.assertEqual(self.comprobar()["ciudad"], {"Osorno": 1, "Arica": 1})
+
+        Mascota.objects.all().delete()
+        self.assertEqual(self.comprobar()["ciudad"], {})
+
+    def test_update_fields_solo_cuenta_lo_guardado(self):
+        # Cambios en memoria que no se guardan no deben mover los conteos
+        self.perro.tipo = "ave"
+        self.perro.edad = 100
+        self.perro.ubicacion = "Arica"
+        self.perro.save(update_fields=["nombre"])
+        self.assertEqual(self.comprobar()["tipo"], {"perro": 1, "gato": 1})
+
+        self.perro.estado = "adoptado"
+        self.perro.save(update_fields=["estado"])
+        self.assertEqual(self.comprobar()["tipo"], {"gato": 1})
+
+        perro = Mascota.objects.get(pk=self.perro.pk)
+        perro.estado = "disponible"
+        perro.tipo = "ave"
+        perro.save(update_fields=["estado"])
+        conteos = self.comprobar()
+        self.assertEqual((conteos["tipo"], conteos["ciudad"]), ({"perro": 1, "gato": 1}, {"Osorno": 1, "Buin": 1}))
+
+    def test_cambiar_estado_y_bulk_create(self):
+        self.assertEqual(facetas.cambiar_estado(Mascota.objects.all(), "reservado"), 2)
+        self.assertEqual(self.comprobar()["tipo"], {})
+        facetas.cambiar_estado(Mascota.objects.filter(pk=self.gato.pk), "disponible")
+        self.assertEqual(self.comprobar()["ciudad"], {"Buin": 1})
+
+        nuevas = [Mascota(nombre="Bulk", tipo="ave", raza="Loro", edad=1, sexo="macho", descripcion="x",
+                          ubicacion="Arica", responsable=self.usuario)]
+        for m in nuevas:
+            m.actualizar_campos_derivados()
+        facetas.registrar_altas(Mascota.objects.bulk_create(nuevas))
+        self.assertEqual(self.comprobar()["tipo"], {"gato": 1, "ave": 1})
+
+    def test_endpoint_json(self):
+        self.assertEqual(self.client.get(reverse("facetas")).json()["tipo"], {"perro": 1, "gato": 1})
+
+
+class PublicacionesTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = get_user_model().objects.create_user("pub", "pub@example.com", "x")
+
+    def setUp(self):
+        SolicitudPublicacion.objects.bulk_create([
+            SolicitudPublicacion(usuario=self.usuario, nombre=f"S{i}", tipo="perro", raza="Mestizo", edad=3,
+                                 sexo="macho", descripcion="x", ubicacion="Santiago - Ñuñoa",
+                                 foto="mascotas/solicitudes/x.jpg" if i % 2 else None)
+            for i in range(30)
+        ])
+        self.todas = SolicitudPublicacion.objects.all()
+
+    def test_aprobar_por_lotes_e_idempotente(self):
+        # La primera crea las filas de ConteoFaceta; se mide después
+        publicaciones.aprobar(SolicitudPublicacion.objects.filter(nombre__in=["S0", "S1"]))
+        with CaptureQueriesContext(connection) as pocas:
+            publicaciones.aprobar(SolicitudPublicacion.objects.filter(nombre__in=["S2", "S3"]))
+        with CaptureQueriesContext(connection) as muchas:
+            mascotas, ya_procesadas = publicaciones.aprobar(self.todas)
+        self.assertEqual((len(mascotas), ya_procesadas), (26, 4))
+        # Las consultas no crecen con la selección
+        self.assertEqual(len(muchas), len(pocas))
+        self.assertEqual(publicaciones.aprobar(self.todas), ([], 30))
+
+        self.assertEqual(Mascota.objects.count(), 30)
+        self.assertEqual(facetas.leer()["tipo"]["perro"], 30)
+        self.assertEqual(TrabajoImagen.objects.count(), 15)
+        s = SolicitudPublicacion.objects.get(nombre="S4")
+        self.assertEqual((s.estado, s.mascota.nombre, s.mascota.ciudad), ("aprobada", "S4", "Ñuñoa"))
+        self.client.force_login(self.usuario)
+        self.assertEqual(len(self.client.get(reverse("home"), {"q": "S4"}).context["pagina"]), 1)
+
+    def test_accion_del_admin_con_consultas_fijas(self):
+        admin = get_user_model().objects.create_superuser("pubadmin", "pubadmin@example.com", "x")
+        self.client.force_login(admin)
+        url = reverse("admin:registro_mascotas_solicitudpublicacion_changelist")
+        pks = list(self.todas.order_by("pk").values_list("pk", flat=True))
+
+        def aceptar(seleccion):
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.post(url, {"action": "accion_aceptar_publicacion", "_selected_action": seleccion})
+            self.assertEqual(resp.status_code, 302)
+            return len(ctx)
+
+        aceptar(pks[:1])    # crea las filas de ConteoFaceta
+        self.assertEqual(aceptar(pks[:4]), aceptar(pks[:20]))
+        mensajes = [str(m) for m in self.client.get(url).context["messages"]]
+        self.assertIn("✅ 16 solicitud(es) aceptada(s) y convertida(s) en Mascota.", mensajes)
+        self.assertIn("ℹ️ 4 solicitud(es) ya estaban procesadas.", mensajes)
+
+    def test_rechazar_solo_pendientes(self):
+        publicaciones.aprobar(SolicitudPublicacion.objects.filter(nombre="S0"))
+        self.assertEqual(publicaciones.rechazar(self.todas, "Fotos borrosas"), 29)
+        self.assertEqual(publicaciones.rechazar(self.todas, "Otra vez"), 0)
+        self.assertEqual(self.todas.filter(estado="rechazada", rechazo_motivo="Fotos borrosas").count(), 29)
+        self.assertEqual(publicaciones.aprobar(self.todas), ([], 30))
+
+    def test_rechazo_avisa_solo_las_filas_que_cambio(self):
+        actualizar = QuerySet.update
+
+        def otro_admin_justo_antes(qs, **cambios):
+            # Otro administrador rechaza parte de la misma selección entre medio
+            if cambios.get("rechazo_motivo") == "Después":
+                publicaciones.rechazar(self.todas.filter(nombre__in=["S0", "S1"]), "Primero")
+            return actualizar(qs, **cambios)
+
+        with mock.patch.object(QuerySet, "update", otro_admin_justo_antes):
+            rechazadas = publicaciones.rechazar(self.todas.filter(nombre__in=["S0", "S1", "S2"]), "Después")
+        self.assertEqual(rechazadas, 1)
+        self.assertEqual(CorreoPendiente.objects.count(), 3)
+        self.assertIn("Después", CorreoPendiente.objects.latest("pk").cuerpo)
+        self.assertEqual(SolicitudPublicacion.objects.get(nombre="S0").rechazo_motivo, "Primero")
+        self.assertIsNotNone(SolicitudPublicacion.objects.get(nombre="S2").fecha_revision)
+
+
+class ImportacionTests(TestCase):
+    ENCABEZADO = "nombre,tipo,raza,edad,sexo,descripcion,ubicacion\n"
+    URL = "admin:registro_mascotas_mascota_importar"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser("refugio", "refugio@example.com", "x")
+
+    def csv(self, *filas):
+        return (self.ENCABEZADO + "".join(f"{f}\n" for f in filas)).encode()
+
+    def importar(self, contenido, formato="csv", **opciones):
+        return importacion.importar(BytesIO(contenido), formato, self.admin, **opciones)
+
+    def test_valida_por_fila_sin_detenerse(self):
+        r = self.importar(self.csv(
+            "Luna,GATO,Siamés,4,Hembra,Tranquila,Arica",
+            "Nemo,hamster,x,-1,macho,d,Arica",
+            "Kiwi,Hámster,x,2,macho,d,Arica",
+            "Rex,lagarto,x,3,macho,d,Arica",
+            "Sin,perro,x,3,macho,,Arica",
+        ))
+        self.assertEqual((r.leidas, r.validas, r.creadas, r.con_error), (5, 2, 2, 3))
+        # Línea 1 es el encabezado
+        self.assertEqual([linea for linea, _ in r.errores], [3, 5, 6])
+        self.assertEqual(dict(Mascota.objects.values_list("nombre", "tipo")), {"Luna": "gato", "Kiwi": "hamster"})
+        luna = Mascota.objects.get(nombre="Luna")
+        self.assertEqual((luna.sexo, luna.estado, luna.ubicacion_norm), ("hembra", "disponible", "arica"))
+        # bulk_create no pasa por las señales: las facetas se actualizan aparte
+        incrementales = facetas.leer()
+        facetas.recalcular()
+        self.assertEqual(incrementales, facetas.leer())
+        self.assertEqual(incrementales["tipo"], {"gato": 1, "hamster": 1})
+
+    def test_jsonl_comprimido_y_lineas_malas(self):
+        lineas = [
+            '{"nombre": "Luna", "tipo": "gato", "raza": "x", "edad": 4, "sexo": "hembra", '
+            '"descripcion": "d", "ubicacion": "Arica"}',
+            "",
+            "{no es json",
+            "[1, 2]",
+        ]
+        contenido = gzip.compress("\n".join(lineas).encode())
+        self.assertEqual(importacion.detectar_formato("Refugio.JSONL.gz"), ("jsonl", True))
+        r = self.importar(contenido, "jsonl", comprimido=True)
+        self.assertEqual(r.creadas, 1)
+        self.assertEqual([linea for linea, _ in r.errores], [3, 4])
+
+    def test_csv_en_latin1_informa_las_lineas_y_sigue(self):
+        contenido = self.csv("Luna,gato,x,4,hembra,d,Arica", "Perla,perro,x,3,hembra,d,Copiapó",
+                             "Toby,perro,x,3,macho,d,Arica").decode().encode("latin-1")
+        r = self.importar(contenido)
+        self.assertEqual((r.creadas, r.errores), (2, [(3, importacion.ERROR_CODIFICACION)]))
+        # Encabezado ilegible: un solo error, nada importado
+        r = self.importar("ñombre,tipo\nLuna,gato\n".encode("latin-1"))
+        self.assertEqual((r.creadas, r.errores), (0, [(1, importacion.ERROR_CODIFICACION)]))
+
+    def test_gz_corrupto_o_truncado(self):
+        completo = gzip.compress(self.csv(*(f"M{i},perro,x,3,macho,d,Arica" for i in range(2000))))
+        for nombre, contenido in (("no es gzip", self.csv("Luna,gato,x,4,hembra,d,Arica")),
+                                  ("truncado", completo[: len(completo) // 2])):
+            with self.subTest(nombre):
+                r = self.importar(contenido, comprimido=True)
+                self.assertEqual(len(r.errores), 1)
+                self.assertIn("No se pudo seguir leyendo el archivo", r.errores[0][1])
+
+    def test_lote_rechazado_se_reintenta_fila_por_fila(self):
+        original = Mascota.objects.bulk_create
+
+        def falla_con_dos(objs, *args, **kwargs):
+            if any(m.nombre == "Mala" for m in objs):
+                raise DatabaseError("simulado")
+            return original(objs, *args, **kwargs)
+
+        with mock.patch.object(Mascota.objects, "bulk_create", side_effect=falla_con_dos):
+            r = self.importar(self.csv(*(f"{n},perro,x,3,macho,d,Arica" for n in ("A", "Mala", "B", "C"))),
+                              tam_lote=3)
+        self.assertEqual(r.creadas, 3)
+        self.assertEqual(r.errores, [(3, "Error de base de datos: simulado")])
+        self.assertEqual(sorted(Mascota.objects.values_list("nombre", flat=True)), ["A", "B", "C"])
+
+    def test_fotos_fuera_del_directorio(self):
+        with tempfile.TemporaryDirectory() as fotos:
+            r = self.importar(self.csv().replace(b"\n", b",foto\n", 1)
+                              + b"Luna,gato,x,4,hembra,d,Arica,../secreto.jpg\n", directorio_fotos=fotos)
+        self.assertEqual(r.creadas, 0)
+        self.assertIn("fuera del directorio", r.errores[0][1])
+
+    def test_comando_con_archivo_ilegible(self):
+        with tempfile.NamedTemporaryFile(suffix=".csv.gz", delete=False) as f:
+            f.write(self.csv("Luna,gato,x,4,hembra,d,Arica"))
+        self.addCleanup(os.unlink, f.name)
+        salida = StringIO()
+        call_command("importar_mascotas", f.name, "--responsable", "refugio", stdout=salida)
+        self.assertIn("línea 1: No se pudo seguir leyendo el archivo", salida.getvalue())
+        # Lo que aún escape de la lectura termina como CommandError, no como traceback
+        with mock.patch.object(importacion, "importar", side_effect=UnicodeDecodeError("utf-8", b"\xf1", 0, 1, "x")):
+            with self.assertRaises(CommandError):
+                call_command("importar_mascotas", f.name, "--responsable", "refugio", stdout=StringIO())
+
+    def test_comando_dry_run(self):
+        with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
+            f.write(self.csv("Luna,gato,x,4,hembra,d,Arica", "Rex,lagarto,x,3,macho,d,Arica"))
+        self.addCleanup(os.unlink, f.name)
+        salida = StringIO()
+        call_command("importar_mascotas", f.name, "--responsable", "refugio", "--dry-run", stdout=salida)
+        self.assertIn("1 válida(s), 1 con error (dry-run)", salida.getvalue())
+        self.assertIn("línea 3:", salida.getvalue())
+        self.assertFalse(Mascota.objects.exists())
+
+    def test_vista_del_admin(self):
+        self.client.force_login(self.admin)
+        self.assertContains(self.client.get(reverse("admin:registro_mascotas_mascota_changelist")), "Importar CSV")
+        self.assertEqual(self.client.get(reverse(self.URL)).status_code, 200)
+        contenido = self.csv("Luna,gato,x,4,hembra,d,Arica", "Rex,lagarto,x,3,macho,d,Arica")
+
+        resp = self.client.post(reverse(self.URL), {"archivo": SimpleUploadedFile("refugio.txt", contenido)})
+        self.assertContains(resp, "Extensión no reconocida")
+        resp = self.client.post(reverse(self.URL), {"archivo": SimpleUploadedFile("refugio.csv", contenido),
+                                                    "dry_run": "on"})
+        self.assertContains(resp, "solo validación")
+        self.assertFalse(Mascota.objects.exists())
+
+        resp = self.client.post(reverse(self.URL), {"archivo": SimpleUploadedFile("refugio.csv", contenido)})
+        self.assertContains(resp, "lagarto")
+        self.assertEqual(list(Mascota.objects.values_list("nombre", flat=True)), ["Luna"])
 
-# Create your tests here.
+        # Errores de lectura: en la tabla de errores, no un 500
+        for nombre, archivo in (("refugio.csv.gz", contenido), ("refugio.csv", contenido.replace(b"Luna", b"Lu\xf1a"))):
+            with self.subTest(archivo=nombre):
+                resp = self.client.post(reverse(self.URL), {"archivo": SimpleUploadedFile(nombre, archivo)})
+                self.assertEqual(resp.status_code, 200)
+                self.assertTrue(resp.context["errores"])
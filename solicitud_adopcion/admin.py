@@ -1,13 +1,36 @@
 from django.contrib import admin
+
+from portal_mascotas.admin_rendimiento import AdminRendimientoMixin, FiltroFecha
+from portal_mascotas.exportar import ExportacionMixin
 from .models import SolicitudAdopcion
 
 @admin.register(SolicitudAdopcion)
-class SolicitudAdopcionAdmin(admin.ModelAdmin):
+class SolicitudAdopcionAdmin(AdminRendimientoMixin, ExportacionMixin, admin.ModelAdmin):
     list_display = ['id', 'usuario', 'mascota', 'estado', 'fecha_solicitud', 'fecha_respuesta']
-    list_filter = ['estado', 'fecha_solicitud', 'mascota__tipo']
+    list_filter = ['estado', ('fecha_solicitud', FiltroFecha), 'mascota__tipo']
     search_fields = ['usuario__username', 'mascota__nombre', 'mensaje']
     readonly_fields = ['fecha_solicitud', 'fecha_respuesta']
     ordering = ['-fecha_solicitud']
+    list_select_related = ('usuario', 'mascota')
+    # Buscador en vez de un <select> con todos los usuarios/mascotas
+    autocomplete_fields = ('usuario', 'mascota')
+    list_defer = ('mensaje', 'respuesta')
+    list_per_page = 50
+    actions = ['accion_exportar']
+
+    exportar_nombre = 'solicitudes-adopcion'
+    exportar_select_related = ('usuario', 'mascota')
+    exportar_columnas = (
+        ('id', 'id'),
+        ('usuario_username', 'usuario.username'),
+        ('mascota_id', 'mascota_id'),
+        ('mascota_nombre', 'mascota.nombre'),
+        ('estado', 'get_estado_display'),
+        ('mensaje', 'mensaje'),
+        ('respuesta', 'respuesta'),
+        ('fecha_solicitud', 'fecha_solicitud'),
+        ('fecha_respuesta', 'fecha_respuesta'),
+    )
     
     fieldsets = (
         ('Información Básica', {
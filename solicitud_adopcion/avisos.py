@@ -0,0 +1,42 @@
+# solicitud_adopcion/avisos.py
+"""
+Textos de los correos de SolicitudAdopcion. Se encolan en la bandeja de
+salida (portal_mascotas.correos) dentro de la transacción que cambia la
+solicitud; el envío lo hace `manage.py enviar_correos`.
+"""
+from portal_mascotas import correos
+
+ASUNTO_NUEVA = "Nueva solicitud de adopción para {mascota}"
+CUERPO_NUEVA = (
+    "{usuario} quiere adoptar a {mascota}.\n\n"
+    "Mensaje:\n{mensaje}\n\n"
+    "Puedes responderla en AdoptaPortal, en «Solicitudes recibidas»."
+)
+ASUNTOS_RESPUESTA = {
+    "aprobada": "¡Tu solicitud para adoptar a {mascota} fue aprobada!",
+    "rechazada": "Tu solicitud para adoptar a {mascota} fue rechazada",
+}
+CUERPO_RESPUESTA = "Estado de tu solicitud para {mascota}: {estado}.\n\n{respuesta}"
+
+
+def nueva(destinatario, usuario, mascota, mensaje):
+    """Aviso al responsable de la mascota."""
+    correos.encolar(
+        destinatario,
+        ASUNTO_NUEVA.format(mascota=mascota),
+        CUERPO_NUEVA.format(usuario=usuario, mascota=mascota, mensaje=mensaje),
+        "solicitud_nueva",
+    )
+
+
+def respuestas(filas, estado):
+    """Aviso a cada solicitante; `filas` es [(email, mascota, respuesta)]."""
+    correos.encolar_lote(
+        (
+            email,
+            ASUNTOS_RESPUESTA[estado].format(mascota=mascota),
+            CUERPO_RESPUESTA.format(mascota=mascota, estado=estado, respuesta=respuesta).strip(),
+            f"solicitud_{estado}",
+        )
+        for email, mascota, respuesta in filas
+    )
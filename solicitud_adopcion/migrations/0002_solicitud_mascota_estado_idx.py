@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('registro_mascotas', '0012_solicitudpublicacion_mascota'),
+        ('solicitud_adopcion', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='solicitudadopcion',
+            index=models.Index(fields=['mascota', 'estado', 'fecha_solicitud'], name='solicitud_mascota_estado_idx'),
+        ),
+    ]
@@ -27,6 +27,10 @@ class SolicitudAdopcion(models.Model):
         verbose_name_plural = "Solicitudes de Adopción"
         ordering = ['-fecha_solicitud']
         unique_together = ['usuario', 'mascota']  # Un usuario no puede solicitar la misma mascota dos veces
+        indexes = [
+            # Bandeja del responsable y cierre de solicitudes de una mascota (filtro por estado, orden por fecha)
+            models.Index(fields=['mascota', 'estado', 'fecha_solicitud'], name='solicitud_mascota_estado_idx'),
+        ]
 
     def clean(self):
         # Validar que la mascota esté disponible
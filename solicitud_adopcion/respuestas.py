@@ -0,0 +1,137 @@
+# solicitud_adopcion/respuestas.py
+"""
+Respuesta del responsable a una SolicitudAdopcion (aprobar / rechazar).
+
+Aprobar es una sola transacción:
+  1. UPDATE de la mascota condicionado a estado='disponible' -> 'adoptado'.
+     Es la "reserva": si dos responsables (o dos pestañas) aprueban a dos
+     adoptantes distintos a la vez, solo uno de los UPDATE afecta la fila;
+     el otro recibe SolicitudNoVigente y su transacción no deja rastro.
+  2. UPDATE de la solicitud condicionado a estado='pendiente'.
+  3. Rechazo en bloque (un UPDATE) de las demás solicitudes pendientes de la
+     mascota, con una respuesta estándar.
+Todas quedan con fecha_respuesta. Se usa update() y no save(): el save() de
+SolicitudAdopcion corre full_clean, que exige que la mascota esté disponible.
+
+Cada solicitante recibe un correo (solicitud_adopcion.avisos), encolado en la
+misma transacción. Las filas a avisar se leen después del UPDATE por su
+fecha_respuesta, que es la misma marca de tiempo para todo lo que se respondió.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from portal_mascotas.cache_paginas import invalidar_home
+from registro_mascotas import facetas
+from registro_mascotas.models import Mascota
+from . import avisos
+from .models import SolicitudAdopcion
+
+ESTADO_ADOPTADO = "adoptado"
+RESPUESTA_CIERRE = (
+    "Gracias por tu interés en {mascota}. El responsable aprobó otra solicitud "
+    "y {mascota} ya encontró hogar."
+)
+
+
+class SolicitudNoVigente(Exception):
+    """La solicitud ya fue respondida o la mascota ya no está disponible."""
+
+
+def aprobar(solicitud, respuesta=""):
+    """Aprueba `solicitud` y cierra las competidoras; devuelve cuántas se rechazaron."""
+    ahora = timezone.now()
+    with transaction.atomic():
+        tomada = (
+            Mascota.objects
+            .filter(pk=solicitud.mascota_id, estado=facetas.ESTADO_VISIBLE)
+            .update(estado=ESTADO_ADOPTADO)
+        )
+        if not tomada:
+            raise SolicitudNoVigente("La mascota ya no está disponible: otra solicitud fue aprobada antes.")
+
+        aprobada = (
+            SolicitudAdopcion.objects
+            .filter(pk=solicitud.pk, estado="pendiente")
+            .update(estado="aprobada", respuesta=respuesta, fecha_respuesta=ahora)
+        )
+        if not aprobada:
+            # Revierte el UPDATE de la mascota
+            raise SolicitudNoVigente("Esta solicitud ya fue respondida.")
+
+        mascota = Mascota.objects.filter(pk=solicitud.mascota_id).values("nombre", *facetas.CAMPOS).get()
+        nombre = mascota.pop("nombre")
+        cierre = RESPUESTA_CIERRE.format(mascota=nombre)
+        rechazadas = (
+            SolicitudAdopcion.objects
+            .filter(mascota_id=solicitud.mascota_id, estado="pendiente")
+            .exclude(pk=solicitud.pk)
+            .update(estado="rechazada", respuesta=cierre, fecha_respuesta=ahora)
+        )
+
+        respondidas = list(
+            SolicitudAdopcion.objects
+            .filter(mascota_id=solicitud.mascota_id, fecha_respuesta=ahora)
+            .values_list("estado", "usuario__email")
+        )
+        for estado, texto in (("aprobada", respuesta), ("rechazada", cierre)):
+            avisos.respuestas([(email, nombre, texto) for e, email in respondidas if e == estado], estado)
+
+        # update() no pasa por las señales de Mascota: conteos y caché del home a mano
+        facetas.aplicar(facetas.diferencia({**mascota, "estado": facetas.ESTADO_VISIBLE}, mascota))
+        transaction.on_commit(invalidar_home)
+
+    solicitud.estado, solicitud.respuesta, solicitud.fecha_respuesta = "aprobada", respuesta, ahora
+    return rechazadas
+
+
+def rechazar(solicitud, respuesta=""):
+    """Rechaza `solicitud` si sigue pendiente."""
+    ahora = timezone.now()
+    with transaction.atomic():
+        rechazada = (
+            SolicitudAdopcion.objects
+            .filter(pk=solicitud.pk, estado="pendiente")
+            .update(estado="rechazada", respuesta=respuesta, fecha_respuesta=ahora)
+        )
+        if not rechazada:
+            raise SolicitudNoVigente("Esta solicitud ya fue respondida.")
+        avisos.respuestas(
+            SolicitudAdopcion.objects.filter(pk=solicitud.pk)
+            .values_list("usuario__email", "mascota__nombre", "respuesta"),
+            "rechazada",
+        )
+    solicitud.estado, solicitud.respuesta, solicitud.fecha_respuesta = "rechazada", respuesta, ahora
+
+
+def rechazar_lote(queryset, respuesta=""):
+    """Rechaza en un UPDATE las solicitudes pendientes de `queryset`; devuelve cuántas."""
+    ahora = timezone.now()
+    with transaction.atomic():
+        rechazadas = (
+            SolicitudAdopcion.objects
+            .filter(pk__in=queryset.filter(estado="pendiente").values("pk"), estado="pendiente")
+            .update(estado="rechazada", respuesta=respuesta, fecha_respuesta=ahora)
+        )
+        if rechazadas:
+            avisos.respuestas(
+                SolicitudAdopcion.objects.filter(pk__in=queryset.values("pk"), fecha_respuesta=ahora)
+                .values_list("usuario__email", "mascota__nombre", "respuesta"),
+                "rechazada",
+            )
+    return rechazadas
+
+
+def aprobar_lote(queryset, respuesta=""):
+    """
+    Aprueba cada solicitud de `queryset` (una transacción por mascota, ver aprobar).
+    Devuelve (aprobadas, cerradas automáticamente, no vigentes). Si se eligieron
+    dos solicitudes de la misma mascota, gana la más antigua.
+    """
+    aprobadas = cerradas = no_vigentes = 0
+    for solicitud in queryset.order_by("fecha_solicitud", "pk").only("pk", "mascota_id"):
+        try:
+            cerradas += aprobar(solicitud, respuesta)
+            aprobadas += 1
+        except SolicitudNoVigente:
+            no_vigentes += 1
+    return aprobadas, cerradas, no_vigentes
@@ -1,3 +1,281 @@
-from django.test import TestCase
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError, connection, connections
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from registro_mascotas import facetas
+from registro_mascotas.models import ConteoFaceta, Mascota
+from . import respuestas
+from .models import SolicitudAdopcion
+
+
+def crear_mascota_con_solicitudes(n):
+    User = get_user_model()
+    responsable = User.objects.create_user("resp", "resp@example.com", "x")
+    mascota = Mascota.objects.create(
+        nombre="Luna", tipo="gato", raza="Mestizo", edad=8, sexo="hembra",
+        descripcion="x", ubicacion="Valdivia", responsable=responsable,
+    )
+    solicitudes = [
+        SolicitudAdopcion.objects.create(
+            usuario=User.objects.create_user(f"adoptante{i}", f"adoptante{i}@example.com", "x"),
+            mascota=mascota, mensaje="Quiero adoptar",
+        )
+        for i in range(n)
+    ]
+    return responsable, mascota, solicitudes
+
+
+class PresupuestoConsultasAdminTests(TestCase):
+    """El changelist de solicitudes de adopción usa un número fijo de consultas."""
+    PRESUPUESTO = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        cls.responsable = User.objects.create_user("resp", "resp@example.com", "x")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def crear_filas(self, n):
+        User = get_user_model()
+        base = SolicitudAdopcion.objects.count()
+        usuarios = User.objects.bulk_create([
+            User(username=f"a{base + i}", email=f"a{base + i}@example.com") for i in range(n)
+        ])
+        mascotas = Mascota.objects.bulk_create([
+            Mascota(nombre=f"M{base + i}", tipo="perro", raza="Mestizo", edad=12, sexo="macho",
+                    descripcion="x", ubicacion="Santiago", responsable=self.responsable)
+            for i in range(n)
+        ])
+        # bulk_create no pasa por save()/full_clean: basta para medir el listado
+        SolicitudAdopcion.objects.bulk_create([
+            SolicitudAdopcion(usuario=u, mascota=m, mensaje="z" * 500)
+            for u, m in zip(usuarios, mascotas)
+        ])
+
+    def consultas(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(reverse("admin:solicitud_adopcion_solicitudadopcion_changelist"))
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx)
+
+    def test_presupuesto_no_crece_con_las_filas(self):
+        self.crear_filas(5)
+        pocas = self.consultas()
+        self.crear_filas(45)
+        cache.clear()
+        muchas = self.consultas()
+        self.assertLessEqual(muchas, self.PRESUPUESTO)
+        self.assertEqual(muchas, pocas)
+
+
+class AprobarSolicitudTests(TestCase):
+
+    def setUp(self):
+        self.responsable, self.mascota, self.solicitudes = crear_mascota_con_solicitudes(3)
+
+    def test_aprobar_cierra_las_demas_en_una_transaccion(self):
+        elegida, *otras = self.solicitudes
+        self.assertEqual(respuestas.aprobar(elegida, "¡Bienvenida!"), 2)
+
+        self.mascota.refresh_from_db()
+        self.assertEqual(self.mascota.estado, "adoptado")
+        elegida.refresh_from_db()
+        self.assertEqual((elegida.estado, elegida.respuesta), ("aprobada", "¡Bienvenida!"))
+        self.assertIsNotNone(elegida.fecha_respuesta)
+        for s in otras:
+            s.refresh_from_db()
+            self.assertEqual(s.estado, "rechazada")
+            self.assertIn("Luna", s.respuesta)
+            self.assertIsNotNone(s.fecha_respuesta)
+        # La mascota dejó de contar en las facetas del home
+        self.assertFalse(ConteoFaceta.objects.filter(faceta="tipo", valor="gato", total__gt=0).exists())
+
+    def test_segunda_aprobacion_no_cambia_nada(self):
+        primera, segunda, _ = self.solicitudes
+        respuestas.aprobar(primera)
+        with self.assertRaises(respuestas.SolicitudNoVigente):
+            respuestas.aprobar(segunda)
+        segunda.refresh_from_db()
+        self.assertEqual(segunda.estado, "rechazada")
+
+    def test_solicitud_ya_respondida_no_adopta_la_mascota(self):
+        solicitud = self.solicitudes[0]
+        respuestas.rechazar(solicitud, "No")
+        with self.assertRaises(respuestas.SolicitudNoVigente):
+            respuestas.aprobar(solicitud)
+        self.mascota.refresh_from_db()
+        self.assertEqual(self.mascota.estado, facetas.ESTADO_VISIBLE)
+
+    def test_vista_responder(self):
+        self.client.force_login(self.responsable)
+        url = reverse("solicitud_adopcion:responder_solicitud", args=[self.solicitudes[1].pk])
+        resp = self.client.post(url, {"estado": "aprobada", "respuesta": "Ok"})
+        self.assertRedirects(resp, url)
+        self.assertEqual(SolicitudAdopcion.objects.filter(estado="rechazada").count(), 2)
+
+
+class AprobacionConcurrenteTests(TransactionTestCase):
+    """
+    Varios responsables/pestañas abrieron la misma mascota con adoptantes
+    distintos (todas vieron la solicitud pendiente) y aprueban, cada uno con
+    su conexión, después de que la primera aprobación hizo COMMIT. Los
+    aprobadores van de a uno: la BD de pruebas de SQLite es en memoria con
+    caché compartida, donde una escritura simultánea falla con "table is
+    locked" en vez de esperar busy_timeout.
+    """
+    APROBADORES = 6
+
+    def test_los_que_llegan_despues_reciben_solicitud_no_vigente(self):
+        _, mascota, solicitudes = crear_mascota_con_solicitudes(self.APROBADORES)
+        confirmada = threading.Event()
+        turno = threading.Lock()
+        resultados = {}
+
+        def aprobar(solicitud, primera):
+            try:
+                if not primera:
+                    self.assertTrue(confirmada.wait(10))
+                with turno:
+                    respuestas.aprobar(solicitud)
+                resultados[solicitud.pk] = "aprobada"
+            except respuestas.SolicitudNoVigente:
+                resultados[solicitud.pk] = "no vigente"
+            except Exception as e:
+                resultados[solicitud.pk] = repr(e)
+            finally:
+                if primera:
+                    # aprobar() ya hizo COMMIT al volver
+                    confirmada.set()
+                connections.close_all()
+
+        hilos = [threading.Thread(target=aprobar, args=(s, i == 0)) for i, s in enumerate(solicitudes)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+
+        ganadora, *perdedoras = solicitudes
+        self.assertEqual(resultados, {ganadora.pk: "aprobada", **{s.pk: "no vigente" for s in perdedoras}})
+        mascota.refresh_from_db()
+        self.assertEqual(mascota.estado, "adoptado")
+        estados = dict(SolicitudAdopcion.objects.values_list("pk", "estado"))
+        self.assertEqual(estados, {ganadora.pk: "aprobada", **{s.pk: "rechazada" for s in perdedoras}})
+
+
+class BaseDeDatosOcupadaTests(TestCase):
+    """Si SQLite no suelta el candado a tiempo se avisa y no se responde 500."""
+
+    def setUp(self):
+        self.responsable, self.mascota, self.solicitudes = crear_mascota_con_solicitudes(2)
+        self.client.force_login(self.responsable)
+        bloqueada = mock.patch.object(QuerySet, "update", side_effect=OperationalError("database is locked"))
+        self.enterContext(bloqueada)
+
+    def comprobar_sin_cambios(self, resp):
+        self.assertContains(resp, "El sistema está ocupado")
+        self.assertEqual(set(SolicitudAdopcion.objects.values_list("estado", flat=True)), {"pendiente"})
+
+    def test_responder(self):
+        url = reverse("solicitud_adopcion:responder_solicitud", args=[self.solicitudes[0].pk])
+        for estado in ("aprobada", "rechazada"):
+            with self.subTest(estado=estado), self.assertLogs("solicitud_adopcion", "WARNING"):
+                self.comprobar_sin_cambios(self.client.post(url, {"estado": estado}, follow=True))
+
+    def test_bandeja(self):
+        url = reverse("solicitud_adopcion:bandeja")
+        ids = [s.pk for s in self.solicitudes]
+        for accion in ("aprobar", "rechazar"):
+            with self.subTest(accion=accion), self.assertLogs("solicitud_adopcion", "WARNING"):
+                self.comprobar_sin_cambios(self.client.post(url, {"ids": ids, "accion": accion}, follow=True))
+
+
+class SolicitudRapidaTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.responsable, self.mascota, _ = crear_mascota_con_solicitudes(0)
+        self.usuario = get_user_model().objects.create_user("nuevo", "nuevo@example.com", "x")
+        self.client.force_login(self.usuario)
+        self.url = reverse("solicitud_adopcion:crear_rapida", args=[self.mascota.pk])
+
+    def test_crea_con_una_lectura_y_un_insert(self):
+        with self.assertLogs("solicitud_adopcion", "INFO"):
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.post(self.url, {"mensaje": "Hola"})
+        self.assertRedirects(resp, reverse("home") + "#flash", fetch_redirect_response=False)
+        propias = [q for q in ctx if q["sql"].startswith(("INSERT", "SELECT")) and "solicitud_adopcion" in q["sql"]]
+        self.assertEqual(len(propias), 2)   # SELECT de validación + INSERT
+        self.assertEqual(SolicitudAdopcion.objects.filter(usuario=self.usuario).count(), 1)
+
+    def test_reenvio_con_la_misma_clave_no_toca_la_bd(self):
+        datos = {"mensaje": "Hola", "idempotencia": "abc123"}
+        with self.assertLogs("solicitud_adopcion", "INFO"):
+            self.client.post(self.url, datos)
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.post(self.url, datos)
+        self.assertFalse([q for q in ctx if "solicitud_adopcion" in q["sql"] or "registro_mascotas" in q["sql"]])
+        self.assertContains(self.client.get(resp.url), "Solicitud enviada con éxito")
+        self.assertEqual(SolicitudAdopcion.objects.filter(usuario=self.usuario).count(), 1)
+
+    def test_solicitud_previa_y_mascota_propia(self):
+        SolicitudAdopcion.objects.create(usuario=self.usuario, mascota=self.mascota, mensaje="x")
+        resp = self.client.post(self.url, follow=True)
+        self.assertContains(resp, "Ya tienes una solicitud pendiente para Luna.")
+        self.client.force_login(self.responsable)
+        resp = self.client.post(self.url, follow=True)
+        self.assertContains(resp, "No puedes solicitar adoptar tu propia mascota.")
+
+
+class BandejaTests(TestCase):
+
+    def setUp(self):
+        self.responsable, self.mascota, self.solicitudes = crear_mascota_con_solicitudes(3)
+        ajeno = get_user_model().objects.create_user("ajeno", "ajeno@example.com", "x")
+        otra = Mascota.objects.create(
+            nombre="Otra", tipo="perro", raza="x", edad=3, sexo="macho",
+            descripcion="x", ubicacion="Arica", responsable=ajeno,
+        )
+        self.ajena = SolicitudAdopcion.objects.create(usuario=self.solicitudes[0].usuario, mascota=otra, mensaje="x")
+        self.client.force_login(self.responsable)
+        self.url = reverse("solicitud_adopcion:bandeja")
+
+    def test_lista_solo_las_recibidas_con_conteo_por_mascota(self):
+        resp = self.client.get(self.url)
+        self.assertEqual([s.pk for s in resp.context["solicitudes"]], [s.pk for s in reversed(self.solicitudes)])
+        self.assertEqual(resp.context["pendientes_por_mascota"][0]["pendientes"], 3)
+
+    @mock.patch("solicitud_adopcion.views.SOLICITUDES_POR_PAGINA", 2)
+    def test_consultas_fijas_y_paginacion(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.url)
+        # usuario + página + pendientes por mascota (la sesión sale de la caché con cached_db)
+        self.assertEqual(len([q for q in ctx if "django_session" not in q["sql"]]), 3)
+        self.assertEqual(len(resp.context["solicitudes"]), 2)
+        resp = self.client.get(self.url, {"cursor": resp.context["pagina"].siguiente})
+        self.assertEqual([s.pk for s in resp.context["solicitudes"]], [self.solicitudes[0].pk])
+
+    def test_rechazo_en_lote_ignora_solicitudes_ajenas(self):
+        ids = [self.solicitudes[0].pk, self.solicitudes[1].pk, self.ajena.pk]
+        self.client.post(self.url, {"ids": ids, "accion": "rechazar", "respuesta": "Lo siento"})
+        estados = dict(SolicitudAdopcion.objects.values_list("pk", "estado"))
+        self.assertEqual(estados[self.solicitudes[0].pk], "rechazada")
+        self.assertEqual(estados[self.solicitudes[1].pk], "rechazada")
+        self.assertEqual(estados[self.ajena.pk], "pendiente")
+
+    def test_aprobacion_en_lote_de_la_misma_mascota_gana_la_mas_antigua(self):
+        ids = [s.pk for s in self.solicitudes]
+        self.client.post(self.url, {"ids": ids, "accion": "aprobar"})
+        estados = dict(SolicitudAdopcion.objects.values_list("pk", "estado"))
+        self.assertEqual(estados[self.solicitudes[0].pk], "aprobada")
+        self.assertEqual([estados[s.pk] for s in self.solicitudes[1:]], ["rechazada", "rechazada"])
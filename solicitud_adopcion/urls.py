@@ -6,6 +6,7 @@ app_name = "solicitud_adopcion"
 
 urlpatterns = [
     path("", views.lista_solicitudes, name="lista_solicitudes"),
+    path("recibidas/", views.bandeja_solicitudes, name="bandeja"),
     path("<int:solicitud_id>/", views.detalle_solicitud, name="detalle_solicitud"),
     path("<int:solicitud_id>/responder/", views.responder_solicitud, name="responder_solicitud"),
     # 👉 Nueva ruta para la solicitud directa desde la tarjeta de mascota
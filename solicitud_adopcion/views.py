@@ -1,18 +1,32 @@
+import logging
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.decorators.http import require_POST
-from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import DatabaseError, IntegrityError, OperationalError, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.http import Http404
 from django.urls import reverse
+from portal_mascotas import idempotencia
+from portal_mascotas.limites import limitar
+from portal_mascotas.paginacion import paginar_keyset
 from .models import SolicitudAdopcion
+from . import avisos, respuestas
 from registro_mascotas.models import Mascota
 
+logger = logging.getLogger(__name__)
+
+# SQLite no soltó el candado de escritura dentro de busy_timeout (otra
+# transacción larga): se avisa en vez de responder 500
+BD_OCUPADA = "El sistema está ocupado en este momento. Revisa el estado de la solicitud e intenta nuevamente."
+
 
 @login_required
 def lista_solicitudes(request):
     solicitudes = (
         SolicitudAdopcion.objects.filter(usuario=request.user)
+        .select_related("mascota")
         .order_by("-fecha_solicitud")
     )
     context = {"solicitudes": solicitudes, "titulo": "Mis Solicitudes"}
@@ -21,54 +35,186 @@ def lista_solicitudes(request):
 
 @login_required
 @require_POST
+@limitar("solicitud_rapida")
 def crear_solicitud_rapida(request, mascota_id: int):
-    mascota = get_object_or_404(Mascota, pk=mascota_id, estado="disponible")
+    """
+    Camino rápido: una consulta valida disponibilidad, dueño y solicitud previa;
+    luego un INSERT directo (sin save()/full_clean, que repetían esas lecturas)
+    y el del aviso al responsable en la bandeja de salida.
+    Un reenvío con la misma clave de idempotencia no vuelve a la BD.
+    """
+    clave = idempotencia.clave(request, f"solicitud_rapida:{mascota_id}")
+    if clave:
+        primera, previo = idempotencia.reservar(clave)
+        if not primera:
+            logger.info(
+                "Solicitud rápida repetida usuario=%s mascota=%s", request.user.pk, mascota_id,
+                extra={"usuario_id": request.user.pk, "mascota_id": mascota_id, "evento": "solicitud_repetida"},
+            )
+            if previo == idempotencia.EN_CURSO:
+                messages.info(request, "Tu solicitud ya se está procesando.")
+                return redirect("home")
+            nivel, texto, destino = previo
+            messages.add_message(request, nivel, texto)
+            return redirect(destino)
 
-    if mascota.responsable_id == request.user.id:
-        messages.error(request, "No puedes solicitar adoptar tu propia mascota.")
-        return redirect("home")
+    try:
+        nivel, texto, destino = _crear_solicitud_rapida(request, mascota_id)
+    except BaseException:
+        if clave:
+            idempotencia.liberar(clave)
+        raise
+    if clave:
+        idempotencia.guardar(clave, (nivel, texto, destino))
+    messages.add_message(request, nivel, texto)
+    return redirect(destino)
+
+
+def _crear_solicitud_rapida(request, mascota_id):
+    """Devuelve (nivel, mensaje, destino); Http404 si la mascota no está disponible."""
+    usuario = request.user
+    previa = SolicitudAdopcion.objects.filter(mascota=OuterRef("pk"), usuario=usuario).values("estado")[:1]
+    mascota = (
+        Mascota.objects.filter(pk=mascota_id, estado="disponible")
+        .annotate(solicitud_previa=Subquery(previa))
+        .values("nombre", "responsable_id", "responsable__email", "solicitud_previa")
+        .first()
+    )
+    if mascota is None:
+        raise Http404("Mascota no disponible.")
+    nombre = mascota["nombre"]
+
+    if mascota["responsable_id"] == usuario.id:
+        return messages.ERROR, "No puedes solicitar adoptar tu propia mascota.", "home"
+    if mascota["solicitud_previa"] == "pendiente":
+        return messages.INFO, f"Ya tienes una solicitud pendiente para {nombre}.", "home"
+    if mascota["solicitud_previa"]:
+        return messages.INFO, f"Ya existe una solicitud vigente para {nombre}.", "home"
 
     mensaje = (request.POST.get("mensaje") or "").strip()
     if not mensaje:
-        mensaje = f"Solicitud sin mensaje – {request.user.get_username()} desea adoptar a {mascota.nombre}"
+        mensaje = f"Solicitud sin mensaje – {usuario.get_username()} desea adoptar a {nombre}"
 
     try:
-        ya_pendiente = SolicitudAdopcion.objects.filter(
-            usuario=request.user, mascota=mascota, estado="pendiente"
-        ).exists()
+        with transaction.atomic():
+            solicitud, = SolicitudAdopcion.objects.bulk_create([
+                SolicitudAdopcion(usuario=usuario, mascota_id=mascota_id, mensaje=mensaje)
+            ])
+            avisos.nueva(mascota["responsable__email"], usuario.get_username(), nombre, mensaje)
+    except IntegrityError:
+        # (usuario, mascota) ya existe: otra petición la creó entre la consulta y el INSERT
+        return messages.INFO, f"Ya existe una solicitud vigente para {nombre}.", "home"
+    except DatabaseError:
+        logger.exception(
+            "No se pudo crear la solicitud usuario=%s mascota=%s", usuario.pk, mascota_id,
+            extra={"usuario_id": usuario.pk, "mascota_id": mascota_id, "evento": "solicitud_error"},
+        )
+        return messages.ERROR, "No pudimos crear tu solicitud en este momento. Intenta nuevamente.", "home"
+
+    logger.info(
+        "Solicitud creada id=%s usuario=%s mascota=%s", solicitud.pk, usuario.pk, mascota_id,
+        extra={"solicitud_id": solicitud.pk, "usuario_id": usuario.pk, "mascota_id": mascota_id,
+               "evento": "solicitud_creada"},
+    )
+    return messages.SUCCESS, f"🐾 ¡Solicitud enviada con éxito para {nombre}! 🐾", reverse("home") + "#flash"
 
-        if ya_pendiente:
-            messages.info(request, f"Ya tienes una solicitud pendiente para {mascota.nombre}.")
-        else:
-            solicitud = SolicitudAdopcion.objects.create(
-                usuario=request.user, mascota=mascota, mensaje=mensaje
-            )
-            print(f"🐾 Solicitud creada: id={solicitud.id} usuario={request.user.username} mascota={mascota.nombre}")
-            messages.success(request, f"🐾 ¡Solicitud enviada con éxito para {mascota.nombre}! 🐾")
-            return redirect(reverse("home") + "#flash")
 
-    except ValidationError as e:
-        messages.error(request, " ".join(getattr(e, "messages", [str(e)])))
-    except IntegrityError:
-        messages.info(request, f"Ya existe una solicitud vigente para {mascota.nombre}.")
-    except Exception:
-        messages.error(request, "No pudimos crear tu solicitud en este momento. Intenta nuevamente.")
+SOLICITUDES_POR_PAGINA = 25
+ESTADOS_BANDEJA = ("pendiente", "aprobada", "rechazada", "cancelada")
 
-    return redirect("home")
+
+@login_required
+def bandeja_solicitudes(request):
+    """
+    Solicitudes recibidas para las mascotas de las que el usuario es responsable.
+    Paginación por cursor (sin COUNT), filtros por estado y mascota, y
+    aprobación/rechazo en lote. Se apoya en el índice (mascota, estado, fecha_solicitud).
+    """
+    recibidas = SolicitudAdopcion.objects.filter(mascota__responsable=request.user)
+
+    if request.method == "POST":
+        ids = [i for i in request.POST.getlist("ids") if i.isdigit()]
+        accion = request.POST.get("accion")
+        respuesta = (request.POST.get("respuesta") or "").strip()
+        seleccion = recibidas.filter(pk__in=ids)
+        if not ids:
+            messages.error(request, "Selecciona al menos una solicitud.")
+        elif accion in ("aprobar", "rechazar"):
+            try:
+                _responder_lote(request, accion, seleccion, respuesta)
+            except OperationalError:
+                logger.warning(
+                    "BD ocupada al responder en lote usuario=%s accion=%s", request.user.pk, accion,
+                    exc_info=True, extra={"usuario_id": request.user.pk, "evento": "bd_ocupada"},
+                )
+                messages.error(request, BD_OCUPADA)
+        return redirect(request.get_full_path())
+
+    estado = (request.GET.get("estado") or "").strip()
+    mascota_id = (request.GET.get("mascota") or "").strip()
+    cursor = (request.GET.get("cursor") or "").strip()
+
+    qs = recibidas.select_related("usuario", "mascota")
+    if estado in ESTADOS_BANDEJA:
+        qs = qs.filter(estado=estado)
+    if mascota_id.isdigit():
+        qs = qs.filter(mascota_id=mascota_id)
+    pagina = paginar_keyset(qs, cursor, orden=("-fecha_solicitud", "-id"), por_pagina=SOLICITUDES_POR_PAGINA)
+
+    # Pendientes por mascota: un GROUP BY (cubierto por el índice mascota+estado)
+    pendientes_por_mascota = list(
+        recibidas.filter(estado="pendiente")
+        .values("mascota_id", "mascota__nombre")
+        .annotate(pendientes=Count("id"))
+        .order_by("-pendientes", "mascota__nombre")
+    )
+
+    context = {
+        "titulo": "Solicitudes recibidas",
+        "pagina": pagina,
+        "solicitudes": pagina,
+        "pendientes_por_mascota": pendientes_por_mascota,
+        "total_pendientes": sum(m["pendientes"] for m in pendientes_por_mascota),
+        "estados": ESTADOS_BANDEJA,
+        "estado": estado,
+        "mascota_id": mascota_id,
+    }
+    return render(request, "solicitud_adopcion/bandeja.html", context)
+
+
+def _responder_lote(request, accion, seleccion, respuesta):
+    if accion == "aprobar":
+        aprobadas, cerradas, no_vigentes = respuestas.aprobar_lote(seleccion, respuesta)
+        if aprobadas:
+            messages.success(request, f"✅ {aprobadas} solicitud(es) aprobada(s).")
+        if cerradas:
+            messages.info(request, f"Se rechazaron automáticamente {cerradas} solicitud(es) de las mismas mascotas.")
+        if no_vigentes:
+            messages.warning(request, f"ℹ️ {no_vigentes} solicitud(es) ya no estaban vigentes.")
+    else:
+        rechazadas = respuestas.rechazar_lote(seleccion, respuesta)
+        if rechazadas:
+            messages.success(request, f"🛑 {rechazadas} solicitud(es) rechazada(s).")
+        else:
+            messages.info(request, "No había solicitudes 'pendientes' para rechazar.")
 
 
 @login_required
 def detalle_solicitud(request, solicitud_id: int):
-    solicitud = get_object_or_404(SolicitudAdopcion, id=solicitud_id, usuario=request.user)
+    solicitud = get_object_or_404(
+        SolicitudAdopcion.objects.select_related("mascota"), id=solicitud_id, usuario=request.user
+    )
     context = {"solicitud": solicitud, "titulo": f"Mi Solicitud #{solicitud.id}"}
     return render(request, "solicitud_adopcion/detalle_solicitud.html", context)
 
 
 @login_required
 def responder_solicitud(request, solicitud_id: int):
-    solicitud = get_object_or_404(SolicitudAdopcion, id=solicitud_id)
+    solicitud = get_object_or_404(
+        SolicitudAdopcion.objects.select_related("mascota", "usuario"), id=solicitud_id
+    )
 
-    if request.user != solicitud.mascota.responsable:
+    if request.user.id != solicitud.mascota.responsable_id:
         messages.error(request, "No tienes permiso para responder esta solicitud.")
         return redirect("home")
 
@@ -77,16 +223,26 @@ def responder_solicitud(request, solicitud_id: int):
         respuesta = (request.POST.get("respuesta") or "").strip()
 
         if estado in ["aprobada", "rechazada"]:
-            solicitud.estado = estado
-            solicitud.respuesta = respuesta
-            solicitud.save()
-
-            if estado == "aprobada":
-                solicitud.mascota.estado = "adoptado"
-                solicitud.mascota.save()
-
-            messages.success(request, f"Solicitud {estado} correctamente.")
-            return redirect("solicitud_adopcion:detalle_solicitud", solicitud_id)
+            try:
+                if estado == "aprobada":
+                    cerradas = respuestas.aprobar(solicitud, respuesta)
+                    messages.success(request, "Solicitud aprobada correctamente.")
+                    if cerradas:
+                        messages.info(request, f"Se rechazaron automáticamente {cerradas} solicitud(es) pendiente(s) para {solicitud.mascota.nombre}.")
+                else:
+                    respuestas.rechazar(solicitud, respuesta)
+                    messages.success(request, "Solicitud rechazada correctamente.")
+            except respuestas.SolicitudNoVigente as e:
+                messages.error(request, str(e))
+            except OperationalError:
+                # La transacción se revirtió entera: la solicitud sigue como estaba
+                logger.warning(
+                    "BD ocupada al responder solicitud=%s", solicitud_id, exc_info=True,
+                    extra={"solicitud_id": solicitud_id, "evento": "bd_ocupada"},
+                )
+                messages.error(request, BD_OCUPADA)
+            # El detalle es solo del solicitante: volver a esta misma página
+            return redirect("solicitud_adopcion:responder_solicitud", solicitud_id)
 
     context = {"solicitud": solicitud, "titulo": f"Responder Solicitud #{solicitud.id}"}
     return render(request, "solicitud_adopcion/responder_solicitud.html", context)